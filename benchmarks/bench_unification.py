@@ -0,0 +1,67 @@
+"""Benchmark for termination.unification on exponential unification problems.
+
+Run as::
+
+    python benchmarks/bench_unification.py
+
+Each family has most general unifiers whose size as a tree is exponential in
+``n``. A Robinson-style unifier that applies substitutions eagerly takes
+exponential time on them, while the union-find unifier should scale nearly
+linearly, so the time per ``n`` should stay roughly flat.
+"""
+
+from __future__ import annotations
+
+import time
+from collections.abc import Callable
+
+from termination.terms import Function, Term, TermLike, Variable
+from termination.unification import unify
+
+g = Function("g", 2)
+
+
+def variables(n: int) -> list[Variable]:
+    return [Variable(f"x{i}") for i in range(n + 1)]
+
+
+def wide(n: int) -> tuple[TermLike, TermLike]:
+    """f(x1, ..., xn) = f(g(x0, x0), ..., g(x(n-1), x(n-1)))"""
+    xs = variables(n)
+    f = Function("f", n)
+    return f(*xs[1:]), f(*(g(xs[i], xs[i]) for i in range(n)))
+
+
+def nested(n: int) -> tuple[TermLike, TermLike]:
+    """The same equations as ``wide``, nested in binary g-terms instead."""
+    xs = variables(n)
+    left: TermLike = xs[n]
+    right: TermLike = g(xs[n - 1], xs[n - 1])
+    for i in range(n - 1, 0, -1):
+        left = g(xs[i], left)
+        right = g(g(xs[i - 1], xs[i - 1]), right)
+    return left, right
+
+
+def bench(family: Callable[[int], tuple[TermLike, TermLike]], n: int) -> float:
+    left, right = family(n)
+    start = time.perf_counter()
+    result = unify(left, right)
+    elapsed = time.perf_counter() - start
+    assert result is not None
+    value = result(Variable(f"x{n}"))
+    assert isinstance(value, Term) and value.depth == n
+    return elapsed
+
+
+def main() -> None:
+    for family in (wide, nested):
+        print(f"{family.__name__}:")
+        print(f"{'n':>8} {'seconds':>10} {'us per n':>10}")
+        for n in (1_000, 2_000, 4_000, 8_000, 16_000, 32_000):
+            elapsed = bench(family, n)
+            print(f"{n:>8} {elapsed:>10.4f} {elapsed / n * 1e6:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
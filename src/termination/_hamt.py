@@ -0,0 +1,187 @@
+"""A persistent hash map, as a hash array mapped trie (HAMT).
+
+Updating a persistent map returns a new map and leaves the original unchanged.
+The two share every node of the trie except those on the path to the updated
+key, so an update takes time and memory logarithmic in the size of the map::
+
+    empty = PersistentMap()
+    one = empty.set("a", 1)
+    two = one.set("b", 2)
+    len(empty), len(one), len(two)  # (0, 1, 2)
+
+Each level of the trie consumes five bits of the hash of a key. Nodes store
+their occupied slots densely, with a bitmap of which of the 32 possible slots
+are occupied. Keys whose hashes agree in all bits end up together in a
+collision node at the bottom of the trie.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator, Mapping
+from typing import Any
+
+_BITS = 5
+_MASK = (1 << _BITS) - 1
+_HASH_BITS = 64
+_HASH_MASK = (1 << _HASH_BITS) - 1
+
+# An entry is a tuple of a key's hash, the key, and its value. Slots of bitmap
+# nodes hold either entries or child nodes.
+type _Entry = tuple[int, Any, Any]
+
+
+class _BitmapNode:
+    __slots__ = ("bitmap", "slots")
+
+    def __init__(self, bitmap: int, slots: tuple[_Entry | _Node, ...]) -> None:
+        self.bitmap = bitmap
+        self.slots = slots
+
+
+class _CollisionNode:
+    __slots__ = ("entries", "key_hash")
+
+    def __init__(self, key_hash: int, entries: tuple[_Entry, ...]) -> None:
+        self.key_hash = key_hash
+        self.entries = entries
+
+
+type _Node = _BitmapNode | _CollisionNode
+
+_EMPTY = _BitmapNode(0, ())
+
+
+class PersistentMap[K, V](Mapping[K, V]):
+    """An immutable mapping with cheap, structure-sharing updates."""
+
+    __slots__ = ("_root", "_size")
+
+    _root: _Node
+    _size: int
+
+    def __init__(self, items: Mapping[K, V] | Iterable[tuple[K, V]] = ()) -> None:
+        root: _Node = _EMPTY
+        size = 0
+        pairs = items.items() if isinstance(items, Mapping) else items
+        for key, value in pairs:
+            root, added = _set(root, 0, hash(key) & _HASH_MASK, key, value)
+            size += added
+        self._root = root
+        self._size = size
+
+    def __getitem__(self, key: K) -> V:
+        key_hash = hash(key) & _HASH_MASK
+        node = self._root
+        shift = 0
+        while isinstance(node, _BitmapNode):
+            bit = 1 << ((key_hash >> shift) & _MASK)
+            if not node.bitmap & bit:
+                raise KeyError(key)
+            slot = node.slots[(node.bitmap & (bit - 1)).bit_count()]
+            if isinstance(slot, tuple):
+                _hash, slot_key, value = slot
+                if slot_key is key or slot_key == key:
+                    return value
+                raise KeyError(key)
+            node = slot
+            shift += _BITS
+
+        for _hash, entry_key, value in node.entries:
+            if entry_key is key or entry_key == key:
+                return value
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[K]:
+        for _hash, key, _value in _entries(self._root):
+            yield key
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({dict(self)!r})"
+
+    def set(self, key: K, value: V) -> PersistentMap[K, V]:
+        """Return a map with the given key set to the given value."""
+        root, added = _set(self._root, 0, hash(key) & _HASH_MASK, key, value)
+        if root is self._root:
+            return self
+        result: PersistentMap[K, V] = PersistentMap.__new__(PersistentMap)
+        result._root = root
+        result._size = self._size + added
+        return result
+
+
+def _set(
+    node: _Node, shift: int, key_hash: int, key: Any, value: Any
+) -> tuple[_Node, bool]:
+    """Return the node with a key set, and whether the key was added."""
+    if isinstance(node, _CollisionNode):
+        entries = node.entries
+        for index, (_hash, entry_key, entry_value) in enumerate(entries):
+            if entry_key is key or entry_key == key:
+                if entry_value is value:
+                    return (node, False)
+                updated = (
+                    *entries[:index],
+                    (key_hash, key, value),
+                    *entries[index + 1 :],
+                )
+                return (_CollisionNode(node.key_hash, updated), False)
+        return (_CollisionNode(node.key_hash, (*entries, (key_hash, key, value))), True)
+
+    bit = 1 << ((key_hash >> shift) & _MASK)
+    index = (node.bitmap & (bit - 1)).bit_count()
+    slots = node.slots
+
+    if not node.bitmap & bit:
+        slots = (*slots[:index], (key_hash, key, value), *slots[index:])
+        return (_BitmapNode(node.bitmap | bit, slots), True)
+
+    slot = slots[index]
+    if isinstance(slot, tuple):
+        _hash, slot_key, slot_value = slot
+        if slot_key is key or slot_key == key:
+            if slot_value is value:
+                return (node, False)
+            replacement: _Entry | _Node = (key_hash, key, value)
+            added = False
+        else:
+            replacement = _merge(shift + _BITS, slot, (key_hash, key, value))
+            added = True
+    else:
+        assert isinstance(slot, _BitmapNode | _CollisionNode)
+        replacement, added = _set(slot, shift + _BITS, key_hash, key, value)
+        if replacement is slot:
+            return (node, False)
+
+    slots = (*slots[:index], replacement, *slots[index + 1 :])
+    return (_BitmapNode(node.bitmap, slots), added)
+
+
+def _merge(shift: int, first: _Entry, second: _Entry) -> _Node:
+    """Return a node holding two entries with distinct keys."""
+    if shift >= _HASH_BITS:
+        return _CollisionNode(first[0], (first, second))
+
+    first_index = (first[0] >> shift) & _MASK
+    second_index = (second[0] >> shift) & _MASK
+    if first_index == second_index:
+        return _BitmapNode(1 << first_index, (_merge(shift + _BITS, first, second),))
+    if first_index > second_index:
+        first, second = second, first
+    return _BitmapNode((1 << first_index) | (1 << second_index), (first, second))
+
+
+def _entries(root: _Node) -> Iterator[_Entry]:
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, _CollisionNode):
+            yield from node.entries
+            continue
+        for slot in reversed(node.slots):
+            if isinstance(slot, tuple):
+                yield slot
+            else:
+                stack.append(slot)
@@ -0,0 +1,47 @@
+"""Helpers for running deeply nested computations without recursion.
+
+A computation is a generator that returns its result. To use the result of a
+sub-computation, it yields the sub-computation (or an already known result)
+and receives the result back::
+
+    def size(term):
+        total = 1
+        for child in children(term):
+            total += yield size(child)
+        return total
+
+    run(size(term))
+
+The sub-computations are kept on an explicit stack, so the nesting depth is not
+limited by the recursion limit.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Generator
+from types import GeneratorType
+from typing import Any
+
+type Computation[R] = Generator[Any, Any, R]
+
+
+def run[R](computation: Computation[R]) -> R:
+    """Run a computation to completion and return its result."""
+    stack: list[Computation[Any]] = [computation]
+    value: Any = None
+
+    while True:
+        try:
+            request = stack[-1].send(value)
+        except StopIteration as stop:
+            stack.pop()
+            if not stack:
+                return stop.value
+            value = stop.value
+            continue
+
+        if isinstance(request, GeneratorType):
+            stack.append(request)
+            value = None
+        else:
+            value = request
@@ -0,0 +1,376 @@
+"""Module for critical pairs and Knuth-Bendix completion.
+
+Two rules overlap when the left-hand side of one unifies with a non-variable
+subterm of the left-hand side of the other. The term at the overlap rewrites
+in two ways, and the two results form a critical pair::
+
+    outer = Rule(f(g(x)), x)
+    inner = Rule(g(a), b)
+    list(critical_pairs(outer, inner))  # [f(b) = a]
+
+A terminating rewrite system is confluent exactly when all of its critical
+pairs are joinable. Completion turns a set of equations into such a system,
+orienting equations into rules with a reduction ordering and adding the
+critical pairs of the new rules as equations, until every critical pair is
+joinable::
+
+    group = complete(equations, PathOrdering(precedence={...}))
+
+The procedure follows Huet's, as a given-equation loop. The passive equations
+are waiting to be selected; each selected equation is simplified with the
+active rules, oriented, and added to them. The active rules that the new rule
+simplifies are simplified in turn, and the critical pairs between the new rule
+and the active rules become passive equations.
+
+The non-variable subterms of the active rules are kept in a discrimination
+tree, so the overlaps of a new rule and the rules it simplifies are retrieved
+from the index instead of being searched for in every active rule.
+"""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from enum import Enum
+
+from .indexing import DiscriminationTree
+from .orderings import StrictOrder
+from .pools import VariablePool
+from .rewriting import Budget, RewriteSystem, Rule
+from .terms import Position, TermLike, Variable, replace
+from .unification import unify
+
+
+@dataclass(frozen=True)
+class Equation:
+    """An unoriented equation between two terms."""
+
+    lhs: TermLike
+    rhs: TermLike
+
+    def __str__(self) -> str:
+        """Format this equation with an equals sign.
+
+        Example::
+
+            str(Equation(f(x, a), x))  # 'f(?x, a) = ?x'
+        """
+        return f"{self.lhs} = {self.rhs}"
+
+
+class CompletionFailure(Exception):
+    """Raised when completion is left with equations it cannot orient."""
+
+    def __init__(self, message: str, equation: Equation) -> None:
+        super().__init__(message)
+        self.equation = equation
+
+
+def critical_pairs(
+    outer: Rule, inner: Rule, *, pool: VariablePool | None = None
+) -> Iterator[Equation]:
+    """Return the critical pairs of one rule overlapping into another.
+
+    The left-hand side of ``inner`` is unified with each non-variable subterm
+    of the left-hand side of ``outer``. The rules are renamed apart first, with
+    fresh variables from the given pool. The trivial overlap of a rule with
+    itself at the root is skipped.
+    """
+    if pool is None:
+        pool = VariablePool()
+    same = outer == inner
+    outer = pool.rename_apart(outer)
+    inner = pool.rename_apart(inner)
+
+    for position, subterm in outer.lhs.subterms():
+        if isinstance(subterm, Variable) or (same and not position):
+            continue
+        pair = _critical_pair(outer, inner, position, subterm)
+        if pair is not None:
+            yield pair
+
+
+def _critical_pair(
+    outer: Rule, inner: Rule, position: Position, subterm: TermLike
+) -> Equation | None:
+    unifier = unify(subterm, inner.lhs)
+    if unifier is None:
+        return None
+    return Equation(
+        unifier(replace(outer.lhs, position, inner.rhs)), unifier(outer.rhs)
+    )
+
+
+class _Side(Enum):
+    LHS = 0
+    RHS = 1
+
+
+type _Occurrence = tuple[int, _Side, Position]
+
+
+@dataclass(frozen=True)
+class _Passive:
+    number: int
+    equation: Equation
+
+
+class Completion:
+    """The state of a Knuth-Bendix completion.
+
+    Passive equations are selected by a fair heuristic: mostly the lightest
+    equation (with the fewest symbols), but every ``age_ratio``-th selection
+    the oldest, so that every equation is eventually selected.
+
+    Equations that cannot be oriented are set aside until another rule is
+    added, since the new rule may simplify them. Completion fails when only
+    such equations are left.
+    """
+
+    def __init__(
+        self,
+        equations: Iterable[Equation],
+        order: StrictOrder[TermLike],
+        *,
+        pool: VariablePool | None = None,
+        age_ratio: int = 5,
+    ) -> None:
+        if age_ratio < 1:
+            raise ValueError(f"Age ratio must be positive: {age_ratio}")
+
+        self.order = order
+        self.pool = VariablePool() if pool is None else pool
+        self.age_ratio = age_ratio
+
+        self._system = RewriteSystem()
+        self._active: dict[int, Rule] = {}
+        self._index: DiscriminationTree[_Occurrence] = DiscriminationTree()
+        self._numbers = itertools.count()
+
+        # Passive equations are in two heaps, by weight and by age. Equations
+        # selected from one heap are stale in the other, and are skipped and
+        # forgotten when they come up there.
+        self._by_weight: list[tuple[int, int, _Passive]] = []
+        self._by_age: list[tuple[int, _Passive]] = []
+        self._selected: set[int] = set()
+        self._passive_count = 0
+        self._selections = 0
+        self._postponed: list[Equation] = []
+
+        for equation in equations:
+            self.add(equation)
+
+    @property
+    def rules(self) -> RewriteSystem:
+        """Return the system of active rules."""
+        return self._system
+
+    @property
+    def done(self) -> bool:
+        """Return whether there are no passive equations left."""
+        return self._passive_count == 0
+
+    def add(self, equation: Equation) -> None:
+        """Add a passive equation."""
+        number = next(self._numbers)
+        passive = _Passive(number, equation)
+        weight = len(equation.lhs) + len(equation.rhs)
+        heapq.heappush(self._by_weight, (weight, number, passive))
+        heapq.heappush(self._by_age, (number, passive))
+        self._passive_count += 1
+
+    def step(self) -> None:
+        """Select a passive equation and process it.
+
+        Raises ``CompletionFailure`` if no passive equation is left, but some
+        equations could not be oriented.
+        """
+        equation = self._select()
+        if equation is None:
+            if self._postponed:
+                raise CompletionFailure(
+                    f"Cannot orient equation: {self._postponed[0]}",
+                    self._postponed[0],
+                )
+            return
+
+        memo: dict[TermLike, TermLike] = {}
+        lhs = self._system.normalize(equation.lhs, memo=memo)
+        rhs = self._system.normalize(equation.rhs, memo=memo)
+        if lhs == rhs:
+            return
+
+        if self.order.greater(lhs, rhs):
+            rule = Rule(lhs, rhs)
+        elif self.order.greater(rhs, lhs):
+            rule = Rule(rhs, lhs)
+        else:
+            self._postponed.append(Equation(lhs, rhs))
+            return
+
+        self._activate(self.pool.rename_apart(rule))
+
+    def run(
+        self, *, max_steps: int | None = None, timeout: float | None = None
+    ) -> RewriteSystem:
+        """Process passive equations until there are none left.
+
+        Returns the system of active rules, which is then convergent. Raises
+        ``BudgetExceeded`` if it takes more than ``max_steps`` steps, or longer
+        than ``timeout`` seconds, and ``CompletionFailure`` if completion fails.
+        """
+        budget = Budget(max_steps, timeout)
+        while not self.done or self._postponed:
+            budget.step()
+            self.step()
+        return self._system
+
+    def _select(self) -> Equation | None:
+        self._selections += 1
+        if self._selections % self.age_ratio == 0:
+            heap: list[tuple[int, _Passive]] | list[tuple[int, int, _Passive]] = (
+                self._by_age
+            )
+        else:
+            heap = self._by_weight
+
+        while heap:
+            passive = heapq.heappop(heap)[-1]
+            if passive.number in self._selected:
+                # Both heaps have now popped the equation.
+                self._selected.discard(passive.number)
+                continue
+            self._selected.add(passive.number)
+            self._passive_count -= 1
+            if len(self._selected) > self._passive_count:
+                self._drop_stale()
+            return passive.equation
+        return None
+
+    def _drop_stale(self) -> None:
+        """Remove the stale entries from the heaps.
+
+        This is done once there are more stale entries than passive equations,
+        so the heaps stay within twice the size they would have without them.
+        """
+        selected = self._selected
+        self._by_weight = [
+            entry for entry in self._by_weight if entry[1] not in selected
+        ]
+        self._by_age = [entry for entry in self._by_age if entry[0] not in selected]
+        heapq.heapify(self._by_weight)
+        heapq.heapify(self._by_age)
+        selected.clear()
+
+    def _activate(self, rule: Rule) -> None:
+        """Add a new rule, simplify the active rules, and add critical pairs."""
+        simplified = self._simplifiable(rule)
+
+        number = next(self._numbers)
+        self._active[number] = rule
+        self._system.add(rule)
+
+        for other_number, other in simplified:
+            self._remove(other_number, other)
+            if _reduces(rule, other.lhs):
+                # The rule collapses: its left-hand side is no longer normal.
+                self.add(Equation(other.lhs, other.rhs))
+            else:
+                rhs = self._system.normalize(other.rhs)
+                self._insert(other_number, Rule(other.lhs, rhs))
+
+        for pair in self._overlaps(number, rule):
+            self.add(pair)
+        self._insert_index(number, rule)
+
+        # The new rule may simplify the equations that could not be oriented.
+        for equation in self._postponed:
+            self.add(equation)
+        self._postponed.clear()
+
+    def _simplifiable(self, rule: Rule) -> list[tuple[int, Rule]]:
+        """Return the active rules with a subterm that the rule rewrites."""
+        numbers = {
+            number for (number, _side, _position) in self._index.instances(rule.lhs)
+        }
+        result = []
+        for number in sorted(numbers):
+            other = self._active[number]
+            if _reduces(rule, other.lhs) or _reduces(rule, other.rhs):
+                result.append((number, other))
+        return result
+
+    def _overlaps(self, number: int, rule: Rule) -> Iterator[Equation]:
+        """Return the critical pairs of a new rule with the active rules."""
+        # The new rule into the active rules.
+        for other_number, side, position in self._index.unifiable(rule.lhs):
+            if side is not _Side.LHS or other_number == number:
+                continue
+            other = self._active[other_number]
+            pair = _critical_pair(other, rule, position, other.lhs[position])
+            if pair is not None:
+                yield pair
+
+        # The active rules into the new rule, below the root. Root overlaps
+        # were found above.
+        for position, subterm in rule.lhs.subterms():
+            if isinstance(subterm, Variable) or not position:
+                continue
+            for other_number, side, other_position in self._index.unifiable(subterm):
+                if side is not _Side.LHS or other_position:
+                    continue
+                other = self._active[other_number]
+                pair = _critical_pair(rule, other, position, subterm)
+                if pair is not None:
+                    yield pair
+
+        yield from critical_pairs(rule, rule, pool=self.pool)
+
+    def _insert(self, number: int, rule: Rule) -> None:
+        self._active[number] = rule
+        self._system.add(rule)
+        self._insert_index(number, rule)
+
+    def _insert_index(self, number: int, rule: Rule) -> None:
+        for side, term in ((_Side.LHS, rule.lhs), (_Side.RHS, rule.rhs)):
+            for position, subterm in term.subterms():
+                if not isinstance(subterm, Variable):
+                    self._index.insert(subterm, (number, side, position))
+
+    def _remove(self, number: int, rule: Rule) -> None:
+        del self._active[number]
+        self._system.remove(rule)
+        for side, term in ((_Side.LHS, rule.lhs), (_Side.RHS, rule.rhs)):
+            for position, subterm in term.subterms():
+                if not isinstance(subterm, Variable):
+                    self._index.remove(subterm, (number, side, position))
+
+
+def _reduces(rule: Rule, term: TermLike) -> bool:
+    """Return whether a rule rewrites a term anywhere."""
+    return any(
+        rule.matcher(subterm) is not None
+        for (_position, subterm) in term.subterms()
+        if not isinstance(subterm, Variable)
+    )
+
+
+def complete(
+    equations: Iterable[Equation],
+    order: StrictOrder[TermLike],
+    *,
+    pool: VariablePool | None = None,
+    age_ratio: int = 5,
+    max_steps: int | None = None,
+    timeout: float | None = None,
+) -> RewriteSystem:
+    """Complete a set of equations into a convergent rewrite system.
+
+    The rules of the result are oriented with the given reduction ordering.
+    See ``Completion`` for the pool and the age ratio, and ``Completion.run()``
+    for the budgets and errors.
+    """
+    completion = Completion(equations, order, pool=pool, age_ratio=age_ratio)
+    return completion.run(max_steps=max_steps, timeout=timeout)
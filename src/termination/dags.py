@@ -0,0 +1,237 @@
+"""Module for viewing terms as graphs of their distinct subterms.
+
+Terms produced by rewriting share large subterms, sometimes as the same object
+and sometimes only as equal objects. As trees, such terms can be exponentially
+larger than their number of distinct subterms. A term DAG numbers the distinct
+subterms of a set of terms once, children before parents::
+
+    t = f(a, a)
+    u = f(t, t)
+    dag = TermDAG([u])
+    len(dag)  # 3 nodes: a, f(a, a) and u
+    dag.sizes()[dag.node(u)]  # 7
+
+Bulk operations on a DAG are folds that visit each node once, so they take
+time linear in the number of distinct subterms rather than in the size of the
+trees. Each node has a canonical term, in which equal subterms are the same
+object. Substituting into canonical terms keeps that sharing, and comparing
+them with a path ordering, which memoizes on identity, compares each pair of
+distinct subterms at most once.
+"""
+
+from __future__ import annotations
+
+from collections import ChainMap
+from collections.abc import Callable, Iterable, Iterator, MutableMapping, Sequence
+from operator import is_
+
+from .orderings import StrictOrder
+from .terms import (
+    Function,
+    Term,
+    TerminalSymbol,
+    TermLike,
+    Variable,
+    VariableMapping,
+)
+
+
+class TermDAG:
+    """The distinct subterms of a set of terms, numbered bottom-up.
+
+    Nodes are numbered in the order they are added, so the children of a node
+    always have smaller numbers than the node itself.
+    """
+
+    def __init__(self, terms: Iterable[TermLike] = ()) -> None:
+        self._terms: list[TermLike] = []
+        self._children: list[tuple[int, ...]] = []
+        self._keys: dict[object, int] = {}
+        # Nodes of the objects added so far, by identity. The objects are kept
+        # alive so that their identities are not reused.
+        self._identities: dict[int, int] = {}
+        self._objects: list[TermLike] = []
+        self.roots: list[int] = []
+        for term in terms:
+            self.roots.append(self.add(term))
+
+    def __len__(self) -> int:
+        """Return the number of distinct subterms."""
+        return len(self._terms)
+
+    def __iter__(self) -> Iterator[TermLike]:
+        """Return an iterator over the canonical terms of the nodes, in order."""
+        return iter(self._terms)
+
+    def __getitem__(self, node: int) -> TermLike:
+        """Return the canonical term of a node."""
+        return self._terms[node]
+
+    def __contains__(self, term: TermLike) -> bool:
+        """Return whether a term is a subterm of the terms of this DAG."""
+        return self._find(term, add=False) is not None
+
+    def add(self, term: TermLike) -> int:
+        """Add a term and its subterms, and return the node of the term."""
+        node = self._find(term, add=True)
+        assert node is not None
+        return node
+
+    def node(self, term: TermLike) -> int:
+        """Return the node of a term, or raise KeyError."""
+        node = self._find(term, add=False)
+        if node is None:
+            raise KeyError(term)
+        return node
+
+    def children(self, node: int) -> tuple[int, ...]:
+        """Return the nodes of the children of a node."""
+        return self._children[node]
+
+    def fold[R](
+        self,
+        leaf: Callable[[TerminalSymbol], R],
+        combine: Callable[[Function, Sequence[R]], R],
+    ) -> list[R]:
+        """Compute a value for every node, bottom-up.
+
+        Terminal symbols get the value of ``leaf``, and terms get the value of
+        ``combine`` on their root and the values of their children. The result
+        is indexed by node.
+        """
+        results: list[R] = []
+        for term, children in zip(self._terms, self._children, strict=True):
+            if isinstance(term, Term):
+                results.append(combine(term.root, [results[i] for i in children]))
+            else:
+                assert isinstance(term, TerminalSymbol)
+                results.append(leaf(term))
+        return results
+
+    def sizes(self) -> list[int]:
+        """Return the size of every node, as the size of its tree."""
+        return self.fold(lambda _: 1, lambda _, sizes: 1 + sum(sizes))
+
+    def depths(self) -> list[int]:
+        """Return the depth of every node."""
+        return self.fold(lambda _: 0, lambda _, depths: 1 + max(depths))
+
+    def variable_sets(self) -> list[frozenset[Variable]]:
+        """Return the set of variables of every node.
+
+        Ground nodes all share the empty set, and a node with a single
+        non-ground child shares that child's set.
+        """
+
+        def leaf(symbol: TerminalSymbol) -> frozenset[Variable]:
+            if isinstance(symbol, Variable):
+                return frozenset((symbol,))
+            return frozenset()
+
+        def combine(
+            _: Function, child_sets: Sequence[frozenset[Variable]]
+        ) -> frozenset[Variable]:
+            non_empty = [child_set for child_set in child_sets if child_set]
+            if not non_empty:
+                return frozenset()
+            if len(non_empty) == 1:
+                return non_empty[0]
+            return frozenset().union(*non_empty)
+
+        return self.fold(leaf, combine)
+
+    def substitute(self, mapping: VariableMapping) -> list[TermLike]:
+        """Apply a mapping to every node, and return the results.
+
+        Nodes without a mapped variable are their canonical terms, and the
+        results share their equal subterms.
+        """
+        results: list[TermLike] = []
+        for term, children in zip(self._terms, self._children, strict=True):
+            if isinstance(term, Term):
+                substituted = tuple(results[child] for child in children)
+                if all(map(is_, substituted, term.children)):
+                    results.append(term)
+                else:
+                    results.append(Term(root=term.root, children=substituted))
+            elif isinstance(term, Variable):
+                results.append(mapping.get(term, term))
+            else:
+                results.append(term)
+        return results
+
+    def greater(
+        self, order: StrictOrder[TermLike], left: TermLike, right: TermLike
+    ) -> bool:
+        """Compare two terms of this DAG by their canonical terms.
+
+        Orderings that memoize comparisons on identity, like the path
+        orderings, then compare each pair of distinct subterms once.
+        """
+        return order.greater(self[self.node(left)], self[self.node(right)])
+
+    def _find(self, term: TermLike, *, add: bool) -> int | None:
+        node = self._identities.get(id(term))
+        if node is not None:
+            return node
+
+        # Queries that do not add remember the identities they visit locally,
+        # so they leave this DAG unchanged.
+        identities: MutableMapping[int, int]
+        objects: list[TermLike]
+        if add:
+            identities = self._identities
+            objects = self._objects
+        else:
+            identities = ChainMap({}, self._identities)
+            objects = []
+
+        # Visit the subterms not seen before in post-order.
+        stack: list[tuple[TermLike, bool]] = [(term, False)]
+        while stack:
+            current, expanded = stack.pop()
+            if id(current) in identities:
+                continue
+
+            if isinstance(current, Term):
+                if not expanded:
+                    stack.append((current, True))
+                    stack.extend(
+                        (child, False)
+                        for child in reversed(current.children)
+                        if id(child) not in identities
+                    )
+                    continue
+                children = tuple(identities[id(child)] for child in current.children)
+                key: object = (current.root, children)
+            elif isinstance(current, TerminalSymbol):
+                children = ()
+                key = current
+            else:
+                raise TypeError(
+                    f"object of type {type(current).__name__} is not a term or a "
+                    "terminal symbol"
+                )
+
+            node = self._keys.get(key)
+            if node is None:
+                if not add:
+                    return None
+                node = self._add_node(current, children, key)
+            identities[id(current)] = node
+            objects.append(current)
+
+        return identities[id(term)]
+
+    def _add_node(self, term: TermLike, children: tuple[int, ...], key: object) -> int:
+        """Number a new distinct subterm, and make its canonical term."""
+        if isinstance(term, Term):
+            canonical = tuple(self._terms[child] for child in children)
+            if not all(map(is_, canonical, term.children)):
+                term = Term(root=term.root, children=canonical)
+
+        node = len(self._terms)
+        self._terms.append(term)
+        self._children.append(children)
+        self._keys[key] = node
+        return node
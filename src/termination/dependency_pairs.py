@@ -0,0 +1,360 @@
+"""Module for dependency pairs and the dependency graph.
+
+The defined symbols of a rewrite system are the roots of its left-hand sides.
+Each rule ``l -> r`` has a dependency pair ``l# -> t#`` for every subterm ``t``
+of ``r`` with a defined root, where ``#`` marks the roots of both sides with a
+fresh tuple symbol. A system terminates exactly when there is no infinite
+chain of dependency pairs, with rewriting allowed on the arguments in between::
+
+    rules = [
+        Rule(minus(x, zero), x),
+        Rule(minus(s(x), s(y)), minus(x, y)),
+    ]
+    dependency_pairs(rules)  # [minus#(s(?x), s(?y)) -> minus#(?x, ?y)]
+
+The dependency graph has an edge from one pair to another when the second can
+follow the first in a chain. It is not computable in general, so it is
+estimated: the right-hand side of the first pair has each subterm with a
+defined root replaced by a fresh variable (CAP) and each variable occurrence
+replaced by a fresh variable (REN), and there is an edge if the result unifies
+with the left-hand side of the second pair. Every infinite chain stays in one
+strongly connected component of the graph, so each component that has a cycle
+is a separate, smaller termination problem::
+
+    problem = DependencyPairProblem.from_rules(rules)
+    problem.decompose()  # one problem per cycle of the graph
+
+The left-hand sides of the pairs are kept in a discrimination tree, so the
+candidate successors of a pair are retrieved from the index instead of being
+unified with every pair, and the components are found with an iterative
+version of Tarjan's algorithm, so large graphs do not exhaust the stack.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator, Sequence
+from dataclasses import dataclass, field
+from functools import cached_property
+from operator import is_
+from typing import overload
+
+from .indexing import DiscriminationTree
+from .pools import VariablePool
+from .rewriting import Rule
+from .terms import (
+    Constant,
+    Function,
+    Symbol,
+    Term,
+    TermLike,
+    Variable,
+    VariableMapping,
+    variables,
+)
+from .unification import unify
+
+_MARK = "#"
+
+
+@overload
+def mark(symbol: Function) -> Function: ...
+@overload
+def mark(symbol: Constant) -> Constant: ...
+
+
+def mark(symbol: Function | Constant) -> Function | Constant:
+    """Return the tuple symbol marking a defined symbol.
+
+    The tuple symbol has the same arity, and the name of the symbol followed by
+    ``#``::
+
+        mark(Function("f", 2))  # Function(name='f#', arity=2)
+    """
+    if isinstance(symbol, Function):
+        return Function(symbol.name + _MARK, symbol.arity)
+    return Constant(symbol.name + _MARK)
+
+
+def _mark_term(term: TermLike) -> TermLike:
+    if isinstance(term, Term):
+        return Term(root=mark(term.root), children=term.children)
+    if isinstance(term, Constant):
+        return mark(term)
+    raise ValueError(f"Cannot mark a variable: {term}")
+
+
+def _root(term: TermLike) -> Symbol:
+    if isinstance(term, Term):
+        return term.root
+    assert isinstance(term, Symbol)
+    return term
+
+
+def defined_symbols(rules: Iterable[Rule]) -> frozenset[Symbol]:
+    """Return the symbols at the roots of the left-hand sides of some rules."""
+    return frozenset(_root(rule.lhs) for rule in rules)
+
+
+@dataclass(frozen=True)
+class DependencyPair:
+    """A dependency pair, between two terms with marked roots."""
+
+    lhs: TermLike
+    rhs: TermLike
+
+    def __str__(self) -> str:
+        """Format this pair with an arrow, like a rule.
+
+        Example::
+
+            str(DependencyPair(f_(s(x)), f_(x)))  # 'f#(s(?x)) -> f#(?x)'
+        """
+        return f"{self.lhs} -> {self.rhs}"
+
+    def _substitute(self, mapping: VariableMapping) -> DependencyPair:
+        return DependencyPair(
+            self.lhs._substitute(mapping), self.rhs._substitute(mapping)
+        )
+
+    def _variables(self) -> Iterator[Variable]:
+        yield from variables(self.lhs)
+        yield from variables(self.rhs)
+
+
+def dependency_pairs(rules: Iterable[Rule]) -> list[DependencyPair]:
+    """Return the dependency pairs of some rules.
+
+    The pairs of each rule are in pre-order of the subterms of its right-hand
+    side. Subterms that are also proper subterms of the left-hand side are
+    skipped, since a chain through them would be a chain through a smaller
+    term, as are repeated subterms.
+    """
+    rules = list(rules)
+    defined = defined_symbols(rules)
+
+    pairs = []
+    for rule in rules:
+        lhs = _mark_term(rule.lhs)
+        below = {subterm for (position, subterm) in rule.lhs.subterms() if position}
+        seen = set()
+        for _position, subterm in rule.rhs.subterms():
+            if isinstance(subterm, Variable) or _root(subterm) not in defined:
+                continue
+            if subterm in below or subterm in seen:
+                continue
+            seen.add(subterm)
+            pairs.append(DependencyPair(lhs, _mark_term(subterm)))
+    return pairs
+
+
+def strongly_connected_components(
+    successors: Sequence[Sequence[int]],
+) -> list[list[int]]:
+    """Return the strongly connected components of a graph.
+
+    The graph has nodes ``0`` to ``len(successors) - 1``, and edges from each
+    node to its successors. Components are listed in reverse topological order
+    (a component comes before the components with edges into it), and the
+    nodes of each component in increasing order.
+
+    This is Tarjan's algorithm, with the depth-first search kept on an explicit
+    stack, so it takes linear time and constant recursion depth.
+    """
+    count = len(successors)
+    indexes = [-1] * count
+    lowlinks = [0] * count
+    on_stack = [False] * count
+    stack: list[int] = []
+    components: list[list[int]] = []
+    counter = 0
+
+    for start in range(count):
+        if indexes[start] >= 0:
+            continue
+
+        indexes[start] = lowlinks[start] = counter
+        counter += 1
+        stack.append(start)
+        on_stack[start] = True
+
+        # Each frame is a node and the number of its edges followed so far.
+        frames = [(start, 0)]
+        while frames:
+            node, edge = frames[-1]
+            edges = successors[node]
+            if edge < len(edges):
+                frames[-1] = (node, edge + 1)
+                successor = edges[edge]
+                if indexes[successor] < 0:
+                    indexes[successor] = lowlinks[successor] = counter
+                    counter += 1
+                    stack.append(successor)
+                    on_stack[successor] = True
+                    frames.append((successor, 0))
+                elif on_stack[successor]:
+                    lowlinks[node] = min(lowlinks[node], indexes[successor])
+                continue
+
+            frames.pop()
+            if frames:
+                parent = frames[-1][0]
+                lowlinks[parent] = min(lowlinks[parent], lowlinks[node])
+
+            if lowlinks[node] == indexes[node]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack[member] = False
+                    component.append(member)
+                    if member == node:
+                        break
+                component.sort()
+                components.append(component)
+
+    return components
+
+
+class DependencyGraph:
+    """The estimated dependency graph of some dependency pairs.
+
+    Nodes are the indexes of the pairs, and there is an edge from one pair to
+    another if the CAP and REN of the right-hand side of the first unifies with
+    the left-hand side of the second.
+
+    The fresh variables of CAP and REN come from the given pool, or a new one.
+    The left-hand sides are renamed apart with the same pool before they are
+    unified, so they never share variables with the estimates.
+    """
+
+    def __init__(
+        self,
+        pairs: Iterable[DependencyPair],
+        defined: Iterable[Symbol],
+        *,
+        pool: VariablePool | None = None,
+    ) -> None:
+        self.pairs = list(pairs)
+        self.defined = frozenset(defined)
+        self.pool = VariablePool() if pool is None else pool
+
+        index: DiscriminationTree[int] = DiscriminationTree()
+        for node, pair in enumerate(self.pairs):
+            index.insert(pair.lhs, node)
+
+        targets = [self.pool.rename_apart(pair.lhs) for pair in self.pairs]
+
+        self._successors: list[list[int]] = []
+        for pair in self.pairs:
+            estimate = self._cap_ren(pair.rhs)
+            candidates = sorted(index.unifiable(estimate))
+            self._successors.append(
+                [
+                    node
+                    for node in candidates
+                    if unify(estimate, targets[node]) is not None
+                ]
+            )
+
+    def __len__(self) -> int:
+        """Return the number of nodes in this graph."""
+        return len(self.pairs)
+
+    def successors(self, node: int) -> list[int]:
+        """Return the successors of a node, in increasing order."""
+        return self._successors[node]
+
+    def edges(self) -> Iterator[tuple[int, int]]:
+        """Return an iterator over the edges of this graph."""
+        for node, successors in enumerate(self._successors):
+            for successor in successors:
+                yield (node, successor)
+
+    def components(self) -> list[list[int]]:
+        """Return the strongly connected components of this graph.
+
+        See ``strongly_connected_components()`` for their order.
+        """
+        return strongly_connected_components(self._successors)
+
+    def cycles(self) -> list[list[int]]:
+        """Return the components of this graph that have a cycle.
+
+        These are the components with more than one node, or with a single node
+        that has an edge to itself.
+        """
+        return [
+            component
+            for component in self.components()
+            if len(component) > 1 or component[0] in self._successors[component[0]]
+        ]
+
+    def _cap_ren(self, term: TermLike) -> TermLike:
+        """Replace the variables and the defined subterms below the root.
+
+        Each is replaced by a fresh variable, so the result is linear.
+        """
+        # Each stack entry holds a subterm and the index of the next child to
+        # visit, and the results of the visited children are on another stack.
+        results: list[TermLike] = []
+        stack: list[tuple[TermLike, int]] = [(term, 0)]
+        while stack:
+            current, index = stack[-1]
+            if isinstance(current, Variable) or (
+                len(stack) > 1 and _root(current) in self.defined
+            ):
+                stack.pop()
+                results.append(self.pool.get_fresh("x"))
+            elif isinstance(current, Term) and index < len(current.children):
+                stack[-1] = (current, index + 1)
+                stack.append((current.children[index], 0))
+            else:
+                stack.pop()
+                if isinstance(current, Term):
+                    start = len(results) - len(current.children)
+                    children = tuple(results[start:])
+                    del results[start:]
+                    if not all(map(is_, children, current.children)):
+                        current = Term(root=current.root, children=children)
+                results.append(current)
+        return results[0]
+
+
+@dataclass(frozen=True)
+class DependencyPairProblem:
+    """A termination problem of dependency pairs over a rewrite system.
+
+    The problem is finite when there is no infinite chain of its pairs. Its
+    dependency graph draws fresh variables from ``pool``, if one is given, and
+    the problems it decomposes into share the pool.
+    """
+
+    pairs: tuple[DependencyPair, ...]
+    rules: tuple[Rule, ...]
+    pool: VariablePool | None = field(default=None, repr=False, compare=False)
+
+    @classmethod
+    def from_rules(
+        cls, rules: Iterable[Rule], *, pool: VariablePool | None = None
+    ) -> DependencyPairProblem:
+        """Return the problem of all the dependency pairs of some rules."""
+        rules = tuple(rules)
+        return cls(tuple(dependency_pairs(rules)), rules, pool)
+
+    @cached_property
+    def graph(self) -> DependencyGraph:
+        """Return the estimated dependency graph of the pairs."""
+        return DependencyGraph(self.pairs, defined_symbols(self.rules), pool=self.pool)
+
+    def decompose(self) -> list[DependencyPairProblem]:
+        """Split this problem into one problem per cycle of its graph.
+
+        Each problem keeps all the rules. This problem is finite exactly when
+        all of the returned problems are, and there are none when the graph
+        has no cycles.
+        """
+        return [
+            DependencyPairProblem(
+                tuple(self.pairs[node] for node in component), self.rules, self.pool
+            )
+            for component in self.graph.cycles()
+        ]
@@ -0,0 +1,255 @@
+"""Module for flatterms, a compact array-backed representation of terms.
+
+A flatterm stores a term as two parallel arrays of machine integers:
+
+* ``symbols``: The ids (in a ``SymbolTable``) of the symbols of the term, in
+  pre-order.
+* ``ends``: For each entry, the index just past the end of the subterm
+  starting there. Subterm ``i`` occupies ``symbols[i:ends[i]]``, and the next
+  sibling of subterm ``i``, if any, starts at ``ends[i]``.
+
+For example, ``f(g(a), ?x)`` is stored as::
+
+    symbols = [f, g, a, x]  # (as ids)
+    ends    = [4, 3, 3, 4]
+
+Flatterms are term-like: they support positions, subterms and variables
+directly on the arrays, and convert losslessly to and from ``Term``. Subterms
+of a flatterm are views sharing the arrays of the whole term.
+"""
+
+from __future__ import annotations
+
+from array import array
+from collections.abc import Iterator, Sequence
+from dataclasses import dataclass, field
+
+from .symbols import SymbolTable
+from .terms import (
+    Position,
+    PositionIterable,
+    Symbol,
+    Term,
+    TermLike,
+    Variable,
+    VariableMapping,
+    preorder,
+)
+
+# Signed 64-bit integers, so that offsets and ids never overflow.
+TYPECODE = "q"
+
+
+@dataclass(frozen=True, eq=False)
+class FlatTerm(TermLike):
+    """A term stored as arrays of symbol ids and subterm end offsets.
+
+    A flatterm is a view of the subterm starting at index ``start`` of its
+    arrays. Views created by ``__getitem__`` and ``subterms()`` share the arrays
+    of the flatterm they came from.
+    """
+
+    table: SymbolTable
+    symbols: array[int]
+    ends: array[int]
+    start: int = field(default=0)
+
+    @classmethod
+    def from_term(cls, term: TermLike, table: SymbolTable | None = None) -> FlatTerm:
+        """Encode a term as a flatterm.
+
+        Symbols are added to the given symbol table, or to a new table if none
+        is given.
+        """
+        if table is None:
+            table = SymbolTable()
+
+        symbols = array(
+            TYPECODE,
+            (table.add(_root_symbol(subterm)) for subterm in preorder(term)),
+        )
+        return cls(table, symbols, _compute_ends(symbols, table.arities))
+
+    def to_term(self) -> TermLike:
+        """Decode this flatterm as a ``Term`` (or a terminal symbol)."""
+        symbols = self.table.symbols
+        arities = self.table.arities
+
+        # Scan the subterm backwards, so that all children of a subterm have
+        # been built by the time we reach it. The first child ends up on top.
+        stack: list[TermLike] = []
+        for index in range(self.ends[self.start] - 1, self.start - 1, -1):
+            symbol_id = self.symbols[index]
+            arity = arities[symbol_id]
+            if arity:
+                children = tuple(stack.pop() for _ in range(arity))
+                stack.append(Term(symbols[symbol_id], children))
+            else:
+                stack.append(symbols[symbol_id])
+
+        return stack.pop()
+
+    @property
+    def root(self) -> Symbol:
+        """Return the root symbol of this flatterm."""
+        return self.table.symbols[self.symbols[self.start]]
+
+    @property
+    def children(self) -> tuple[FlatTerm, ...]:
+        """Return views of the immediate subterms of this flatterm."""
+        return tuple(self._view(index) for index in self._child_indices(self.start))
+
+    def __str__(self) -> str:
+        """Format this flatterm like the equivalent term."""
+        return str(self.to_term())
+
+    def __eq__(self, other: object) -> bool:
+        """Compare this flatterm with another, symbol by symbol."""
+        if not isinstance(other, FlatTerm):
+            return NotImplemented
+        if len(self) != len(other):
+            return False
+        if self.table is other.table:
+            return self._slice() == other._slice()
+        return self._symbol_sequence() == other._symbol_sequence()
+
+    def __hash__(self) -> int:
+        return hash(self._symbol_sequence())
+
+    def __getitem__(self, position: PositionIterable) -> FlatTerm:
+        """Get a view of the subterm at the specified position.
+
+        Accessing an invalid position raises a ``KeyError``, like ``Term``.
+        """
+        position_copy: Position = tuple(position)
+        arities = self.table.arities
+
+        current = self.start
+        for index in position_copy:
+            if not 0 <= index < arities[self.symbols[current]]:
+                raise KeyError(f"Invalid position: {position_copy}")
+
+            current += 1
+            for _ in range(index):
+                current = self.ends[current]
+
+        return self._view(current)
+
+    def __len__(self) -> int:
+        """Return the number of positions in this flatterm."""
+        return self.ends[self.start] - self.start
+
+    @property
+    def depth(self) -> int:
+        """Return the length of the longest position in this flatterm."""
+        # Stack of the ends of the enclosing subterms of the current index.
+        open_ends: list[int] = []
+        depth = 0
+        for index in range(self.start, self.ends[self.start]):
+            while open_ends and index >= open_ends[-1]:
+                open_ends.pop()
+            depth = max(depth, len(open_ends))
+            if self.ends[index] > index + 1:
+                open_ends.append(self.ends[index])
+        return depth
+
+    def subterms(self) -> Iterator[tuple[Position, FlatTerm]]:
+        """Return an iterator over positions and subterms, in pre-order."""
+        for position, index in self._walk():
+            yield (position, self._view(index))
+
+    def positions(self) -> Iterator[Position]:
+        """Return an iterator over the positions in this flatterm, in pre-order."""
+        for position, _index in self._walk():
+            yield position
+
+    def _variables(self) -> Iterator[Variable]:
+        symbols = self.table.symbols
+        for symbol_id in self._slice():
+            symbol = symbols[symbol_id]
+            if isinstance(symbol, Variable):
+                yield symbol
+
+    def _substitute(self, mapping: VariableMapping) -> FlatTerm:
+        table = self.table
+        result = array(TYPECODE)
+        encoded: dict[int, array[int]] = {}
+
+        for symbol_id in self._slice():
+            symbol = table.symbols[symbol_id]
+            if isinstance(symbol, Variable) and symbol in mapping:
+                if symbol_id not in encoded:
+                    replacement = mapping[symbol]
+                    if not isinstance(replacement, FlatTerm):
+                        replacement = FlatTerm.from_term(replacement, table)
+                    elif replacement.table is not table:
+                        replacement = FlatTerm.from_term(replacement.to_term(), table)
+                    encoded[symbol_id] = replacement._slice()
+                result.extend(encoded[symbol_id])
+            else:
+                result.append(symbol_id)
+
+        return FlatTerm(table, result, _compute_ends(result, table.arities))
+
+    def _view(self, index: int) -> FlatTerm:
+        return FlatTerm(self.table, self.symbols, self.ends, index)
+
+    def _slice(self) -> array[int]:
+        return self.symbols[self.start : self.ends[self.start]]
+
+    def _symbol_sequence(self) -> tuple[object, ...]:
+        symbols = self.table.symbols
+        return tuple(symbols[symbol_id] for symbol_id in self._slice())
+
+    def _child_indices(self, index: int) -> Iterator[int]:
+        end = self.ends[index]
+        child = index + 1
+        while child < end:
+            yield child
+            child = self.ends[child]
+
+    def _walk(self) -> Iterator[tuple[Position, int]]:
+        # Each frame holds the end of an enclosing subterm, its position, and
+        # the index of its next child.
+        frames: list[tuple[int, Position, int]] = []
+
+        for index in range(self.start, self.ends[self.start]):
+            while frames and index >= frames[-1][0]:
+                frames.pop()
+
+            if frames:
+                end, parent_position, child_index = frames[-1]
+                frames[-1] = (end, parent_position, child_index + 1)
+                position = (*parent_position, child_index)
+            else:
+                position = ()
+
+            yield (position, index)
+
+            if self.ends[index] > index + 1:
+                frames.append((self.ends[index], position, 0))
+
+
+def _root_symbol(term: TermLike) -> Symbol:
+    """Return the root symbol of a term, or the term itself if it is a symbol."""
+    if isinstance(term, Term):
+        return term.root
+    if isinstance(term, Symbol):
+        return term
+    raise TypeError(f"object of type {type(term).__name__} is not a term or a symbol")
+
+
+def _compute_ends(symbols: array[int], arities: Sequence[int]) -> array[int]:
+    """Compute the end offsets for an array of pre-order symbol ids.
+
+    The array is scanned backwards, so the ends of all children of a subterm
+    are known when it is reached, and the end of a subterm is found by hopping
+    over its children. Each entry is hopped over once, by its parent.
+    """
+    ends = array(TYPECODE, bytes(len(symbols) * array(TYPECODE).itemsize))
+    for index in range(len(symbols) - 1, -1, -1):
+        end = index + 1
+        for _ in range(arities[symbols[index]]):
+            end = ends[end]
+        ends[index] = end
+    return ends
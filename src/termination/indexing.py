@@ -0,0 +1,185 @@
+"""Module for term indexing.
+
+A term index stores terms together with payloads (for example, rewrite rules
+keyed on their left-hand sides), and retrieves the payloads of stored terms that
+are candidates for a given query term. Retrieval is a filter: every payload
+whose term is a generalization (an instance, or unifiable) is returned, but
+some other payloads may be returned as well, so a full match (or instance
+check, or unification) should still be run on the candidates::
+
+    index = DiscriminationTree()
+    index.insert(f(x, a), "rule 1")
+    index.insert(f(b, y), "rule 2")
+
+    set(index.generalizations(f(b, a)))  # {"rule 1", "rule 2"}
+    set(index.generalizations(f(c, a)))  # {"rule 1"}
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+
+from .terms import Function, Term, TermLike, Variable, preorder
+
+
+@dataclass(slots=True)
+class _Node[V]:
+    children: dict[object, _Node[V]] = field(default_factory=dict)
+    entries: list[tuple[TermLike, V]] = field(default_factory=list)
+
+
+class _Wildcard:
+    """The key standing for any variable in a discrimination tree."""
+
+    def __repr__(self) -> str:
+        return "*"
+
+
+WILDCARD = _Wildcard()
+
+
+class DiscriminationTree[V]:
+    """A discrimination tree of terms with payloads.
+
+    Each stored term is keyed on the pre-order sequence of its symbols, with all
+    variables replaced by a single wildcard, and the tree shares common prefixes
+    of the keys. Queries walk the tree and the query term in lockstep, skipping
+    over whole subterms where a wildcard matches.
+
+    Because variables are not distinguished, the tree does not check that
+    repeated variables are bound consistently: ``f(x, x)`` is a candidate
+    generalization of ``f(a, b)``. Apart from that, the candidates are exact.
+    """
+
+    def __init__(self) -> None:
+        self._root: _Node[V] = _Node()
+        self._size = 0
+
+    def __len__(self) -> int:
+        """Return the number of entries in this index."""
+        return self._size
+
+    def insert(self, term: TermLike, value: V) -> None:
+        """Store a value under the given term.
+
+        The same term may be stored several times, with different values or
+        the same one.
+        """
+        node = self._root
+        for key in _keys(term):
+            child = node.children.get(key)
+            if child is None:
+                child = node.children[key] = _Node()
+            node = child
+        node.entries.append((term, value))
+        self._size += 1
+
+    def remove(self, term: TermLike, value: V) -> None:
+        """Remove one entry with the given term and value, or raise KeyError."""
+        path = [self._root]
+        for key in _keys(term):
+            child = path[-1].children.get(key)
+            if child is None:
+                raise KeyError((term, value))
+            path.append(child)
+
+        entries = path[-1].entries
+        for index, (entry_term, entry_value) in enumerate(entries):
+            if entry_term == term and entry_value == value:
+                del entries[index]
+                break
+        else:
+            raise KeyError((term, value))
+        self._size -= 1
+
+        # Prune nodes that no longer lead to any entry.
+        keys = list(_keys(term))
+        while len(path) > 1 and not path[-1].entries and not path[-1].children:
+            path.pop()
+            del path[-1].children[keys[len(path) - 1]]
+
+    def generalizations(self, query: TermLike) -> Iterator[V]:
+        """Return the values of candidate generalizations of the query.
+
+        These are the stored terms that might match the query when used as a
+        pattern, as needed to find the rewrite rules applicable to a term.
+        """
+        return self._retrieve(query, query_wildcards=False, stored_wildcards=True)
+
+    def instances(self, query: TermLike) -> Iterator[V]:
+        """Return the values of candidate instances of the query.
+
+        These are the stored terms that the query might match when used as a
+        pattern, as needed for subsumption checks.
+        """
+        return self._retrieve(query, query_wildcards=True, stored_wildcards=False)
+
+    def unifiable(self, query: TermLike) -> Iterator[V]:
+        """Return the values of candidate stored terms unifiable with the query.
+
+        Stored terms and the query are assumed not to share variables.
+        """
+        return self._retrieve(query, query_wildcards=True, stored_wildcards=True)
+
+    def _retrieve(
+        self, query: TermLike, *, query_wildcards: bool, stored_wildcards: bool
+    ) -> Iterator[V]:
+        keys = list(_keys(query))
+        ends = _ends(keys)
+        length = len(keys)
+
+        # Each stack entry holds a node of the tree, the index of the next key
+        # in the query, and the number of stored subterms still to be skipped
+        # (because a variable in the query matches them) before continuing.
+        stack: list[tuple[_Node[V], int, int]] = [(self._root, 0, 0)]
+        while stack:
+            node, index, skip = stack.pop()
+
+            if skip:
+                for key, child in node.children.items():
+                    stack.append((child, index, skip - 1 + _arity(key)))
+                continue
+
+            if index == length:
+                for _term, value in node.entries:
+                    yield value
+                continue
+
+            key = keys[index]
+            if key is WILDCARD:
+                if query_wildcards:
+                    stack.append((node, index + 1, 1))
+                elif (child := node.children.get(WILDCARD)) is not None:
+                    stack.append((child, index + 1, 0))
+                continue
+
+            if (child := node.children.get(key)) is not None:
+                stack.append((child, index + 1, 0))
+            if stored_wildcards and (child := node.children.get(WILDCARD)) is not None:
+                stack.append((child, ends[index], 0))
+
+
+def _keys(term: TermLike) -> Iterator[object]:
+    for subterm in preorder(term):
+        if isinstance(subterm, Term):
+            yield subterm.root
+        elif isinstance(subterm, Variable):
+            yield WILDCARD
+        else:
+            yield subterm
+
+
+def _arity(key: object) -> int:
+    return key.arity if isinstance(key, Function) else 0
+
+
+def _ends(keys: list[object]) -> list[int]:
+    """Compute the index just past the end of the subterm starting at each key."""
+    ends = [0] * len(keys)
+    for index in range(len(keys) - 1, -1, -1):
+        end = index + 1
+        for _ in range(_arity(keys[index])):
+            end = ends[end]
+        ends[index] = end
+    return ends
@@ -0,0 +1,136 @@
+"""Module for hash-consing (interning) terms.
+
+An intern table hands out a single canonical instance for every structurally
+distinct symbol and term it has seen. Two terms obtained from the same table
+are equal exactly when they are the same object, so equality becomes an
+identity check, and identical subterms are only stored once::
+
+    table = InternTable()
+    t1 = table.apply(f, table.apply(g, a), x)
+    t2 = table.intern(f(g(a), x))
+    t1 is t2  # True
+
+Interning is opt-in: terms built directly with ``Function.__call__`` are
+ordinary terms, and remain equal to their interned counterparts.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from operator import is_
+from typing import Any
+from weakref import WeakValueDictionary
+
+from .terms import Function, Symbol, Term, TermLike
+
+type TermKey = tuple[Any, ...]
+
+
+@dataclass
+class InternTable:
+    """A table of canonical symbols and terms.
+
+    Symbols are kept alive for the lifetime of the table. Terms are held
+    weakly, keyed on their root symbol and the identities of their (canonical)
+    children, so a canonical term is dropped from the table as soon as nothing
+    else refers to it.
+    """
+
+    symbols: dict[Symbol, Symbol] = field(default_factory=dict)
+    terms: WeakValueDictionary[TermKey, Term] = field(
+        default_factory=WeakValueDictionary
+    )
+
+    def __len__(self) -> int:
+        """Return the number of live canonical terms in this table."""
+        return len(self.terms)
+
+    def __contains__(self, value: TermLike) -> bool:
+        """Return whether the given object is a canonical instance of this table."""
+        if isinstance(value, Term):
+            return self.terms.get(self._key(value.root, value.children)) is value
+        return self.symbols.get(value) is value
+
+    def symbol[S: Symbol](self, symbol: S) -> S:
+        """Return the canonical instance of the given symbol."""
+        return self.symbols.setdefault(symbol, symbol)
+
+    def apply(self, root: Function, *children: TermLike) -> Term:
+        """Return the canonical term with the given root and children.
+
+        This is the interning counterpart of calling the function symbol
+        directly. The children are interned first if they are not already
+        canonical.
+        """
+        return self._make(
+            self.symbol(root), tuple(self.intern(child) for child in children)
+        )
+
+    def intern(self, value: TermLike) -> TermLike:
+        """Return the canonical instance of the given symbol or term.
+
+        Terms are interned bottom-up without recursion, so arbitrarily deep
+        terms are supported. Subterms that are already canonical are reused
+        as-is, and if the given term is not in the table yet it becomes the
+        canonical instance itself whenever its children were already canonical.
+        """
+        if not isinstance(value, Term):
+            return self.symbol(value)
+        if value in self:
+            return value
+
+        # Map from id() of an original subterm to its canonical instance. The
+        # originals are kept alive by ``value`` for the duration of the call.
+        done: dict[int, TermLike] = {}
+        stack: list[Term] = [value]
+
+        while stack:
+            term = stack[-1]
+            if id(term) in done:
+                stack.pop()
+                continue
+            if term in self:
+                done[id(term)] = stack.pop()
+                continue
+
+            pending = [
+                child
+                for child in term.children
+                if isinstance(child, Term) and id(child) not in done
+            ]
+            if pending:
+                stack.extend(pending)
+                continue
+
+            stack.pop()
+            children = tuple(
+                done[id(child)] if isinstance(child, Term) else self.intern(child)
+                for child in term.children
+            )
+            done[id(term)] = self._make(self.symbol(term.root), children, term)
+
+        return done[id(value)]
+
+    def _make(
+        self,
+        root: Function,
+        children: tuple[TermLike, ...],
+        original: Term | None = None,
+    ) -> Term:
+        key = self._key(root, children)
+        term = self.terms.get(key)
+        if term is None:
+            if (
+                original is not None
+                and original.root is root
+                and all(map(is_, original.children, children))
+            ):
+                term = original
+            else:
+                term = Term(root=root, children=children)
+            self.terms[key] = term
+        return term
+
+    @staticmethod
+    def _key(root: Function, children: tuple[TermLike, ...]) -> TermKey:
+        return (root, *map(id, children))
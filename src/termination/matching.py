@@ -0,0 +1,133 @@
+"""Module for one-way matching of patterns against terms.
+
+A pattern ``p`` matches a subject ``s`` if there is a substitution ``u`` with
+``u(p) == s``. Unlike unification, only the variables of the pattern are bound;
+variables in the subject are treated like constants::
+
+    match(f(x, g(y)), f(a, g(b)))  # {?x -> a, ?y -> b}
+    match(f(x, x), f(a, b))  # None
+
+When the same pattern is matched against many subjects, as with the left-hand
+side of a rewrite rule, it can be compiled once into a specialized matcher::
+
+    matcher = compile_pattern(f(x, g(y)))
+    matcher(f(a, g(b)))  # {?x -> a, ?y -> b}
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass, field
+
+from .terms import Substitution, Term, TermLike, Variable
+
+
+def match(pattern: TermLike, subject: TermLike) -> Substitution | None:
+    """Return the substitution matching a pattern to a subject, or None."""
+    bindings: dict[Variable, TermLike] = {}
+
+    stack = [(pattern, subject)]
+    while stack:
+        pattern_term, subject_term = stack.pop()
+
+        if isinstance(pattern_term, Variable):
+            bound = bindings.setdefault(pattern_term, subject_term)
+            if bound is not subject_term and bound != subject_term:
+                return None
+        elif isinstance(pattern_term, Term) and not pattern_term.is_ground:
+            if (
+                not isinstance(subject_term, Term)
+                or pattern_term.root != subject_term.root
+            ):
+                return None
+            stack.extend(zip(pattern_term.children, subject_term.children))
+        elif pattern_term is not subject_term and pattern_term != subject_term:
+            return None
+
+    return Substitution(mapping=bindings)
+
+
+@dataclass(frozen=True)
+class Matcher:
+    """A pattern compiled into a specialized matching function.
+
+    Calling a matcher with a subject is equivalent to ``match(pattern,
+    subject)``. The generated Python source is kept for inspection.
+    """
+
+    pattern: TermLike
+    source: str = field(repr=False, compare=False)
+    function: Callable[[TermLike], Substitution | None] = field(
+        repr=False, compare=False
+    )
+
+    def __call__(self, subject: TermLike) -> Substitution | None:
+        """Return the substitution matching the pattern to a subject, or None."""
+        return self.function(subject)
+
+
+def compile_pattern(pattern: TermLike) -> Matcher:
+    """Compile a pattern into a matcher.
+
+    The pattern is unrolled into straight-line Python code, with one local
+    variable per subterm of the subject that the pattern inspects. The code
+    checks the root symbol of each non-ground subterm and unpacks its children,
+    compares ground subterms of the pattern with the subject as a whole, and
+    collects the subterms that the pattern variables are bound to, with an
+    equality check for every repeated occurrence of a variable.
+    """
+    namespace: dict[str, object] = {"Term": Term, "Substitution": Substitution}
+    lines = ["def match(s0):"]
+    bindings: dict[Variable, str] = {}
+
+    def constant(value: object) -> str:
+        name = f"k{len(namespace)}"
+        namespace[name] = value
+        return name
+
+    # Each stack entry holds a subterm of the pattern and the name of the local
+    # variable holding the corresponding subterm of the subject.
+    next_local = 1
+    stack: list[tuple[TermLike, str]] = [(pattern, "s0")]
+    while stack:
+        pattern_term, local = stack.pop()
+
+        if isinstance(pattern_term, Variable):
+            if pattern_term in bindings:
+                bound = bindings[pattern_term]
+                lines.append(f"    if {local} is not {bound} and {local} != {bound}:")
+                lines.append("        return None")
+            else:
+                bindings[pattern_term] = local
+        elif isinstance(pattern_term, Term) and not pattern_term.is_ground:
+            root = constant(pattern_term.root)
+            lines.append(
+                f"    if not isinstance({local}, Term) or"
+                f" ({local}.root is not {root} and {local}.root != {root}):"
+            )
+            lines.append("        return None")
+
+            arity = len(pattern_term.children)
+            children = [f"s{next_local + index}" for index in range(arity)]
+            next_local += arity
+            lines.append(f"    {', '.join(children)}, = {local}.children")
+            stack.extend(reversed(list(zip(pattern_term.children, children))))
+        else:
+            value = constant(pattern_term)
+            lines.append(f"    if {local} is not {value} and {local} != {value}:")
+            lines.append("        return None")
+
+    mapping = ", ".join(
+        f"{constant(variable)}: {local}" for (variable, local) in bindings.items()
+    )
+    lines.append(f"    return Substitution(mapping={{{mapping}}})")
+
+    source = "\n".join(lines) + "\n"
+    # The source is built only from fixed code and the local and constant
+    # names generated above. Symbols and ground subterms of the pattern are
+    # passed in through the namespace, and never formatted into the source, so
+    # no text from the pattern (like a symbol's name) reaches exec.
+    exec(compile(source, "<matcher>", "exec"), namespace)
+    function = namespace["match"]
+    assert callable(function)
+    return Matcher(pattern=pattern, source=source, function=function)
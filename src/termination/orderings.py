@@ -26,10 +26,14 @@ common style in term rewriting.
 
 from __future__ import annotations
 
+import builtins
+import heapq
 from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import Callable, Hashable, Iterable, Mapping, Sequence
 from dataclasses import dataclass
-from functools import wraps
-from typing import Any, Protocol
+from functools import cached_property, update_wrapper
+from typing import Any, Concatenate, Protocol, overload
 
 
 class Comparable(Protocol):
@@ -46,18 +50,62 @@ class Comparable(Protocol):
         pass
 
 
-class ConstructorFn[T, C](Protocol):
-    def __call__(self, value: T, /, **kwargs) -> C: ...
+class StrictOrder[T](Protocol):
+    """A strict partial order on values, together with its equivalence."""
 
+    def greater(self, left: T, right: T, /) -> bool: ...
 
-class OrderingFn[T, C](Protocol):
+    def equivalent(self, left: T, right: T, /) -> bool: ...
+
+
+@dataclass(frozen=True)
+class OrderKey[T]:
+    """A comparable value that compares using a strict order.
+
+    This is a convenient comparable for ordering functions whose ordering is
+    not a key function but a comparison, like the orderings on terms::
+
+        @ordering
+        def my_ord(value, **kwargs):
+            return OrderKey(order=MyOrder(**kwargs), value=value)
+
+    Values that are neither greater than nor equivalent to each other are
+    incomparable, so all four comparisons may be false.
+    """
+
+    order: StrictOrder[T]
+    value: T
+
+    def __lt__(self, other: OrderKey[T]) -> bool:
+        return self.order.greater(other.value, self.value)
+
+    def __le__(self, other: OrderKey[T]) -> bool:
+        return self.order.equivalent(other.value, self.value) or self.order.greater(
+            other.value, self.value
+        )
+
+    def __gt__(self, other: OrderKey[T]) -> bool:
+        return self.order.greater(self.value, other.value)
+
+    def __ge__(self, other: OrderKey[T]) -> bool:
+        return self.order.equivalent(self.value, other.value) or self.order.greater(
+            self.value, other.value
+        )
+
+
+# Constructors take the value and any keyword arguments, which may be required
+# or have defaults, so their signatures are not checked beyond the value.
+type ConstructorFn[T, C] = Callable[Concatenate[T, ...], C]
+
+
+class OrderingFn[T, C: Comparable](Protocol):
     def __call__(self, value: T, /, **kwargs) -> AbstractOrderedValue[T, C]: ...
 
 
 type ComparisonRHS[T] = T | AbstractOrderedValue[T, Any]
 
 
-class AbstractOrderedValue[T, C](ABC):
+class AbstractOrderedValue[T, C: Comparable](ABC):
     @property
     @abstractmethod
     def value(self) -> T: ...
@@ -97,25 +145,345 @@ class AbstractOrderedValue[T, C](ABC):
         return right
 
 
-def ordering[T, C: Comparable](constructor: ConstructorFn[T, C]) -> OrderingFn[T, C]:
+@dataclass(eq=False)
+class OrderedValue[T, C: Comparable](AbstractOrderedValue[T, C]):
+    """A value wrapped by an ordering function, with its arguments.
+
+    The comparable for the wrapped value is constructed at most once per
+    ordered value, however many comparisons it takes part in.
+    """
+
+    function: OrderingFunction[T, C]
+    # The value is stored under another name, since a field named after the
+    # abstract property would not implement it.
+    wrapped: T
+    kwargs: dict[str, Any]
+
+    @property
+    def value(self) -> T:
+        return self.wrapped
+
+    @cached_property
+    def _comparable(self) -> C:
+        return self._construct_comparable(self.wrapped)
+
+    @cached_property
+    def _kwargs_key(self) -> Hashable:
+        return _kwargs_key(self.kwargs)
+
+    def _construct_comparable(self, value: T) -> C:
+        return self.function._lookup(value, self.kwargs, self._kwargs_key)
+
+    def _evaluate_left(self) -> C:
+        return self._comparable
+
+    def _evaluate_right(self, right: ComparisonRHS[T]) -> C:
+        if (
+            isinstance(right, OrderedValue)
+            and right.function is self.function
+            and right.kwargs == self.kwargs
+        ):
+            return right._comparable
+        return super()._evaluate_right(right)
+
+
+class OrderingFunction[T, C: Comparable]:
+    """An ordering function, as created by ``ordering()``.
+
+    If the ordering function has a cache, comparables are memoized per value
+    and keyword arguments, keeping the ``cache_size`` most recently used ones.
+    Keyword arguments are frozen to make the key, once per ordered value or
+    batch, with mappings, sets and sequences frozen recursively; values or
+    arguments that are still not hashable are not cached. Values without
+    keyword arguments are their own keys.
+
+    If the ordering is ``partial``, some values may be incomparable, and the
+    batch methods use algorithms that do not assume otherwise.
+    """
+
+    def __init__(
+        self,
+        constructor: ConstructorFn[T, C],
+        *,
+        cache_size: int | None = None,
+        partial: bool = False,
+    ) -> None:
+        if cache_size is not None and cache_size < 1:
+            raise ValueError(f"Cache size must be positive: {cache_size}")
+
+        update_wrapper(self, constructor)
+        self.constructor = constructor
+        self.cache_size = cache_size
+        self.partial = partial
+        # Keys are values or frozen arguments, which may turn out not to be
+        # hashable when they are looked up.
+        self._cache: OrderedDict[Any, C] = OrderedDict()
+
+    def __call__(self, value: T, /, **kwargs: Any) -> OrderedValue[T, C]:
+        """Wrap a value, to be compared using this ordering function."""
+        return OrderedValue(function=self, wrapped=value, kwargs=kwargs)
+
+    def comparable(self, value: T, /, **kwargs: Any) -> C:
+        """Return the comparable for a value, from the cache if possible."""
+        if self.cache_size is None:
+            return self.constructor(value, **kwargs)
+        return self._lookup(value, kwargs, _kwargs_key(kwargs))
+
+    def _comparables(self, kwargs: dict[str, Any]) -> Callable[[T], C]:
+        """Return a function for the comparables of values with the same kwargs.
+
+        The keyword arguments are frozen once, for all the values.
+        """
+        if self.cache_size is None:
+            return lambda value: self.constructor(value, **kwargs)
+        kwargs_key = _kwargs_key(kwargs)
+        return lambda value: self._lookup(value, kwargs, kwargs_key)
+
+    def _lookup(self, value: T, kwargs: dict[str, Any], kwargs_key: Hashable) -> C:
+        """Return the comparable for a value, with kwargs already frozen."""
+        if self.cache_size is None or kwargs_key is _UNHASHABLE:
+            return self.constructor(value, **kwargs)
+
+        # Without keyword arguments, the value itself is the key.
+        key = value if kwargs_key is None else (_KWARGS, value, kwargs_key)
+        try:
+            comparable = self._cache.get(key)
+        except TypeError:
+            return self.constructor(value, **kwargs)
+
+        if comparable is None:
+            comparable = self._cache[key] = self.constructor(value, **kwargs)
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        else:
+            self._cache.move_to_end(key)
+        return comparable
+
+    def precompute(self, values: Iterable[T], /, **kwargs: Any) -> None:
+        """Construct and cache the comparables for a batch of values.
+
+        If there are more values than fit in the cache, only the last ones are
+        kept. Does nothing if this ordering function has no cache.
+        """
+        if self.cache_size is None:
+            return
+        comparable = self._comparables(kwargs)
+        for value in values:
+            comparable(value)
+
+    def cache_clear(self) -> None:
+        """Remove all cached comparables."""
+        self._cache.clear()
+
+    def sort(
+        self, values: Iterable[T], /, *, reverse: bool = False, **kwargs: Any
+    ) -> list[T]:
+        """Return the values sorted from smallest to greatest.
+
+        The comparable of each value is constructed once. If the ordering is
+        partial, the result is a linear extension of it: no value comes after
+        a smaller one, and incomparable values keep their relative order where
+        possible. Raises ``ValueError`` if the comparables are not ordered
+        consistently.
+        """
+        value_list = list(values)
+        keys = list(map(self._comparables(kwargs), value_list))
+
+        if self.partial:
+            indexes = _linear_extension(keys)
+            if reverse:
+                indexes.reverse()
+        else:
+            indexes = sorted(range(len(keys)), key=keys.__getitem__, reverse=reverse)
+
+        return [value_list[index] for index in indexes]
+
+    def min(self, values: Iterable[T], /, **kwargs: Any) -> T:
+        """Return a smallest value, or raise ``ValueError`` if there are none.
+
+        If the ordering is partial, this is a minimal value: no other value is
+        smaller than it.
+        """
+        return self._select(values, kwargs, greatest=False)
+
+    def max(self, values: Iterable[T], /, **kwargs: Any) -> T:
+        """Return a greatest value, or raise ``ValueError`` if there are none.
+
+        If the ordering is partial, this is a maximal value: no other value is
+        greater than it.
+        """
+        return self._select(values, kwargs, greatest=True)
+
+    def nsmallest(self, count: int, values: Iterable[T], /, **kwargs: Any) -> list[T]:
+        """Return the ``count`` smallest values, from smallest to greatest.
+
+        If the ordering is partial, the result is the start of a linear
+        extension, found by repeatedly selecting a minimal value, so each
+        value is compared at most ``count`` times.
+        """
+        comparable = self._comparables(kwargs)
+        if not self.partial:
+            return heapq.nsmallest(count, values, key=comparable)
+
+        remaining = [(comparable(value), value) for value in values]
+        result: list[T] = []
+        while remaining and len(result) < count:
+            index = _minimal(key for (key, _value) in remaining)
+            result.append(remaining.pop(index)[1])
+        return result
+
+    def _select(
+        self, values: Iterable[T], kwargs: dict[str, Any], *, greatest: bool
+    ) -> T:
+        comparable = self._comparables(kwargs)
+        decorated = [(comparable(value), value) for value in values]
+        if not decorated:
+            raise ValueError("Cannot select from an empty collection")
+
+        keys = (key for (key, _value) in decorated)
+        if self.partial:
+            index = _maximal(keys) if greatest else _minimal(keys)
+        else:
+            key_list = list(keys)
+            select = builtins.max if greatest else builtins.min
+            index = select(range(len(key_list)), key=key_list.__getitem__)
+        return decorated[index][1]
+
+
+def _minimal(keys: Iterable[Comparable]) -> int:
+    """Return the index of a minimal key under a strict partial order.
+
+    Every key that replaces the candidate is smaller than it, so by
+    transitivity no key seen earlier can be smaller than the final candidate.
+    """
+    index = 0
+    candidate = None
+    for current, key in enumerate(keys):
+        if candidate is None or key < candidate:
+            index, candidate = current, key
+    return index
+
+
+def _maximal(keys: Iterable[Comparable]) -> int:
+    """Return the index of a maximal key under a strict partial order."""
+    index = 0
+    candidate = None
+    for current, key in enumerate(keys):
+        if candidate is None or key > candidate:
+            index, candidate = current, key
+    return index
+
+
+def _linear_extension(keys: Sequence[Comparable]) -> list[int]:
+    """Return the indexes of the keys in an order compatible with theirs.
+
+    This is a topological sort of the strict partial order, which takes a
+    quadratic number of comparisons. Among the keys that are ready at each
+    step, the one with the lowest index is chosen, so the sort is stable.
+    """
+    successors: list[list[int]] = [[] for _ in keys]
+    predecessors = [0] * len(keys)
+    for index, key in enumerate(keys):
+        for other in range(index + 1, len(keys)):
+            if key < keys[other]:
+                successors[index].append(other)
+                predecessors[other] += 1
+            elif keys[other] < key:
+                successors[other].append(index)
+                predecessors[index] += 1
+
+    ready = [index for (index, count) in enumerate(predecessors) if count == 0]
+    order: list[int] = []
+    while ready:
+        index = heapq.heappop(ready)
+        order.append(index)
+        for successor in successors[index]:
+            predecessors[successor] -= 1
+            if predecessors[successor] == 0:
+                heapq.heappush(ready, successor)
+
+    if len(order) < len(keys):
+        raise ValueError("Comparables are not a strict partial order")
+    return order
+
+
+# Marks the cache keys of values with keyword arguments, and stands for keyword
+# arguments that cannot be frozen.
+_KWARGS = object()
+_UNHASHABLE = object()
+
+
+def _kwargs_key(kwargs: dict[str, Any]) -> Hashable:
+    """Return the frozen keyword arguments, None if there are none."""
+    if not kwargs:
+        return None
+    try:
+        return _freeze(kwargs)
+    except TypeError:
+        return _UNHASHABLE
+
+
+def _freeze(value: Any) -> Hashable:
+    # Containers are tagged with their type, so that different kinds of
+    # container with the same items (like a list and a tuple) get different
+    # keys.
+    if isinstance(value, Mapping):
+        items = frozenset((key, _freeze(item)) for (key, item) in value.items())
+        return (type(value), items)
+    if isinstance(value, set | frozenset):
+        return (type(value), frozenset(value))
+    if isinstance(value, list | tuple):
+        return (type(value), tuple(_freeze(item) for item in value))
+    hash(value)
+    return value
+
+
+@overload
+def ordering[T, C: Comparable](
+    constructor: ConstructorFn[T, C], /
+) -> OrderingFunction[T, C]: ...
+
+
+@overload
+def ordering[T, C: Comparable](
+    *, cache_size: int | None = None, partial: bool = False
+) -> Callable[[ConstructorFn[T, C]], OrderingFunction[T, C]]: ...
+
+
+def ordering[T, C: Comparable](
+    constructor: ConstructorFn[T, C] | None = None,
+    /,
+    *,
+    cache_size: int | None = None,
+    partial: bool = False,
+) -> OrderingFunction[T, C] | Callable[[ConstructorFn[T, C]], OrderingFunction[T, C]]:
     """Decorate a function to create an ordering function.
 
     The decorated function should take a single positional argument and any
     number of keyword arguments, and return something comparable. After
     decoration, the resulting function will behave as an ordering function, as
     described in the module docstring.
-    """
 
-    @dataclass
-    class OrderedValue(AbstractOrderedValue[T, C]):
-        value: T
-        kwargs: dict[str, Any]
+    To cache comparables that are expensive to construct, pass a cache size::
+
+        @ordering(cache_size=4096)
+        def my_ord(value, **kwargs): ...
 
-        def _construct_comparable(self, value: T) -> C:
-            return constructor(value, **self.kwargs)
+        my_ord.precompute(values, foo=42)
+
+    Ordering functions also sort and select values in batches, constructing
+    each comparable once::
+
+        my_ord.sort(values, foo=42)
+        my_ord.nsmallest(10, values, foo=42)
+
+    Pass ``partial=True`` if some values may be incomparable, so that these
+    use topological sorting and minimal-element selection instead.
+    """
 
-    @wraps(constructor)
-    def wrapped_constructor(value: T, **kwargs: Any) -> OrderedValue:
-        return OrderedValue(value=value, kwargs=kwargs)
+    def decorate(constructor: ConstructorFn[T, C]) -> OrderingFunction[T, C]:
+        return OrderingFunction(constructor, cache_size=cache_size, partial=partial)
 
-    return wrapped_constructor
+    if constructor is None:
+        return decorate
+    return decorate(constructor)
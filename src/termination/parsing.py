@@ -0,0 +1,454 @@
+"""Module for parsing terms and rewrite systems from text.
+
+Terms are written in the syntax that ``str()`` produces. Variables start with
+a question mark, and may have an index after a hash sign. A name without
+arguments is a constant::
+
+    parse_term("f(g(c), ?x, ?y#2)")
+    parse_rule("add(s(?x), ?y) -> s(add(?x, ?y))")
+
+Rewrite systems are read from the two standard problem formats: the TPDB
+format (``.trs`` files), and the ARI format (``.ari`` files) of the
+termination competition. Rules are read lazily, line by line, so large files
+and whole problem databases can be streamed::
+
+    for rule in load_rules("problems/add.trs"):
+        ...
+
+Given a signature, the symbols that are read are interned into its symbol
+table and the variables come from its variable pool, so that parsed terms
+share the signature's symbol instances::
+
+    class Peano(Signature):
+        zero = constant()
+        s = arity(1)
+
+    peano = Peano()
+    parse_term("s(zero)", signature=peano).root is peano.s  # True
+
+The parsers keep their own stacks instead of recursing, so there is no limit
+on the depth of the terms they read.
+"""
+
+from __future__ import annotations
+
+import re
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass
+from enum import Enum, auto
+from os import PathLike
+from pathlib import Path
+
+from .rewriting import Rule
+from .signatures import Signature, symbol_table, variable_pool
+from .symbols import SymbolTable
+from .terms import Constant, Function, IndexedVariable, Term, TermLike, Variable
+
+
+class ParseError(ValueError):
+    """Error raised for text that cannot be parsed.
+
+    The line and column (both starting from 1) locate the error in the text.
+    """
+
+    def __init__(self, message: str, line: int, column: int) -> None:
+        super().__init__(f"{message} (line {line}, column {column})")
+        self.line = line
+        self.column = column
+
+
+class Format(Enum):
+    """Formats of rewrite system problems."""
+
+    TPDB = auto()
+    ARI = auto()
+
+
+def parse_term(text: str, *, signature: Signature | None = None) -> TermLike:
+    """Parse a term written in the syntax that ``str()`` produces."""
+    tokens = _Tokens(_tokenize(text.splitlines(), _APPLICATION_TOKEN))
+    term = _parse_application(tokens, _Builder(signature), _no_names)
+    tokens.expect(_Kind.END)
+    return term
+
+
+def parse_rule(text: str, *, signature: Signature | None = None) -> Rule:
+    """Parse a rule written in the syntax that ``str()`` produces."""
+    tokens = _Tokens(_tokenize(text.splitlines(), _APPLICATION_TOKEN))
+    rule = _tpdb_rule(tokens, _Builder(signature), _no_names)
+    tokens.expect(_Kind.END)
+    return rule
+
+
+def iter_rules(
+    lines: Iterable[str],
+    *,
+    format: Format = Format.TPDB,
+    signature: Signature | None = None,
+) -> Iterator[Rule]:
+    """Return an iterator over the rules of a problem, read lazily from lines.
+
+    The lines can be any iterable of strings, including an open text file. A
+    string is split into lines first.
+
+    Only unconditional rules of plain rewrite systems are supported. Other
+    sections (comments, strategies and such) are skipped.
+    """
+    if isinstance(lines, str):
+        lines = lines.splitlines()
+
+    builder = _Builder(signature)
+    if format is Format.ARI:
+        tokens = _Tokens(_tokenize(lines, _SEXPR_TOKEN))
+        return _ari_rules(tokens, builder)
+
+    tokens = _Tokens(_tokenize(lines, _APPLICATION_TOKEN))
+    return _tpdb_rules(tokens, builder)
+
+
+def load_rules(
+    path: str | PathLike[str],
+    *,
+    format: Format | None = None,
+    signature: Signature | None = None,
+) -> Iterator[Rule]:
+    """Return an iterator over the rules of a problem file, read lazily.
+
+    Without a format, files ending in ``.ari`` are read in the ARI format and
+    all others in the TPDB format. The file is closed once the iterator is
+    exhausted or closed.
+    """
+    path = Path(path)
+    if format is None:
+        format = Format.ARI if path.suffix == ".ari" else Format.TPDB
+
+    with path.open(encoding="utf-8") as file:
+        yield from iter_rules(file, format=format, signature=signature)
+
+
+class _Kind(Enum):
+    OPEN = auto()
+    CLOSE = auto()
+    COMMA = auto()
+    ARROW = auto()
+    VARIABLE = auto()
+    NAME = auto()
+    OTHER = auto()
+    END = auto()
+
+
+@dataclass(frozen=True, slots=True)
+class _Token:
+    kind: _Kind
+    text: str
+    line: int
+    column: int
+
+    def error(self, message: str) -> ParseError:
+        found = "end of input" if self.kind is _Kind.END else repr(self.text)
+        return ParseError(f"{message}, found {found}", self.line, self.column)
+
+
+# Tokens of the application syntax shared by str() and the TPDB format. Names
+# extend up to whitespace, punctuation, or an arrow, so that rules like
+# 'f(x)->x' need no spaces. The arrow group also matches the '->=' of relative
+# rules and the '==' of equations, which are rejected by the parser.
+_APPLICATION_TOKEN = re.compile(
+    r"""
+    \s*(?:
+        (?P<OPEN>\()
+      | (?P<CLOSE>\))
+      | (?P<COMMA>,)
+      | (?P<ARROW>->=?|==)
+      | (?P<VARIABLE>\?[^\s(),#]+(?:\#\d+)?)
+      | (?P<NAME>(?:[^\s(),|"\-=]|-(?!>)|=(?!=))+)
+      | (?P<OTHER>\S)
+    )
+    """,
+    re.VERBOSE,
+)
+
+# Tokens of the ARI format, an S-expression syntax with line comments and
+# names quoted in bars.
+_SEXPR_TOKEN = re.compile(
+    r"""
+    (?:\s|;.*)*+(?:
+        (?P<OPEN>\()
+      | (?P<CLOSE>\))
+      | (?P<NAME>\|[^|]*\||[^\s();|]+)
+      | (?P<OTHER>\S)
+    )
+    """,
+    re.VERBOSE,
+)
+
+
+def _tokenize(lines: Iterable[str], pattern: re.Pattern[str]) -> Iterator[_Token]:
+    line_number = 0
+    for line_number, line in enumerate(lines, start=1):
+        position = 0
+        while match := pattern.match(line, position):
+            kind = match.lastgroup
+            if kind is None:
+                break
+            position = match.end()
+            yield _Token(_Kind[kind], match[kind], line_number, match.start(kind) + 1)
+
+    yield _Token(_Kind.END, "", line_number + 1, 1)
+
+
+class _Tokens:
+    """A stream of tokens with one token of lookahead."""
+
+    def __init__(self, tokens: Iterator[_Token]) -> None:
+        self._tokens = tokens
+        self._peeked: _Token | None = None
+
+    def peek(self) -> _Token:
+        if self._peeked is None:
+            self._peeked = next(self._tokens)
+        return self._peeked
+
+    def next(self) -> _Token:
+        token = self.peek()
+        if token.kind is not _Kind.END:
+            self._peeked = None
+        return token
+
+    def expect(self, kind: _Kind) -> _Token:
+        token = self.next()
+        if token.kind is not kind:
+            raise token.error(f"Expected {kind.name.lower()}")
+        return token
+
+
+class _Builder:
+    """Creates the symbols and terms that are read.
+
+    Every symbol is created once per parse. With a signature, symbols are
+    interned into its symbol table and variables come from its pool.
+    """
+
+    def __init__(self, signature: Signature | None) -> None:
+        self._table = SymbolTable() if signature is None else symbol_table(signature)
+        self._pool = None if signature is None else variable_pool(signature)
+        self._constants: dict[str, Constant] = {}
+        self._functions: dict[tuple[str, int], Function] = {}
+        self._variables: dict[tuple[str, int | None], Variable] = {}
+
+    def constant(self, name: str) -> Constant:
+        constant = self._constants.get(name)
+        if constant is None:
+            constant = self._table.intern(Constant(name=name))
+            self._constants[name] = constant
+        return constant
+
+    def term(self, name: str, children: list[TermLike]) -> Term:
+        key = (name, len(children))
+        function = self._functions.get(key)
+        if function is None:
+            function = self._table.intern(Function(name=name, arity=len(children)))
+            self._functions[key] = function
+        return Term(root=function, children=tuple(children))
+
+    def variable(self, name: str, index: int | None = None) -> Variable:
+        key = (name, index)
+        variable = self._variables.get(key)
+        if variable is None:
+            variable = self._create_variable(name, index)
+            self._variables[key] = variable
+        return variable
+
+    def _create_variable(self, name: str, index: int | None) -> Variable:
+        if index is None:
+            return Variable(name=name) if self._pool is None else self._pool[name]
+        if self._pool is None:
+            return IndexedVariable(name=name, index=index)
+        return self._pool.get(name, index)
+
+
+def _no_names(_: str) -> bool:
+    return False
+
+
+def _variable_token(token: _Token, builder: _Builder) -> Variable:
+    name, _, index = token.text[1:].partition("#")
+    return builder.variable(name, int(index) if index else None)
+
+
+def _parse_application(
+    tokens: _Tokens, builder: _Builder, is_variable: Callable[[str], bool]
+) -> TermLike:
+    """Parse a term in application syntax, like ``f(g(x), a)``.
+
+    Names for which ``is_variable`` holds are variables, as are tokens in
+    question mark syntax. Other names without arguments are constants.
+    """
+    # Each frame holds the name of a function application whose arguments are
+    # still being read, and the arguments read so far.
+    frames: list[tuple[str, list[TermLike]]] = []
+    while True:
+        token = tokens.next()
+        if token.kind is _Kind.VARIABLE:
+            term: TermLike = _variable_token(token, builder)
+        elif token.kind is _Kind.NAME:
+            if tokens.peek().kind is _Kind.OPEN:
+                tokens.next()
+                if tokens.peek().kind is not _Kind.CLOSE:
+                    frames.append((token.text, []))
+                    continue
+                tokens.next()
+                term = builder.constant(token.text)
+            elif is_variable(token.text):
+                term = builder.variable(token.text)
+            else:
+                term = builder.constant(token.text)
+        else:
+            raise token.error("Expected a term")
+
+        # The term is complete, and completes every application it is the last
+        # argument of.
+        while frames:
+            name, children = frames[-1]
+            children.append(term)
+            separator = tokens.next()
+            if separator.kind is _Kind.COMMA:
+                break
+            if separator.kind is not _Kind.CLOSE:
+                raise separator.error("Expected ',' or ')'")
+            frames.pop()
+            term = builder.term(name, children)
+        else:
+            return term
+
+
+def _rule(lhs: TermLike, rhs: TermLike, arrow: _Token) -> Rule:
+    try:
+        return Rule(lhs, rhs)
+    except (TypeError, ValueError) as error:
+        raise ParseError(str(error), arrow.line, arrow.column) from None
+
+
+def _skip_section(tokens: _Tokens, start: _Token) -> None:
+    """Skip to the parenthesis closing a section that is already open."""
+    depth = 1
+    while depth:
+        token = tokens.next()
+        if token.kind is _Kind.OPEN:
+            depth += 1
+        elif token.kind is _Kind.CLOSE:
+            depth -= 1
+        elif token.kind is _Kind.END:
+            raise start.error("Unclosed section")
+
+
+def _tpdb_rules(tokens: _Tokens, builder: _Builder) -> Iterator[Rule]:
+    # Names declared in a VAR section are variables in the sections after it.
+    variables: set[str] = set()
+    is_variable: Callable[[str], bool] = variables.__contains__
+
+    while (start := tokens.next()).kind is not _Kind.END:
+        if start.kind is not _Kind.OPEN:
+            raise start.error("Expected a section")
+        section = tokens.expect(_Kind.NAME)
+
+        if section.text == "VAR":
+            while tokens.peek().kind is _Kind.NAME:
+                variables.add(tokens.next().text)
+            tokens.expect(_Kind.CLOSE)
+        elif section.text == "RULES":
+            while tokens.peek().kind is not _Kind.CLOSE:
+                yield _tpdb_rule(tokens, builder, is_variable)
+            tokens.next()
+        else:
+            _skip_section(tokens, start)
+
+
+def _tpdb_rule(
+    tokens: _Tokens, builder: _Builder, is_variable: Callable[[str], bool]
+) -> Rule:
+    lhs = _parse_application(tokens, builder, is_variable)
+    arrow = tokens.next()
+    if arrow.kind is not _Kind.ARROW or arrow.text != "->":
+        raise arrow.error("Expected '->'")
+    rhs = _parse_application(tokens, builder, is_variable)
+    if tokens.peek().text == "|":
+        raise tokens.peek().error("Conditional rules are not supported")
+    return _rule(lhs, rhs, arrow)
+
+
+def _ari_rules(tokens: _Tokens, builder: _Builder) -> Iterator[Rule]:
+    # Names declared by fun are function symbols (or constants), and all other
+    # names are variables.
+    arities: dict[str, int] = {}
+
+    while (start := tokens.next()).kind is not _Kind.END:
+        if start.kind is not _Kind.OPEN:
+            raise start.error("Expected a declaration")
+        keyword = tokens.expect(_Kind.NAME)
+
+        if keyword.text == "format":
+            kind = tokens.expect(_Kind.NAME)
+            if kind.text != "TRS":
+                raise kind.error("Expected format TRS")
+            _skip_section(tokens, start)
+        elif keyword.text == "fun":
+            name = _ari_name(tokens.expect(_Kind.NAME))
+            arity = tokens.expect(_Kind.NAME)
+            if not arity.text.isdigit():
+                raise arity.error("Expected an arity")
+            arities[name] = int(arity.text)
+            tokens.expect(_Kind.CLOSE)
+        elif keyword.text == "rule":
+            lhs = _parse_sexpr(tokens, builder, arities)
+            rhs = _parse_sexpr(tokens, builder, arities)
+            if tokens.peek().kind is not _Kind.CLOSE:
+                raise tokens.peek().error("Rule options are not supported")
+            tokens.next()
+            yield _rule(lhs, rhs, keyword)
+        else:
+            _skip_section(tokens, start)
+
+
+def _ari_name(token: _Token) -> str:
+    if token.text.startswith("|"):
+        return token.text[1:-1]
+    return token.text
+
+
+def _parse_sexpr(
+    tokens: _Tokens, builder: _Builder, arities: dict[str, int]
+) -> TermLike:
+    """Parse a term in S-expression syntax, like ``(f (g x) a)``."""
+    frames: list[tuple[_Token, list[TermLike]]] = []
+    while True:
+        token = tokens.next()
+        if token.kind is _Kind.OPEN:
+            frames.append((tokens.expect(_Kind.NAME), []))
+            continue
+        if token.kind is not _Kind.NAME:
+            raise token.error("Expected a term")
+
+        name = _ari_name(token)
+        arity = arities.get(name)
+        if arity is None:
+            term: TermLike = builder.variable(name)
+        elif arity == 0:
+            term = builder.constant(name)
+        else:
+            raise token.error(f"Expected {arity} arguments")
+
+        while frames:
+            head, children = frames[-1]
+            children.append(term)
+            if tokens.peek().kind is not _Kind.CLOSE:
+                break
+            tokens.next()
+            frames.pop()
+
+            name = _ari_name(head)
+            if arities.get(name) != len(children):
+                raise head.error(f"Expected a function of arity {len(children)}")
+            term = builder.term(name, children)
+        else:
+            return term
@@ -0,0 +1,283 @@
+"""Module for path orderings on terms.
+
+Path orderings are simplification orderings, and so termination orderings: if
+``l > r`` for every rule ``l -> r`` of a rewrite system, the system terminates.
+They are parameterized by a precedence on function symbols, given as a mapping
+from symbols to ranks, where symbols with higher ranks are greater::
+
+    precedence = {mul: 2, add: 1, s: 0}
+    lpo(mul(s(x), y), precedence=precedence) > add(y, mul(x, y))  # True
+
+The lexicographic path ordering (LPO) compares the children of terms with the
+same root lexicographically. The recursive path ordering (RPO) lets each
+symbol choose whether its children are compared lexicographically or as
+multisets, i.e., irrespective of their order.
+
+Both are ordering functions, so they support the chaining syntax described in
+``termination.orderings``.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any
+
+from . import _trampoline
+from ._trampoline import Computation
+from .orderings import OrderKey, ordering
+from .symbols import lookup
+from .terms import Symbol, Term, TermLike, Variable
+
+
+class Status(Enum):
+    """How the children of terms with the same root symbol are compared."""
+
+    LEXICOGRAPHIC = "lexicographic"
+    MULTISET = "multiset"
+
+
+@dataclass(frozen=True)
+class PathOrdering:
+    """A recursive path ordering, with a status for each function symbol.
+
+    Symbols that are missing from ``status`` have ``default_status``. With the
+    default arguments, this is the lexicographic path ordering.
+
+    Symbols that are missing from the precedence are incomparable to all other
+    symbols, as are distinct symbols with equal ranks.
+
+    The precedence is looked up for every pair of root symbols compared. A
+    ``SymbolArray`` precedence is looked up by the ids that the canonical
+    symbols of its table carry, without hashing the symbols.
+    """
+
+    precedence: Mapping[Symbol, int]
+    status: Mapping[Symbol, Status] = field(default_factory=dict)
+    default_status: Status = Status.LEXICOGRAPHIC
+
+    def greater(self, left: TermLike, right: TermLike, /) -> bool:
+        """Return whether the left term is greater than the right term."""
+        return _trampoline.run(_Comparison(self)._greater(left, right))
+
+    def equivalent(self, left: TermLike, right: TermLike, /) -> bool:
+        """Return whether the terms are equal, up to permuting multiset children."""
+        return _Comparison(self).equivalent(left, right)
+
+
+class _Comparison:
+    """The state of a single comparison, with memoized subterm comparisons.
+
+    Subterm pairs are memoized by identity, so the number of subterm
+    comparisons is bounded by the product of the sizes of the terms, instead of
+    growing exponentially as it does in a naive recursive implementation.
+    """
+
+    def __init__(self, path_ordering: PathOrdering) -> None:
+        self.ordering = path_ordering
+        self.permutative = Status.MULTISET in (
+            path_ordering.default_status,
+            *path_ordering.status.values(),
+        )
+        self.memo: dict[tuple[int, int], bool] = {}
+        self.rank = lookup(path_ordering.precedence)
+        # Equivalence classes of the subterms seen, by identity, and the class
+        # numbers keyed on the root and the classes of the children.
+        self.classes: dict[int, int] = {}
+        self.class_keys: dict[object, int] = {}
+
+    def greater(self, left: TermLike, right: TermLike) -> Computation[bool] | bool:
+        """Return the memoized result, or a computation for it."""
+        result = self.memo.get((id(left), id(right)))
+        if result is not None:
+            return result
+        return self._greater(left, right)
+
+    def _greater(self, left: TermLike, right: TermLike) -> Computation[bool]:
+        result = yield from self._compare(left, right)
+        self.memo[(id(left), id(right))] = result
+        return result
+
+    def _compare(self, left: TermLike, right: TermLike) -> Computation[bool]:
+        if isinstance(left, Variable):
+            return False
+        if isinstance(right, Variable):
+            return right in left.variable_set
+
+        left_children = left.children if isinstance(left, Term) else ()
+        right_children = right.children if isinstance(right, Term) else ()
+
+        # Some child of the left term is greater than or equivalent to the
+        # right term.
+        for child in left_children:
+            if self.equivalent(child, right) or (yield self.greater(child, right)):
+                return True
+
+        left_root = left.root if isinstance(left, Term) else left
+        right_root = right.root if isinstance(right, Term) else right
+
+        if left_root == right_root:
+            if not isinstance(left, Term) or not isinstance(right, Term):
+                # Equal terminal roots: a constant is never greater than
+                # itself.
+                return False
+            status = self.ordering.status.get(left_root, self.ordering.default_status)
+            if status is Status.MULTISET:
+                return (
+                    yield from self._multiset_greater(left_children, right_children)
+                )
+            return (yield from self._lexicographic_greater(left, right))
+
+        if self._precedes(right_root, left_root):
+            # The left root is greater, so the left term must be greater than
+            # every child of the right term.
+            for child in right_children:
+                if not (yield self.greater(left, child)):
+                    return False
+            return True
+
+        return False
+
+    def _lexicographic_greater(self, left: Term, right: Term) -> Computation[bool]:
+        left_children = left.children
+        right_children = right.children
+
+        for index, (left_child, right_child) in enumerate(
+            zip(left_children, right_children)
+        ):
+            if self.equivalent(left_child, right_child):
+                continue
+            if not (yield self.greater(left_child, right_child)):
+                return False
+
+            # The left term is greater than the right children before and at
+            # the index, since its own children are greater or equivalent.
+            for child in right_children[index + 1 :]:
+                if not (yield self.greater(left, child)):
+                    return False
+            return True
+
+        return False
+
+    def _multiset_greater(
+        self, left_children: tuple[TermLike, ...], right_children: tuple[TermLike, ...]
+    ) -> Computation[bool]:
+        # Cancel out equivalent children, then every remaining right child must
+        # be smaller than some remaining left child.
+        left_remaining = list(left_children)
+        right_remaining: list[TermLike] = []
+        for right_child in right_children:
+            for index, left_child in enumerate(left_remaining):
+                if self.equivalent(left_child, right_child):
+                    del left_remaining[index]
+                    break
+            else:
+                right_remaining.append(right_child)
+
+        if not left_remaining:
+            return False
+
+        for right_child in right_remaining:
+            for left_child in left_remaining:
+                if (yield self.greater(left_child, right_child)):
+                    break
+            else:
+                return False
+        return True
+
+    def _precedes(self, smaller: Any, greater: Any) -> bool:
+        smaller_rank = self.rank(smaller)
+        greater_rank = self.rank(greater)
+        return (
+            smaller_rank is not None
+            and greater_rank is not None
+            and greater_rank > smaller_rank
+        )
+
+    def equivalent(self, left: TermLike, right: TermLike) -> bool:
+        if left is right:
+            return True
+        if not self.permutative:
+            return left == right
+        return self._class(left) == self._class(right)
+
+    def _class(self, term: TermLike) -> int:
+        """Return the number of the class of the term up to permuting children.
+
+        Classes are numbered bottom-up: a term's class is keyed on its root and
+        the classes of its children, which are sorted for symbols with multiset
+        status. Every distinct subterm object is visited once, and keys are
+        flat, so this takes time linear in the number of distinct subterms.
+        """
+        classes = self.classes
+        if id(term) in classes:
+            return classes[id(term)]
+
+        stack = [term]
+        while stack:
+            current = stack[-1]
+            if id(current) in classes:
+                stack.pop()
+                continue
+
+            key: object
+            if isinstance(current, Term):
+                pending = [
+                    child for child in current.children if id(child) not in classes
+                ]
+                if pending:
+                    stack.extend(pending)
+                    continue
+
+                children = [classes[id(child)] for child in current.children]
+                status = self.ordering.status.get(
+                    current.root, self.ordering.default_status
+                )
+                if status is Status.MULTISET:
+                    children.sort()
+                key = (current.root, tuple(children))
+            else:
+                key = current
+
+            stack.pop()
+            classes[id(current)] = self.class_keys.setdefault(key, len(self.class_keys))
+
+        return classes[id(term)]
+
+
+@ordering(partial=True)
+def lpo(term: TermLike, *, precedence: Mapping[Symbol, int]) -> OrderKey[TermLike]:
+    """Order terms by the lexicographic path ordering.
+
+    For example::
+
+        lpo(ack(s(x), s(y)), precedence={ack: 1, s: 0}) > ack(x, ack(s(x), y))
+    """
+    return OrderKey(order=PathOrdering(precedence=precedence), value=term)
+
+
+@ordering(partial=True)
+def rpo(
+    term: TermLike,
+    *,
+    precedence: Mapping[Symbol, int],
+    status: Mapping[Symbol, Status] | None = None,
+    default_status: Status = Status.MULTISET,
+) -> OrderKey[TermLike]:
+    """Order terms by the recursive path ordering.
+
+    Symbols have multiset status unless ``status`` says otherwise. For
+    example::
+
+        rpo(f(s(x), y), precedence={f: 1, s: 0}) > f(y, x)  # True
+        lpo(f(s(x), y), precedence={f: 1, s: 0}) > f(y, x)  # False
+    """
+    return OrderKey(
+        order=PathOrdering(
+            precedence=precedence,
+            status={} if status is None else status,
+            default_status=default_status,
+        ),
+        value=term,
+    )
@@ -8,11 +8,27 @@ same name and index are considered equal.
 
 from __future__ import annotations
 
+import uuid
+from collections import Counter
 from dataclasses import dataclass, field
 from functools import singledispatch
-from typing import Any, overload
+from threading import RLock
+from typing import Any, Protocol, overload
+from weakref import WeakValueDictionary
 
-from .terms import IndexedVariable, Variable
+from .terms import (
+    IndexedVariable,
+    Substitution,
+    SupportsSubstitute,
+    SupportsVariables,
+    TermLike,
+    Variable,
+    variables,
+)
+
+
+class _Renamable[R](SupportsSubstitute[R], SupportsVariables, Protocol):
+    pass
 
 
 @dataclass
@@ -32,9 +48,47 @@ class VariablePool:
     A variable pool has methods to get variables with specific indexes, and
     methods for creating "fresh" variables, meaning variables whose indexes
     have never been returned from this pool previously.
+
+    Pools in different processes can be made to never hand out the same fresh
+    variable by giving each a different ``shard`` out of the same number of
+    ``shards``. Each shard only hands out fresh indexes in its own stripe, the
+    indexes that are congruent to the shard modulo the number of shards::
+
+        pools = [VariablePool(shard=k, shards=4) for k in range(4)]
+
+    A pool is not safe to use from several threads at once; use a
+    ``ConcurrentVariablePool`` for that.
+
+    Each pool has a random ``pool_id``, which its variables use to refer to
+    it, so pools and their variables can be pickled and sent to other
+    processes. Unpickling them recreates the pool once per process, or finds
+    the pool if it already exists there (so copying a pool returns the pool
+    itself). Indexes handed out before pickling are never fresh afterwards. A
+    pool recreated by unpickling is kept alive for the rest of the process.
     """
 
     state: dict[str, VariableState] = field(default_factory=dict)
+    shard: int = field(default=0, kw_only=True)
+    shards: int = field(default=1, kw_only=True)
+    pool_id: int = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        """Verify that the shard is valid, and register this pool."""
+        if self.shards < 1:
+            raise ValueError(f"Number of shards must be positive: {self.shards}")
+        if not 0 <= self.shard < self.shards:
+            raise ValueError(f"Shard must be in range({self.shards}): {self.shard}")
+
+        self.pool_id = uuid.uuid4().int
+        _pools[self.pool_id] = self
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        """Pickle this pool by its id, shards and next indexes."""
+        next_indexes = {name: state.next_index for (name, state) in self.state.items()}
+        return (
+            _restore_pool,
+            (type(self), self.pool_id, self.shard, self.shards, next_indexes),
+        )
 
     def __getitem__(self, name: str) -> Variable:
         """Return the the variable with the given name.
@@ -60,8 +114,8 @@ class VariablePool:
         if index is None:
             return self._get_state(name).variable
 
-        self._get_state(name).update_index(index)
-        return IndexedPoolVariable(name=name, index=index, pool=self)
+        self._observe(name, index)
+        return IndexedPoolVariable(name=name, index=index, pool_id=self.pool_id)
 
     def get_fresh(self, name: str) -> IndexedVariable:
         """Return a variable with the given name and a unique index.
@@ -70,24 +124,156 @@ class VariablePool:
         always guaranteed to be greater than the index of any variable returned
         by this pool previously.
         """
-        index = self._get_state(name).next_index
-        return self.get(name, index)
+        (index,) = self._reserve(name, 1)
+        return IndexedPoolVariable(name=name, index=index, pool_id=self.pool_id)
+
+    def renaming(self, value: SupportsVariables) -> Substitution:
+        """Return a substitution mapping the variables of a value to fresh ones.
+
+        Each variable is mapped to a fresh variable with the same name. The
+        fresh indexes for each name are reserved in one block, and handed out
+        in order of the variables' names and indexes.
+        """
+        ordered = sorted(set(variables(value)), key=_variable_key)
+
+        counts = Counter(variable.name for variable in ordered)
+        blocks = {
+            name: iter(self._reserve(name, count)) for (name, count) in counts.items()
+        }
+
+        mapping: dict[Variable, TermLike] = {
+            variable: IndexedPoolVariable(
+                name=variable.name,
+                index=next(blocks[variable.name]),
+                pool_id=self.pool_id,
+            )
+            for variable in ordered
+        }
+        return Substitution(mapping=mapping)
+
+    def rename_apart[T](self, value: _Renamable[T]) -> T:
+        """Return a value with all its variables replaced by fresh ones.
+
+        This is typically used on a rewrite rule before unifying it with a term,
+        so that the variables of the rule and the term are disjoint::
+
+            rule = pool.rename_apart(rule)
+        """
+        return self.renaming(value)(value)
+
+    def _reserve(self, name: str, count: int) -> range:
+        """Reserve a block of fresh indexes for a name, in this pool's stripe."""
+        state = self._get_state(name)
+        start = state.next_index
+        start += (self.shard - start) % self.shards
+        stop = start + count * self.shards
+        state.next_index = stop - self.shards + 1
+        return range(start, stop, self.shards)
+
+    def _observe(self, name: str, index: int) -> None:
+        """Make sure that an index that has been handed out is never fresh."""
+        self._get_state(name).update_index(index)
 
     def _get_state(self, name: str) -> VariableState:
         if name not in self.state:
-            variable = PoolVariable(name=name, pool=self)
+            variable = PoolVariable(name=name, pool_id=self.pool_id)
             self.state[name] = VariableState(variable=variable)
         return self.state[name]
 
 
-@dataclass(frozen=True)
+@dataclass
+class ConcurrentVariablePool(VariablePool):
+    """A variable pool that is safe to use from several threads at once.
+
+    Updates to the state of the pool, including the reservation of fresh
+    indexes, happen under a lock, so no two threads get the same fresh
+    variable.
+    """
+
+    lock: RLock = field(default_factory=RLock, repr=False, compare=False)
+
+    def _reserve(self, name: str, count: int) -> range:
+        with self.lock:
+            return super()._reserve(name, count)
+
+    def _observe(self, name: str, index: int) -> None:
+        with self.lock:
+            super()._observe(name, index)
+
+    def _get_state(self, name: str) -> VariableState:
+        with self.lock:
+            return super()._get_state(name)
+
+
+# Pool variables refer to their pools by id, so they neither carry a reference
+# to the pool nor keep it alive. The ids are random, so ids of pools from other
+# processes do not collide with the ids of the pools of this process.
+_pools: WeakValueDictionary[int, VariablePool] = WeakValueDictionary()
+# Pools recreated by unpickling are kept alive, since nothing else in this
+# process refers to them.
+_restored_pools: dict[int, VariablePool] = {}
+
+
+def _get_pool(pool_id: int) -> VariablePool:
+    try:
+        return _pools[pool_id]
+    except KeyError:
+        raise ValueError("Variable pool no longer exists") from None
+
+
+def _restore_pool(
+    cls: type[VariablePool],
+    pool_id: int,
+    shard: int,
+    shards: int,
+    next_indexes: dict[str, int],
+) -> VariablePool:
+    """Return the pool with the given id, creating it if it does not exist."""
+    pool = _pools.get(pool_id)
+    if pool is None:
+        pool = cls(shard=shard, shards=shards)
+        del _pools[pool.pool_id]
+        pool.pool_id = pool_id
+        _pools[pool_id] = _restored_pools[pool_id] = pool
+    for name, next_index in next_indexes.items():
+        pool._observe(name, next_index - 1)
+    return pool
+
+
+def _restore_variable(pool: VariablePool, name: str, index: int | None) -> Variable:
+    return pool.get(name) if index is None else pool.get(name, index)
+
+
+@dataclass(frozen=True, slots=True)
 class PoolVariable(Variable):
-    pool: VariablePool = field(compare=False)
+    pool_id: int = field(compare=False)
 
+    @property
+    def pool(self) -> VariablePool:
+        """Return the pool this variable came from."""
+        return _get_pool(self.pool_id)
 
-@dataclass(frozen=True)
+    def __reduce__(self) -> tuple[Any, ...]:
+        """Pickle this variable together with its pool."""
+        return (_restore_variable, (self.pool, self.name, None))
+
+
+@dataclass(frozen=True, slots=True)
 class IndexedPoolVariable(IndexedVariable):
-    pool: VariablePool = field(compare=False)
+    pool_id: int = field(compare=False)
+
+    @property
+    def pool(self) -> VariablePool:
+        """Return the pool this variable came from."""
+        return _get_pool(self.pool_id)
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        """Pickle this variable together with its pool."""
+        return (_restore_variable, (self.pool, self.name, self.index))
+
+
+def _variable_key(variable: Variable) -> tuple[str, int]:
+    return (variable.name, getattr(variable, "index", -1))
 
 
 @singledispatch
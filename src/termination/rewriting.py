@@ -0,0 +1,439 @@
+"""Module for term rewriting.
+
+A rewrite rule ``l -> r`` rewrites any term containing an instance ``u(l)`` of
+its left-hand side to the term with that subterm replaced by ``u(r)``. A
+rewrite system is a set of rules, and a term is in normal form with respect to
+a system if no rule applies anywhere in it::
+
+    trs = RewriteSystem([
+        Rule(add(zero, y), y),
+        Rule(add(s(x), y), s(add(x, y))),
+    ])
+    trs.normalize(add(s(zero), s(zero)))  # s(s(0))
+
+Normalization follows a strategy, which picks the redexes (the subterms where a
+rule applies) to contract at each step. Normal forms of subterms are memoized,
+so shared subterms are normalized once, and budgets on the number of steps and
+the elapsed time stop normalization in systems that do not terminate.
+"""
+
+from __future__ import annotations
+
+import time
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from enum import Enum
+from functools import cached_property
+from operator import is_
+
+from .indexing import DiscriminationTree
+from .matching import Matcher, compile_pattern
+from .terms import (
+    Position,
+    PositionIterable,
+    Substitution,
+    Term,
+    TermLike,
+    Variable,
+    VariableMapping,
+    replace,
+)
+
+
+@dataclass(frozen=True)
+class Rule:
+    """A rewrite rule.
+
+    The left-hand side must not be a variable, and every variable of the
+    right-hand side must occur in the left-hand side.
+    """
+
+    lhs: TermLike
+    rhs: TermLike
+
+    def __post_init__(self) -> None:
+        """Verify that the rule is a valid rewrite rule."""
+        if isinstance(self.lhs, Variable):
+            raise TypeError(f"Left-hand side must not be a variable: {self.lhs}")
+
+        extra = self.rhs.variable_set - self.lhs.variable_set
+        if extra:
+            extra_str = ", ".join(sorted(str(variable) for variable in extra))
+            raise ValueError(
+                f"Right-hand side has variables not in left-hand side: {extra_str}"
+            )
+
+    def __str__(self) -> str:
+        """Format this rule with an arrow.
+
+        Example::
+
+            str(Rule(f(x, a), x))  # 'f(?x, a) -> ?x'
+        """
+        return f"{self.lhs} -> {self.rhs}"
+
+    @cached_property
+    def matcher(self) -> Matcher:
+        """Return the compiled matcher for the left-hand side of this rule."""
+        return compile_pattern(self.lhs)
+
+    def apply(self, term: TermLike) -> TermLike | None:
+        """Rewrite a term at its root with this rule, or return None."""
+        substitution = self.matcher(term)
+        if substitution is None:
+            return None
+        return substitution(self.rhs)
+
+    def _substitute(self, mapping: VariableMapping) -> Rule:
+        substitution = Substitution(mapping=mapping)
+        return Rule(lhs=substitution(self.lhs), rhs=substitution(self.rhs))
+
+    def _variables(self) -> Iterator[Variable]:
+        yield from self.lhs.variable_set
+
+
+class Strategy(Enum):
+    """Strategies for choosing which redexes to contract during normalization."""
+
+    # Contract a leftmost redex that contains no other redex.
+    INNERMOST = "innermost"
+
+    # Contract a leftmost redex that is not contained in another redex.
+    OUTERMOST = "outermost"
+
+    # Contract all redexes that are not contained in another redex at once.
+    PARALLEL_OUTERMOST = "parallel-outermost"
+
+
+class BudgetExceeded(Exception):
+    """Raised when normalization runs out of steps or time."""
+
+    def __init__(self, message: str, steps: int) -> None:
+        super().__init__(message)
+        self.steps = steps
+
+
+class Budget:
+    """A budget of steps and time, for procedures that may not terminate.
+
+    The time runs from the creation of the budget. Either limit may be None,
+    for no limit.
+    """
+
+    # Traversals check the clock once every this many visited subterms, so
+    # that terms that take long to search time out even without any step.
+    CLOCK_INTERVAL = 1024
+
+    def __init__(self, max_steps: int | None, timeout: float | None) -> None:
+        self.steps = 0
+        self.max_steps = max_steps
+        self.deadline = None if timeout is None else time.monotonic() + timeout
+        self.visits = 0
+
+    def step(self) -> None:
+        """Count a step, and raise ``BudgetExceeded`` if the budget is spent."""
+        self.steps += 1
+        if self.max_steps is not None and self.steps > self.max_steps:
+            raise BudgetExceeded(
+                f"Exceeded the budget of {self.max_steps} steps", self.steps - 1
+            )
+        self.check_time()
+
+    def visit(self) -> None:
+        """Count a visited subterm, and check the clock every so often."""
+        self.visits += 1
+        if self.visits % self.CLOCK_INTERVAL == 0:
+            self.check_time()
+
+    def check_time(self) -> None:
+        """Raise ``BudgetExceeded`` if the time budget is spent."""
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            raise BudgetExceeded("Exceeded the time budget", self.steps)
+
+
+class _Action(Enum):
+    VISIT = 1
+    CONTRACT = 2
+    REMEMBER = 3
+    REBUILD = 4
+
+
+class RewriteSystem:
+    """A term rewriting system: a collection of rewrite rules.
+
+    Rules are indexed on their left-hand sides with a discrimination tree, and
+    their left-hand sides are compiled into matchers, so finding the rules that
+    apply to a term does not test every rule. When several rules apply to the
+    same subterm, the one that was added first is used.
+    """
+
+    def __init__(self, rules: Iterable[Rule] = ()) -> None:
+        self._rules: dict[int, Rule] = {}
+        self._index: DiscriminationTree[int] = DiscriminationTree()
+        self._next_number = 0
+        for rule in rules:
+            self.add(rule)
+
+    def __len__(self) -> int:
+        """Return the number of rules in this system."""
+        return len(self._rules)
+
+    def __iter__(self) -> Iterator[Rule]:
+        """Return an iterator over the rules in this system, in order."""
+        return iter(self._rules.values())
+
+    def __contains__(self, rule: Rule) -> bool:
+        """Return whether this system has the given rule."""
+        return rule in self._rules.values()
+
+    def __str__(self) -> str:
+        """Format this system as its rules, one per line."""
+        return "\n".join(str(rule) for rule in self)
+
+    def add(self, rule: Rule) -> None:
+        """Add a rule to this system."""
+        number = self._next_number
+        self._next_number += 1
+        self._rules[number] = rule
+        self._index.insert(rule.lhs, number)
+
+    def remove(self, rule: Rule) -> None:
+        """Remove a rule from this system, or raise KeyError."""
+        for number, candidate in self._rules.items():
+            if candidate == rule:
+                break
+        else:
+            raise KeyError(rule)
+
+        del self._rules[number]
+        self._index.remove(rule.lhs, number)
+
+    def rules_for(self, term: TermLike) -> Iterator[Rule]:
+        """Return the rules whose left-hand sides might match the given term.
+
+        The candidates come from the index, in the order they were added, and
+        still need to be matched.
+        """
+        for number in sorted(self._index.generalizations(term)):
+            yield self._rules[number]
+
+    def rewrite_root(self, term: TermLike) -> TermLike | None:
+        """Rewrite a term at its root, or return None if no rule applies."""
+        for rule in self.rules_for(term):
+            result = rule.apply(term)
+            if result is not None:
+                return result
+        return None
+
+    def rewrite(self, term: TermLike, position: PositionIterable) -> TermLike | None:
+        """Rewrite a term at the given position, or return None.
+
+        Returns None if no rule applies at the position. Raises ``KeyError`` if
+        the position is invalid.
+        """
+        position_copy: Position = tuple(position)
+        contractum = self.rewrite_root(term[position_copy])
+        if contractum is None:
+            return None
+        return replace(term, position_copy, contractum)
+
+    def is_normal(self, term: TermLike) -> bool:
+        """Return whether no rule applies anywhere in a term."""
+        return self._outermost_redex(term, {}, Budget(None, None)) is None
+
+    def normalize(
+        self,
+        term: TermLike,
+        *,
+        strategy: Strategy = Strategy.INNERMOST,
+        max_steps: int | None = None,
+        timeout: float | None = None,
+        memo: dict[TermLike, TermLike] | None = None,
+    ) -> TermLike:
+        """Rewrite a term until it is in normal form.
+
+        Raises ``BudgetExceeded`` if more than ``max_steps`` rewrite steps are
+        needed, or if normalization takes longer than ``timeout`` seconds.
+
+        The normal forms of subterms are memoized in ``memo``, which maps terms
+        to their normal forms. Passing the same dictionary to several calls
+        shares the normal forms between them; it should only be shared between
+        calls with the same strategy, and only as long as the rules of this
+        system do not change.
+        """
+        if memo is None:
+            memo = {}
+        budget = Budget(max_steps, timeout)
+
+        match strategy:
+            case Strategy.INNERMOST:
+                return self._innermost(term, memo, budget)
+            case Strategy.OUTERMOST:
+                return self._outermost(term, memo, budget)
+            case Strategy.PARALLEL_OUTERMOST:
+                return self._parallel_outermost(term, memo, budget)
+
+    def _innermost(
+        self, term: TermLike, memo: dict[TermLike, TermLike], budget: Budget
+    ) -> TermLike:
+        # The work stack holds actions and terms; the normal forms computed so
+        # far are pushed onto the results stack.
+        results: list[TermLike] = []
+        stack: list[tuple[_Action, TermLike]] = [(_Action.VISIT, term)]
+
+        while stack:
+            action, current = stack.pop()
+
+            if action is _Action.VISIT:
+                budget.visit()
+                normal_form = memo.get(current)
+                if normal_form is not None:
+                    results.append(normal_form)
+                    continue
+
+                stack.append((_Action.CONTRACT, current))
+                if isinstance(current, Term):
+                    for child in reversed(current.children):
+                        stack.append((_Action.VISIT, child))
+
+            elif action is _Action.CONTRACT:
+                # The children are in normal form, so only the root can be a
+                # redex.
+                reduct = current
+                if isinstance(current, Term):
+                    arity = len(current.children)
+                    children = tuple(results[-arity:])
+                    del results[-arity:]
+                    if not all(map(is_, children, current.children)):
+                        reduct = Term(root=current.root, children=children)
+
+                contractum = self.rewrite_root(reduct)
+                if contractum is None:
+                    memo[current] = memo[reduct] = reduct
+                    results.append(reduct)
+                else:
+                    budget.step()
+                    stack.append((_Action.REMEMBER, current))
+                    stack.append((_Action.VISIT, contractum))
+
+            else:
+                memo[current] = results[-1]
+
+        return results.pop()
+
+    def _outermost(
+        self, term: TermLike, memo: dict[TermLike, TermLike], budget: Budget
+    ) -> TermLike:
+        original = term
+        while (normal_form := memo.get(term)) is None:
+            redex = self._outermost_redex(term, memo, budget)
+            if redex is None:
+                memo[term] = term
+                break
+
+            budget.step()
+            position, contractum = redex
+            term = replace(term, position, contractum)
+        else:
+            term = normal_form
+
+        memo[original] = term
+        return term
+
+    def _outermost_redex(
+        self, term: TermLike, memo: dict[TermLike, TermLike], budget: Budget
+    ) -> tuple[Position, TermLike] | None:
+        """Find the leftmost-outermost redex in a term and contract it.
+
+        Returns the position of the redex and its contractum, or None if the
+        term is in normal form. Subterms found to be in normal form on the way
+        are recorded in the memo, mapped to themselves, and skipped next time.
+        """
+        # Each stack entry holds a position, the subterm there, and whether its
+        # children have already been pushed.
+        stack: list[tuple[Position, TermLike, bool]] = [((), term, False)]
+        while stack:
+            position, current, expanded = stack.pop()
+            budget.visit()
+
+            if expanded:
+                # Every subterm below has been searched without finding a redex.
+                memo[current] = current
+                continue
+            if memo.get(current) is current:
+                continue
+
+            contractum = self.rewrite_root(current)
+            if contractum is not None:
+                return (position, contractum)
+
+            stack.append((position, current, True))
+            if isinstance(current, Term):
+                children = current.children
+                for index in range(len(children) - 1, -1, -1):
+                    stack.append(((*position, index), children[index], False))
+
+        return None
+
+    def _parallel_outermost(
+        self, term: TermLike, memo: dict[TermLike, TermLike], budget: Budget
+    ) -> TermLike:
+        original = term
+        while (normal_form := memo.get(term)) is None:
+            term, normal = self._parallel_step(term, memo, budget)
+            if normal:
+                break
+        else:
+            term = normal_form
+
+        memo[original] = term
+        return term
+
+    def _parallel_step(
+        self, term: TermLike, memo: dict[TermLike, TermLike], budget: Budget
+    ) -> tuple[TermLike, bool]:
+        """Contract all outermost redexes of a term simultaneously.
+
+        Returns the resulting term and whether the term was already in normal
+        form. Each contracted redex counts as one step.
+        """
+        # Results are pairs of a (possibly contracted) subterm and whether the
+        # original subterm was found to be in normal form.
+        results: list[tuple[TermLike, bool]] = []
+        stack: list[tuple[_Action, TermLike]] = [(_Action.VISIT, term)]
+
+        while stack:
+            action, current = stack.pop()
+
+            if action is _Action.VISIT:
+                budget.visit()
+                if memo.get(current) is current:
+                    results.append((current, True))
+                    continue
+
+                contractum = self.rewrite_root(current)
+                if contractum is not None:
+                    budget.step()
+                    results.append((contractum, False))
+                elif isinstance(current, Term):
+                    stack.append((_Action.REBUILD, current))
+                    for child in reversed(current.children):
+                        stack.append((_Action.VISIT, child))
+                else:
+                    memo[current] = current
+                    results.append((current, True))
+
+            else:
+                assert isinstance(current, Term)
+                arity = len(current.children)
+                child_results = results[-arity:]
+                del results[-arity:]
+
+                if all(normal for (_child, normal) in child_results):
+                    memo[current] = current
+                    results.append((current, True))
+                else:
+                    children = tuple(child for (child, _normal) in child_results)
+                    results.append((Term(root=current.root, children=children), False))
+
+        return results.pop()
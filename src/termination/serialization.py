@@ -0,0 +1,313 @@
+"""Module for a compact binary serialization of terms.
+
+Terms, substitutions and sets of rules are encoded as a table of their symbols
+followed by a stream of integer codes, one per node of the terms in pre-order::
+
+    data = dumps(f(g(a), g(a)))
+    loads(data)  # f(g(a), g(a))
+
+A code is either a symbol id, for a node whose children follow in the stream,
+or a back-reference to an earlier node, for a subterm that has been encoded
+before. Equal subterms are encoded once however often they occur, so terms
+that share subterms stay small, and decoded terms share their equal subterms.
+
+All codes of a stream have the same width, the smallest of 1, 2, 4 or 8 bytes
+that fits them. The decoder reads the stream in place from any buffer, such as
+``bytes``, a ``memoryview`` or an ``mmap``, without copying it.
+
+Variables keep their names and indexes exactly, but not their pools. Given a
+signature, decoded symbols are interned into its symbol table and variables
+come from its variable pool.
+"""
+
+from __future__ import annotations
+
+import struct
+import sys
+from array import array
+from collections.abc import Buffer, Iterable, Iterator
+from enum import IntEnum
+
+from .rewriting import Rule
+from .signatures import Signature, symbol_table, variable_pool
+from .symbols import SymbolTable
+from .terms import (
+    Constant,
+    Function,
+    IndexedVariable,
+    Substitution,
+    Symbol,
+    Term,
+    TerminalSymbol,
+    TermLike,
+    Variable,
+)
+
+_MAGIC = b"TRMS"
+_VERSION = 1
+
+# Magic, version, kind of value, code width, number of symbols and codes.
+_HEADER = struct.Struct("<4sBBBxQQ")
+# Kind of symbol, length of name, and arity or index.
+_SYMBOL = struct.Struct("<BIq")
+
+_FORMATS = {1: "B", 2: "H", 4: "I", 8: "Q"}
+
+
+class _Kind(IntEnum):
+    TERM = 0
+    SUBSTITUTION = 1
+    RULES = 2
+
+
+class _SymbolKind(IntEnum):
+    CONSTANT = 0
+    FUNCTION = 1
+    VARIABLE = 2
+    INDEXED_VARIABLE = 3
+
+
+def dumps(value: TermLike | Substitution | Iterable[Rule]) -> bytes:
+    """Encode a term, a substitution, or an iterable of rules as bytes.
+
+    Rules are decoded as a list, so any iterable of rules (like a rewrite
+    system) can be encoded. Raises ``TypeError`` for any other value.
+    """
+    encoder = _Encoder()
+    if isinstance(value, Term | TerminalSymbol):
+        kind = _Kind.TERM
+        encoder.encode(value)
+    elif isinstance(value, Substitution):
+        kind = _Kind.SUBSTITUTION
+        encoder.encode_pairs(value.mapping.items())
+    elif isinstance(value, Iterable):
+        rules = list(value)
+        for rule in rules:
+            if not isinstance(rule, Rule):
+                raise _unserializable(rule)
+        kind = _Kind.RULES
+        encoder.encode_pairs((rule.lhs, rule.rhs) for rule in rules)
+    else:
+        raise _unserializable(value)
+
+    return encoder.finish(kind)
+
+
+def loads(
+    data: Buffer, *, signature: Signature | None = None
+) -> TermLike | Substitution | list[Rule]:
+    """Decode a term, a substitution, or a list of rules from a buffer.
+
+    Raises ``ValueError`` if the buffer does not hold a valid encoding, and
+    ``TypeError`` if it holds a substitution binding a symbol that is not a
+    variable.
+    """
+    view = memoryview(data).cast("B")
+    if len(view) < _HEADER.size:
+        raise ValueError("Truncated data")
+    magic, version, kind, width, symbol_count, code_count = _HEADER.unpack_from(view)
+    if magic != _MAGIC or version != _VERSION:
+        raise ValueError("Not a serialized term")
+    if width not in _FORMATS:
+        raise ValueError(f"Invalid code width: {width}")
+
+    offset, symbols = _read_symbols(view, _HEADER.size, symbol_count, signature)
+    offset += -offset % width
+    end = offset + width * code_count
+    if end > len(view):
+        raise ValueError("Truncated data")
+    if end < len(view):
+        raise ValueError("Trailing data")
+
+    codes = view[offset:end].cast(_FORMATS[width])
+    if width > 1 and sys.byteorder == "big":
+        swapped = array(_FORMATS[width], codes)
+        swapped.byteswap()
+        codes = memoryview(swapped)
+
+    decoder = _Decoder(symbols, iter(codes))
+    try:
+        match _Kind(kind):
+            case _Kind.TERM:
+                result: TermLike | Substitution | list[Rule] = decoder.decode()
+            case _Kind.SUBSTITUTION:
+                mapping: dict[Variable, TermLike] = {}
+                for variable, term in decoder.decode_pairs():
+                    if not isinstance(variable, Variable):
+                        raise TypeError("Substitution binds a non-variable")
+                    mapping[variable] = term
+                result = Substitution(mapping=mapping)
+            case _Kind.RULES:
+                result = [Rule(lhs, rhs) for (lhs, rhs) in decoder.decode_pairs()]
+        if next(decoder.codes, None) is not None:
+            raise ValueError("Trailing codes")
+    except (StopIteration, IndexError):
+        raise ValueError("Invalid code stream") from None
+
+    return result
+
+
+def _unserializable(value: object) -> TypeError:
+    return TypeError(f"object of type {type(value).__name__} cannot be serialized")
+
+
+class _Encoder:
+    def __init__(self) -> None:
+        self.table = SymbolTable()
+        self.codes: list[int] = []
+        # Numbers of the term nodes encoded so far, in pre-order.
+        self.nodes: dict[Term, int] = {}
+
+    def encode(self, term: TermLike) -> None:
+        table = self.table
+        codes = self.codes
+        nodes = self.nodes
+        stack = [term]
+        while stack:
+            current = stack.pop()
+            if isinstance(current, Term):
+                number = nodes.get(current)
+                if number is not None:
+                    codes.append((number << 1) | 1)
+                    continue
+                nodes[current] = len(nodes)
+                codes.append(table.add(current.root) << 1)
+                stack.extend(reversed(current.children))
+            elif isinstance(current, TerminalSymbol):
+                codes.append(table.add(current) << 1)
+            else:
+                raise _unserializable(current)
+
+    def encode_pairs(self, pairs: Iterable[tuple[TermLike, TermLike]]) -> None:
+        # The number of pairs is not known until they have all been encoded.
+        self.codes.append(0)
+        count = 0
+        for first, second in pairs:
+            self.encode(first)
+            self.encode(second)
+            count += 1
+        self.codes[0] = count
+
+    def finish(self, kind: _Kind) -> bytes:
+        largest = max(self.codes, default=0)
+        width = next((width for width in _FORMATS if largest < 1 << (8 * width)), None)
+        if width is None:
+            raise ValueError("Too many symbols or nodes to serialize")
+
+        parts = [
+            _HEADER.pack(
+                _MAGIC, _VERSION, kind, width, len(self.table), len(self.codes)
+            )
+        ]
+        for symbol in self.table:
+            parts.extend(_pack_symbol(symbol))
+
+        length = sum(len(part) for part in parts)
+        parts.append(bytes(-length % width))
+
+        codes = array(_FORMATS[width], self.codes)
+        if sys.byteorder == "big":
+            codes.byteswap()
+        parts.append(codes.tobytes())
+        return b"".join(parts)
+
+
+def _pack_symbol(symbol: Symbol) -> tuple[bytes, bytes]:
+    name = symbol.name.encode()
+    if isinstance(symbol, Function):
+        header = _SYMBOL.pack(_SymbolKind.FUNCTION, len(name), symbol.arity)
+    elif isinstance(symbol, IndexedVariable):
+        header = _SYMBOL.pack(_SymbolKind.INDEXED_VARIABLE, len(name), symbol.index)
+    elif isinstance(symbol, Variable):
+        header = _SYMBOL.pack(_SymbolKind.VARIABLE, len(name), 0)
+    elif isinstance(symbol, Constant):
+        header = _SYMBOL.pack(_SymbolKind.CONSTANT, len(name), 0)
+    else:
+        raise _unserializable(symbol)
+    return (header, name)
+
+
+def _read_symbols(
+    view: memoryview, offset: int, count: int, signature: Signature | None
+) -> tuple[int, list[Symbol]]:
+    table = None if signature is None else symbol_table(signature)
+    pool = None if signature is None else variable_pool(signature)
+
+    symbols: list[Symbol] = []
+    for _ in range(count):
+        if offset + _SYMBOL.size > len(view):
+            raise ValueError("Truncated data")
+        kind, length, value = _SYMBOL.unpack_from(view, offset)
+        offset += _SYMBOL.size
+        if offset + length > len(view):
+            raise ValueError("Truncated data")
+        name = bytes(view[offset : offset + length]).decode()
+        offset += length
+
+        symbol: Symbol
+        match kind:
+            case _SymbolKind.CONSTANT:
+                symbol = Constant(name=name)
+            case _SymbolKind.FUNCTION:
+                symbol = Function(name=name, arity=value)
+            case _SymbolKind.VARIABLE:
+                symbol = Variable(name=name) if pool is None else pool[name]
+            case _SymbolKind.INDEXED_VARIABLE:
+                symbol = (
+                    IndexedVariable(name=name, index=value)
+                    if pool is None
+                    else pool.get(name, value)
+                )
+            case _:
+                raise ValueError(f"Invalid symbol kind: {kind}")
+
+        if table is not None and not isinstance(symbol, Variable):
+            symbol = table.intern(symbol)
+        symbols.append(symbol)
+
+    return (offset, symbols)
+
+
+class _Decoder:
+    def __init__(self, symbols: list[Symbol], codes: Iterator[int]) -> None:
+        self.symbols = symbols
+        self.codes = codes
+        # The term nodes decoded so far, in pre-order. A node's slot is
+        # reserved when it starts, and filled when its children are complete.
+        self.nodes: list[Term | None] = []
+
+    def decode(self) -> TermLike:
+        symbols = self.symbols
+        codes = self.codes
+        nodes = self.nodes
+        # Each frame holds a function symbol, the number of its node, and its
+        # children decoded so far.
+        frames: list[tuple[Function, int, list[TermLike]]] = []
+        while True:
+            code = next(codes)
+            if code & 1:
+                term = nodes[code >> 1]
+                if term is None:
+                    raise ValueError("Back-reference to an incomplete term")
+            else:
+                symbol = symbols[code >> 1]
+                if isinstance(symbol, Function):
+                    frames.append((symbol, len(nodes), []))
+                    nodes.append(None)
+                    continue
+                term = symbol
+
+            while frames:
+                root, number, children = frames[-1]
+                children.append(term)
+                if len(children) < root.arity:
+                    break
+                frames.pop()
+                term = Term(root=root, children=tuple(children))
+                nodes[number] = term
+            else:
+                return term
+
+    def decode_pairs(self) -> Iterator[tuple[TermLike, TermLike]]:
+        for _ in range(next(self.codes)):
+            yield (self.decode(), self.decode())
@@ -6,7 +6,8 @@ from abc import ABC, abstractmethod
 from typing import Self, overload
 
 from .pools import VariablePool, fresh_variable
-from .terms import Constant, Function, Variable
+from .symbols import SymbolTable
+from .terms import Constant, Function, Symbol, Variable
 
 
 class SignatureDescriptor[T](ABC):
@@ -44,17 +45,25 @@ class SignatureDescriptor[T](ABC):
         raise AttributeError("Symbols are read-only")
 
 
-class ConstantDescriptor(SignatureDescriptor[Constant]):
-    def _create_value(self, _: object) -> Constant:
+class SymbolDescriptor[S: Symbol](SignatureDescriptor[S]):
+    @abstractmethod
+    def _create_symbol(self) -> S: ...
+
+    def _create_value(self, instance: Signature) -> S:
+        return instance._signature_symbol_table.intern(self._create_symbol())
+
+
+class ConstantDescriptor(SymbolDescriptor[Constant]):
+    def _create_symbol(self) -> Constant:
         return Constant(name=self.name)
 
 
-class FunctionDescriptor(SignatureDescriptor[Function]):
+class FunctionDescriptor(SymbolDescriptor[Function]):
     def __init__(self, arity: int) -> None:
         super().__init__()
         self.arity = arity
 
-    def _create_value(self, _: object) -> Function:
+    def _create_symbol(self) -> Function:
         return Function(name=self.name, arity=self.arity)
 
 
@@ -69,6 +78,22 @@ class VariablePoolDescriptor(SignatureDescriptor[VariablePool]):
         return VariablePool()
 
 
+class SymbolTableDescriptor(SignatureDescriptor[SymbolTable]):
+    def _create_value(self, instance: Signature) -> SymbolTable:
+        # Give the symbols of the signature ids in the order they are declared,
+        # starting with those of the base classes.
+        descriptors: dict[str, SymbolDescriptor] = {}
+        for cls in reversed(type(instance).__mro__):
+            for name, attribute in vars(cls).items():
+                if isinstance(attribute, SymbolDescriptor):
+                    descriptors[name] = attribute
+
+        table = SymbolTable()
+        for descriptor in descriptors.values():
+            table.add(descriptor._create_symbol())
+        return table
+
+
 class Signature:
     """Base class for signatures.
 
@@ -76,6 +101,40 @@ class Signature:
     """
 
     _signature_variable_pool = VariablePoolDescriptor()
+    _signature_symbol_table = SymbolTableDescriptor()
+
+
+def symbol_table(signature: Signature) -> SymbolTable:
+    """Return the symbol table of a signature.
+
+    The table gives every constant and function symbol of the signature a
+    dense integer id, in the order they are declared, and holds the single
+    instance of each symbol that the signature returns. For example::
+
+        class Foo(Signature):
+            f = arity(2)
+            a = constant()
+
+        foo = Foo()
+        table = symbol_table(foo)
+        table[foo.f], table[foo.a]  # (0, 1)
+        table.intern(Function('f', 2)) is foo.f  # True
+
+    The table can be used to build flatterms, and to store precedences and
+    weights in arrays indexed by id::
+
+        precedence = table.array({foo.f: 1, foo.a: 0})
+    """
+    return signature._signature_symbol_table
+
+
+def variable_pool(signature: Signature) -> VariablePool:
+    """Return the variable pool of a signature.
+
+    The pool is the source of the signature's variables, and of its fresh
+    variables.
+    """
+    return signature._signature_variable_pool
 
 
 @fresh_variable.register
@@ -0,0 +1,529 @@
+"""Module for storing terms on disk, in memory-mapped files.
+
+A term store holds a hash-consed set of terms in a directory of files. Every
+distinct subterm is stored once, as a node, and adding a term returns a handle
+to its node::
+
+    with TermStore("equations") as store:
+        handle = store.add(f(g(a), x))
+        handle[0,]  # g(a), read from the store
+        store.add(f(g(a), x)) == handle  # True
+
+Handles are term-like, and read the store lazily: the root symbol, children,
+size and depth of a node are looked up in the mapped files when they are
+needed. Since the files are memory-mapped, the operating system pages nodes in
+and out as they are used, so a store can hold far more terms than fit in
+memory.
+
+Nodes are never removed. Reopening a store maps its files again, and only reads
+its (small) table of symbols. The files use the native byte order, so a store
+can only be reopened on the same kind of machine. A format file records the
+version and byte order of the store, and is checked when it is reopened.
+"""
+
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+from array import array
+from collections.abc import Iterator
+from dataclasses import dataclass
+from os import PathLike
+from pathlib import Path
+from types import TracebackType
+from typing import Self
+
+from .serialization import _pack_symbol, _read_symbols
+from .symbols import SymbolTable
+from .terms import (
+    Function,
+    IndexedVariable,
+    Position,
+    PositionIterable,
+    Symbol,
+    Term,
+    TerminalSymbol,
+    TermLike,
+    Variable,
+    VariableMapping,
+)
+
+_SYMBOLS_FILE = "symbols.bin"
+_NODES_FILE = "nodes.bin"
+_ARGUMENTS_FILE = "arguments.bin"
+_INDEX_FILE = "index.bin"
+_FORMAT_FILE = "format.bin"
+
+_MAGIC = b"TRMD"
+_VERSION = 1
+
+# Magic, version, and the number one in the native byte order.
+_FORMAT = struct.Struct("=4sB3xq")
+
+# Fields of a node record: the symbol id, the offset of the node ids of its
+# children in the arguments file, its size, its depth, and its hash.
+_SYMBOL, _ARGUMENTS, _SIZE, _DEPTH, _HASH = range(5)
+_NODE_FIELDS = 5
+
+# Sizes of terms with many shared subterms can exceed 64 bits. Larger sizes are
+# stored as this maximum, and computed when needed.
+_MAXIMUM_SIZE = 2**63 - 1
+
+# The initial capacity of the files, which must be a power of two for the
+# index.
+_INITIAL_CAPACITY = 1024
+_SLOT_SIZE = 8
+
+# Parameters of the node hash, which is stored in the files, so it must not
+# depend on the hash of the Python implementation. This is FNV-1a over 64-bit
+# words instead of bytes, with the high half folded into the low half, since
+# the index only uses the low bits.
+_HASH_OFFSET = 0xCBF29CE484222325
+_HASH_PRIME = 0x100000001B3
+_HASH_MASK = 2**64 - 1
+
+
+class _MappedFile:
+    """A file of signed 64-bit integers, mapped into memory.
+
+    The first integer is a header, which the subclasses use for the number of
+    integers in use.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        if not path.exists():
+            path.write_bytes(bytes((_INITIAL_CAPACITY + 1) * _SLOT_SIZE))
+        self._file = path.open("r+b")
+        self._map = mmap.mmap(self._file.fileno(), 0)
+        self.view = memoryview(self._map).cast("q")
+
+    def resize(self, slots: int, *, clear: bool = False) -> None:
+        """Change the number of integers in the file, and remap it.
+
+        If ``clear`` is set, all integers are reset to zero.
+        """
+        self.view.release()
+        self._map.close()
+        if clear:
+            self._file.truncate(0)
+        self._file.truncate(slots * _SLOT_SIZE)
+        self._map = mmap.mmap(self._file.fileno(), 0)
+        self.view = memoryview(self._map).cast("q")
+
+    def flush(self) -> None:
+        self._map.flush()
+
+    def close(self) -> None:
+        self.view.release()
+        self._map.close()
+        self._file.close()
+
+
+class _Column(_MappedFile):
+    """A growable array of integers, with its length in the header."""
+
+    def __len__(self) -> int:
+        return self.view[0]
+
+    def extend(self, values: list[int]) -> int:
+        """Append integers to the column, and return the offset of the first."""
+        start = self.view[0]
+        stop = start + len(values)
+        if stop + 1 > len(self.view):
+            self.resize(max(2 * len(self.view), stop + 1))
+        self.view[start + 1 : stop + 1] = memoryview(array("q", values))
+        self.view[0] = stop
+        return start
+
+
+class TermStore:
+    """A hash-consed store of terms, in memory-mapped files in a directory.
+
+    The directory is created if it does not exist, and the store is reopened if
+    it does. Changes are written to the files as they are made; ``flush()``
+    makes sure they have reached the disk. A store must be closed after use,
+    which invalidates its handles.
+
+    Pool variables are stored as plain variables with the same name and index.
+    """
+
+    def __init__(self, path: str | PathLike[str]) -> None:
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._check_format()
+
+        symbols_path = self.path / _SYMBOLS_FILE
+        self.table = SymbolTable()
+        if symbols_path.exists():
+            data = memoryview(symbols_path.read_bytes())
+            offset = 0
+            while offset < len(data):
+                offset, symbols = _read_symbols(data, offset, 1, None)
+                self.table.add(symbols[0])
+
+        self._symbols_file = symbols_path.open("ab")
+        self._nodes = _Column(self.path / _NODES_FILE)
+        self._arguments = _Column(self.path / _ARGUMENTS_FILE)
+        self._index = _MappedFile(self.path / _INDEX_FILE)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({str(self.path)!r})"
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        """Return the number of nodes (distinct subterms) in this store."""
+        return len(self._nodes) // _NODE_FIELDS
+
+    def __contains__(self, term: TermLike) -> bool:
+        """Return whether the given term is in this store."""
+        return self.find(term) is not None
+
+    def add(self, term: TermLike) -> TermLike:
+        """Add a term to this store, and return a handle to it.
+
+        Subterms that are already in the store are shared with the new term.
+        Terminal symbols are returned as they are, since they are small.
+        """
+        node = self._lookup(term, add=True)
+        assert node is not None
+        return self.get(node)
+
+    def find(self, term: TermLike) -> TermLike | None:
+        """Return a handle to a term in this store, or None if it is absent."""
+        node = self._lookup(term, add=False)
+        return None if node is None else self.get(node)
+
+    def get(self, node: int) -> TermLike:
+        """Return a handle to the node with the given number.
+
+        Raises ``IndexError`` if there is no such node.
+        """
+        if not 0 <= node < len(self):
+            raise IndexError(f"Invalid node: {node}")
+        symbol = self.table.symbols[self._field(node, _SYMBOL)]
+        if isinstance(symbol, Function):
+            return StoredTerm(self, node)
+        return symbol
+
+    def flush(self) -> None:
+        """Write all changes to this store to the disk.
+
+        New symbols are written to the disk as soon as they are added, so only
+        the mapped files need flushing.
+        """
+        for mapped in (self._nodes, self._arguments, self._index):
+            mapped.flush()
+
+    def close(self) -> None:
+        """Write all changes to the disk, and close the files of this store."""
+        self.flush()
+        self._symbols_file.close()
+        for mapped in (self._nodes, self._arguments, self._index):
+            mapped.close()
+
+    def _check_format(self) -> None:
+        """Check the format file of this store, or write it for a new store.
+
+        Raises ``ValueError`` if the directory holds a store of another version
+        or byte order, or files that are not a store.
+        """
+        header = _FORMAT.pack(_MAGIC, _VERSION, 1)
+        format_path = self.path / _FORMAT_FILE
+        if not format_path.exists():
+            for name in (_SYMBOLS_FILE, _NODES_FILE, _ARGUMENTS_FILE, _INDEX_FILE):
+                if (self.path / name).exists():
+                    raise ValueError(f"Not a term store: {self.path}")
+            format_path.write_bytes(header)
+            return
+
+        data = format_path.read_bytes()
+        if len(data) != _FORMAT.size or data[:4] != _MAGIC:
+            raise ValueError(f"Not a term store: {self.path}")
+        _magic, version, one = _FORMAT.unpack(data)
+        if version != _VERSION:
+            raise ValueError(f"Unsupported term store version: {version}")
+        if one != 1:
+            raise ValueError("Term store has a different byte order")
+
+    def _field(self, node: int, offset: int) -> int:
+        return self._nodes.view[1 + node * _NODE_FIELDS + offset]
+
+    def _size(self, node: int) -> int:
+        size = self._field(node, _SIZE)
+        if size < _MAXIMUM_SIZE:
+            return size
+
+        # Sum the sizes of the children, after those of their own children
+        # that are too large.
+        sizes: dict[int, int] = {}
+        stack = [node]
+        while stack:
+            current = stack[-1]
+            children = self._children(current)
+            pending = [
+                child
+                for child in children
+                if child not in sizes and self._field(child, _SIZE) == _MAXIMUM_SIZE
+            ]
+            if pending:
+                stack.extend(pending)
+                continue
+            stack.pop()
+            sizes[current] = 1 + sum(
+                sizes.get(child) or self._field(child, _SIZE) for child in children
+            )
+        return sizes[node]
+
+    def _children(self, node: int) -> list[int]:
+        arity = self.table.arities[self._field(node, _SYMBOL)]
+        start = 1 + self._field(node, _ARGUMENTS)
+        return self._arguments.view[start : start + arity].tolist()
+
+    def _lookup(self, term: TermLike, *, add: bool) -> int | None:
+        """Return the node of a term, optionally adding it and its subterms."""
+        # Terms are visited in post-order, skipping shared subterms. The nodes
+        # of visited subterms are memoized on their identity, and the subterms
+        # kept alive so that their identities are not reused.
+        # The children of a subterm are saved when it is expanded, since the
+        # children of handles from other stores are created on demand.
+        nodes: dict[int, int] = {}
+        visited: list[TermLike] = []
+        stack: list[tuple[TermLike, tuple[TermLike, ...] | None]] = [(term, None)]
+        while stack:
+            current, children = stack.pop()
+            if id(current) in nodes:
+                continue
+
+            if isinstance(current, StoredTerm) and current.store is self:
+                node: int | None = current.node
+            elif isinstance(current, Term | StoredTerm):
+                if children is None:
+                    children = current.children
+                    stack.append((current, children))
+                    stack.extend((child, None) for child in reversed(children))
+                    continue
+                child_nodes = [nodes[id(child)] for child in children]
+                node = self._intern(current.root, child_nodes, add=add)
+            elif isinstance(current, TerminalSymbol):
+                node = self._intern(current, [], add=add)
+            else:
+                raise TypeError(
+                    f"object of type {type(current).__name__} is not a term or a "
+                    "terminal symbol"
+                )
+
+            if node is None:
+                return None
+            nodes[id(current)] = node
+            visited.append(current)
+
+        return nodes[id(term)]
+
+    def _intern(self, symbol: Symbol, children: list[int], *, add: bool) -> int | None:
+        symbol_id = self.table.find(_plain(symbol))
+        if symbol_id is None:
+            if not add:
+                return None
+            symbol_id = self._add_symbol(_plain(symbol))
+
+        key_hash = _node_hash(symbol_id, children)
+        index = self._index.view
+        mask = len(index) - 2
+        slot = key_hash & mask
+        while entry := index[1 + slot]:
+            node = entry - 1
+            if (
+                self._field(node, _HASH) == key_hash
+                and self._field(node, _SYMBOL) == symbol_id
+                and self._children(node) == children
+            ):
+                return node
+            slot = (slot + 1) & mask
+
+        if not add:
+            return None
+
+        node = len(self)
+        size = 1
+        depth = 0
+        for child in children:
+            size += self._field(child, _SIZE)
+            depth = max(depth, self._field(child, _DEPTH) + 1)
+        size = min(size, _MAXIMUM_SIZE)
+        arguments = self._arguments.extend(children)
+        self._nodes.extend([symbol_id, arguments, size, depth, key_hash])
+
+        index[1 + slot] = node + 1
+        index[0] += 1
+        if 2 * index[0] > len(index) - 1:
+            self._grow_index()
+        return node
+
+    def _add_symbol(self, symbol: Symbol) -> int:
+        # Nodes are written through the mapped files, which the operating
+        # system may write back at any time, so a symbol must be on the disk
+        # before any node refers to it.
+        header, name = _pack_symbol(symbol)
+        self._symbols_file.write(header + name)
+        self._symbols_file.flush()
+        os.fsync(self._symbols_file.fileno())
+        return self.table.add(symbol)
+
+    def _grow_index(self) -> None:
+        """Double the capacity of the index, and reinsert every node."""
+        capacity = 2 * (len(self._index.view) - 1)
+        self._index.resize(capacity + 1, clear=True)
+        index = self._index.view
+        mask = capacity - 1
+        for node in range(len(self)):
+            slot = self._field(node, _HASH) & mask
+            while index[1 + slot]:
+                slot = (slot + 1) & mask
+            index[1 + slot] = node + 1
+        index[0] = len(self)
+
+
+def _node_hash(symbol_id: int, children: list[int]) -> int:
+    """Return the hash of a node, as a signed 64-bit integer."""
+    value = (_HASH_OFFSET ^ symbol_id) * _HASH_PRIME & _HASH_MASK
+    for child in children:
+        value = (value ^ child) * _HASH_PRIME & _HASH_MASK
+    value ^= value >> 32
+    return value - (value >> 63 << 64)
+
+
+def _plain(symbol: Symbol) -> Symbol:
+    """Return a variable as a plain variable, without a pool."""
+    if isinstance(symbol, IndexedVariable) and type(symbol) is not IndexedVariable:
+        return IndexedVariable(name=symbol.name, index=symbol.index)
+    if isinstance(symbol, Variable) and type(symbol) not in (Variable, IndexedVariable):
+        return Variable(name=symbol.name)
+    return symbol
+
+
+@dataclass(frozen=True, slots=True)
+class StoredTerm(TermLike):
+    """A handle to a term in a ``TermStore``.
+
+    A handle only holds its store and node number, and reads everything else
+    from the store when needed. Handles to the same node are equal, and since
+    the store is hash-consed, handles from the same store are equal exactly
+    when their terms are.
+    """
+
+    store: TermStore
+    node: int
+
+    @property
+    def root(self) -> Function:
+        """Return the root symbol of this term."""
+        store = self.store
+        root = store.table.symbols[store._field(self.node, _SYMBOL)]
+        assert isinstance(root, Function)
+        return root
+
+    @property
+    def children(self) -> tuple[TermLike, ...]:
+        """Return handles to the immediate subterms of this term."""
+        store = self.store
+        return tuple(store.get(child) for child in store._children(self.node))
+
+    def __str__(self) -> str:
+        """Format this term like the equivalent term."""
+        return str(self.to_term())
+
+    def __getitem__(self, position: PositionIterable) -> TermLike:
+        """Get a handle to the subterm at the specified position.
+
+        Accessing an invalid position raises a ``KeyError``, like ``Term``.
+        """
+        position_copy: Position = tuple(position)
+        store = self.store
+        node = self.node
+        for index in position_copy:
+            children = store._children(node)
+            if not 0 <= index < len(children):
+                raise KeyError(f"Invalid position: {position_copy}")
+            node = children[index]
+        return store.get(node)
+
+    def __len__(self) -> int:
+        """Return the number of positions in this term."""
+        return self.store._size(self.node)
+
+    @property
+    def depth(self) -> int:
+        """Return the length of the longest position in this term."""
+        return self.store._field(self.node, _DEPTH)
+
+    def subterms(self) -> Iterator[tuple[Position, TermLike]]:
+        """Return an iterator over positions and subterms, in pre-order."""
+        store = self.store
+        stack: list[tuple[Position, int]] = [((), self.node)]
+        while stack:
+            position, node = stack.pop()
+            yield (position, store.get(node))
+            children = store._children(node)
+            stack.extend(
+                ((*position, index), children[index])
+                for index in range(len(children) - 1, -1, -1)
+            )
+
+    def to_term(self) -> Term:
+        """Read this term from the store as a ``Term``.
+
+        Shared subterms are read once, and shared in the result.
+        """
+        store = self.store
+        symbols = store.table.symbols
+        terms: dict[int, TermLike] = {}
+        stack: list[tuple[int, bool]] = [(self.node, False)]
+        while stack:
+            node, expanded = stack.pop()
+            if node in terms:
+                continue
+            symbol = symbols[store._field(node, _SYMBOL)]
+            if not isinstance(symbol, Function):
+                terms[node] = symbol
+                continue
+            children = store._children(node)
+            if not expanded:
+                stack.append((node, True))
+                stack.extend((child, False) for child in children)
+                continue
+            terms[node] = Term(symbol, tuple(terms[child] for child in children))
+
+        term = terms[self.node]
+        assert isinstance(term, Term)
+        return term
+
+    def _variables(self) -> Iterator[Variable]:
+        store = self.store
+        symbols = store.table.symbols
+        seen: set[int] = set()
+        stack = [self.node]
+        while stack:
+            node = stack.pop()
+            if node in seen:
+                continue
+            seen.add(node)
+            symbol = symbols[store._field(node, _SYMBOL)]
+            if isinstance(symbol, Variable):
+                yield symbol
+            else:
+                stack.extend(store._children(node))
+
+    def _substitute(self, mapping: VariableMapping) -> Term:
+        return self.to_term()._substitute(mapping)
@@ -0,0 +1,185 @@
+"""Module for alternative representations of substitutions.
+
+A ``Substitution`` is idempotent when each variable is mapped directly to its
+final value. Building one step by step, as unification and completion do,
+means re-applying the accumulated substitution to every binding each time a
+variable is bound, which takes quadratic time over a long chain of steps.
+
+A triangular substitution instead records each binding as it is made, and its
+bindings may refer to variables bound by later ones::
+
+    sub = TriangularSubstitution()
+    sub.bind(x, f(y, y))
+    sub.bind(y, g(z))
+    sub.deref(x)  # f(?y, ?y)
+    sub(x)  # f(g(?z), g(?z))
+
+Binding a variable and dereferencing one take constant time. The bindings are
+resolved when the substitution is applied, as far as needed, and
+``to_substitution()`` converts to an idempotent substitution on demand.
+
+A persistent substitution is an immutable ``Substitution`` that can be extended
+with new bindings in logarithmic time, sharing its structure with the original,
+which is convenient for backtracking search::
+
+    sub = PersistentSubstitution()
+    left = sub.extend(x, a)
+    right = sub.extend(x, b)  # sub and left are unchanged
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterator, Mapping
+from dataclasses import dataclass, field
+
+from ._hamt import PersistentMap
+from .terms import Substitution, SupportsSubstitute, TermLike, Variable
+
+
+@dataclass
+class TriangularSubstitution:
+    """A substitution whose bindings are resolved lazily.
+
+    Bindings must not be cyclic: a variable must not occur in its own value
+    after resolution. Resolving a cyclic binding raises ``ValueError``.
+    """
+
+    bindings: dict[Variable, TermLike] = field(default_factory=dict)
+    _resolved: _ResolvedMapping = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self._resolved = _ResolvedMapping(self.bindings)
+
+    def __str__(self) -> str:
+        """Format this substitution as its bindings."""
+        return str(Substitution(mapping=self.bindings))
+
+    def __call__[T](self, value: SupportsSubstitute[T]) -> T:
+        """Apply this substitution, fully resolved, to the given value."""
+        try:
+            return value._substitute(self._resolved)
+        except AttributeError:
+            raise TypeError(
+                f"object of type {type(value).__name__} does not support substitution"
+            )
+
+    def __contains__(self, variable: Variable) -> bool:
+        """Return whether this substitution binds the given variable."""
+        return variable in self.bindings
+
+    def __getitem__(self, variable: Variable) -> TermLike:
+        """Get the binding for the given variable, or throw KeyError.
+
+        The binding is not resolved, and may refer to other bound variables.
+        """
+        return self.bindings[variable]
+
+    def __len__(self) -> int:
+        """Return the number of variables bound by this substitution."""
+        return len(self.bindings)
+
+    def bind(self, variable: Variable, term: TermLike) -> None:
+        """Bind an unbound variable to a term.
+
+        Raises ``ValueError`` if the variable is already bound.
+        """
+        if variable in self.bindings:
+            raise ValueError(f"Variable is already bound: {variable}")
+        self.bindings[variable] = term
+        self._resolved.invalidate()
+
+    def deref(self, term: TermLike) -> TermLike:
+        """Follow the bindings of variables until reaching a term or free variable.
+
+        Only the root of the result is resolved; its children may still contain
+        bound variables.
+        """
+        while isinstance(term, Variable) and term in self.bindings:
+            term = self.bindings[term]
+        return term
+
+    def to_substitution(self) -> Substitution:
+        """Return the equivalent idempotent substitution."""
+        return Substitution(mapping=dict(self._resolved))
+
+
+@dataclass(frozen=True)
+class PersistentSubstitution(Substitution):
+    """A substitution with cheap, structure-sharing extension.
+
+    The mapping is a persistent hash map, so many alternative extensions of the
+    same substitution take memory proportional to their differences.
+    """
+
+    mapping: PersistentMap[Variable, TermLike] = field(default_factory=PersistentMap)
+
+    def __post_init__(self) -> None:
+        """Convert the mapping to a persistent map, if it is not one already."""
+        if not isinstance(self.mapping, PersistentMap):
+            object.__setattr__(self, "mapping", PersistentMap(self.mapping))
+
+    def extend(self, variable: Variable, term: TermLike) -> PersistentSubstitution:
+        """Return this substitution with another variable bound to a term.
+
+        Raises ``ValueError`` if the variable is already bound.
+        """
+        if variable in self.mapping:
+            raise ValueError(f"Variable is already bound: {variable}")
+        return PersistentSubstitution(mapping=self.mapping.set(variable, term))
+
+
+class _ResolvedMapping(Mapping[Variable, TermLike]):
+    """The fully resolved values of the bindings, computed on demand.
+
+    Resolved values are memoized, and shared between the values that refer to
+    the same variables, until a new binding is made.
+    """
+
+    def __init__(self, bindings: dict[Variable, TermLike]) -> None:
+        self.bindings = bindings
+        self._resolved: dict[Variable, TermLike] = {}
+
+    def __getitem__(self, variable: Variable) -> TermLike:
+        value = self._resolved.get(variable)
+        if value is None:
+            if variable not in self.bindings:
+                raise KeyError(variable)
+            value = self._resolve(variable)
+        return value
+
+    def __contains__(self, variable: object) -> bool:
+        return variable in self.bindings
+
+    def __iter__(self) -> Iterator[Variable]:
+        return iter(self.bindings)
+
+    def __len__(self) -> int:
+        return len(self.bindings)
+
+    def invalidate(self) -> None:
+        self._resolved.clear()
+
+    def _resolve(self, variable: Variable) -> TermLike:
+        # Resolve the bound variables that the binding depends on first, in
+        # post-order. The active variables are those on the stack, so meeting
+        # one again means the bindings are cyclic.
+        bindings = self.bindings
+        resolved = self._resolved
+        active = {variable}
+        stack = [(variable, iter(bindings[variable].variable_set))]
+        while stack:
+            current, dependencies = stack[-1]
+            for dependency in dependencies:
+                if dependency not in bindings or dependency in resolved:
+                    continue
+                if dependency in active:
+                    raise ValueError(f"Cyclic binding for variable: {dependency}")
+                active.add(dependency)
+                stack.append((dependency, iter(bindings[dependency].variable_set)))
+                break
+            else:
+                stack.pop()
+                active.discard(current)
+                resolved[current] = bindings[current]._substitute(self)
+
+        return resolved[variable]
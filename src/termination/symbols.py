@@ -0,0 +1,239 @@
+"""Module for integer symbol tables.
+
+A symbol table assigns each symbol a dense integer id, starting from zero, in
+the order the symbols are added. Compact representations like flatterms store
+these ids instead of references to symbol objects::
+
+    table = SymbolTable()
+    table.add(Function(name='f', arity=2))  # 0
+    table.add(Constant(name='a'))  # 1
+    table.add(Function(name='f', arity=2))  # 0
+
+A symbol table also interns symbols: ``intern()`` returns one canonical
+instance per symbol. A canonical instance carries its id, so looking it up
+takes an attribute access and an identity check, instead of hashing and
+comparing its name. Per-symbol data like precedences and weights can then be
+stored in arrays indexed by id::
+
+    f = table.intern(Function(name='f', arity=2))
+    precedence = table.array({f: 1})
+    precedence.get(f)  # 1
+"""
+
+from __future__ import annotations
+
+from array import array
+from collections.abc import Callable, Iterator, Mapping
+from dataclasses import dataclass, field
+from typing import overload
+
+from .terms import Function, Symbol
+
+
+# The annotations of the table's fields would otherwise refer to its array()
+# method.
+type _IntArray = array[int]
+
+
+@dataclass
+class SymbolTable:
+    """A table assigning dense integer ids to symbols.
+
+    Alongside the symbols themselves, the table keeps an array of their
+    arities indexed by id, where terminal symbols (constants and variables)
+    have arity 0.
+    """
+
+    symbols: list[Symbol] = field(default_factory=list)
+    ids: dict[Symbol, int] = field(default_factory=dict)
+    arities: _IntArray = field(default_factory=lambda: array("q"))
+
+    # Ids keyed on the identity of the canonical instances, for instances that
+    # carry the id of another table. The instances are kept alive by the list
+    # of symbols.
+    _identities: dict[int, int] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+
+    def __len__(self) -> int:
+        """Return the number of symbols in this table."""
+        return len(self.symbols)
+
+    def __iter__(self) -> Iterator[Symbol]:
+        """Return an iterator over the symbols in this table, in id order."""
+        return iter(self.symbols)
+
+    def __contains__(self, symbol: Symbol) -> bool:
+        """Return whether the given symbol has an id in this table."""
+        return symbol in self.ids
+
+    def __getitem__(self, symbol: Symbol) -> int:
+        """Return the id of the given symbol, or raise KeyError."""
+        symbol_id = self.find(symbol)
+        if symbol_id is None:
+            raise KeyError(symbol)
+        return symbol_id
+
+    def find(self, symbol: Symbol) -> int | None:
+        """Return the id of the given symbol, or None if it has none."""
+        symbol_id = symbol._symbol_id
+        symbols = self.symbols
+        if 0 <= symbol_id < len(symbols) and symbols[symbol_id] is symbol:
+            return symbol_id
+
+        symbol_id = self._identities.get(id(symbol))
+        if symbol_id is None:
+            return self.ids.get(symbol)
+        return symbol_id
+
+    def add(self, symbol: Symbol) -> int:
+        """Return the id of the given symbol, assigning a new id if necessary."""
+        symbol_id = self.find(symbol)
+        if symbol_id is not None:
+            return symbol_id
+
+        symbol_id = len(self.symbols)
+        self.symbols.append(symbol)
+        self.ids[symbol] = symbol_id
+        if symbol._symbol_id < 0:
+            object.__setattr__(symbol, "_symbol_id", symbol_id)
+        else:
+            self._identities[id(symbol)] = symbol_id
+        self.arities.append(symbol.arity if isinstance(symbol, Function) else 0)
+        return symbol_id
+
+    def intern[S: Symbol](self, symbol: S) -> S:
+        """Return the canonical instance of the given symbol.
+
+        The first instance of a symbol added to the table becomes canonical.
+        """
+        canonical = self.symbols[self.add(symbol)]
+        assert isinstance(canonical, type(symbol))
+        return canonical
+
+    def symbol(self, symbol_id: int) -> Symbol:
+        """Return the symbol with the given id, or raise IndexError."""
+        return self.symbols[symbol_id]
+
+    def array(self, values: Mapping[Symbol, int]) -> SymbolArray:
+        """Return an array of integers indexed by the ids of the given symbols.
+
+        Symbols that are not yet in the table are added.
+        """
+        result = SymbolArray(table=self)
+        for symbol, value in values.items():
+            result[symbol] = value
+        return result
+
+
+# The value of array entries for symbols without a value.
+_MISSING = -(2**63)
+
+
+@dataclass(eq=False)
+class SymbolArray(Mapping[Symbol, int]):
+    """A mapping from symbols to integers, stored in an array indexed by id.
+
+    This is a drop-in replacement for a dictionary of per-symbol integers,
+    like a precedence or weights. Symbols outside the table have no value.
+
+    A call to ``get()`` costs about as much as a dictionary lookup. Hot loops
+    should use a function from ``lookup()`` instead, which avoids hashing the
+    canonical symbols of the table. Arrays compare equal to any mapping with
+    the same items, like a dictionary.
+    """
+
+    table: SymbolTable
+    _values: array[int] = field(default_factory=lambda: array("q"), init=False)
+    _count: int = field(default=0, init=False, repr=False, compare=False)
+    _dense: list[int | None] | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    def __getitem__(self, symbol: Symbol) -> int:
+        """Return the value for the given symbol, or raise KeyError."""
+        value = self.get(symbol)
+        if value is None:
+            raise KeyError(symbol)
+        return value
+
+    def __setitem__(self, symbol: Symbol, value: int) -> None:
+        """Set the value for the given symbol, adding it to the table."""
+        symbol_id = self.table.add(symbol)
+        missing = symbol_id + 1 - len(self._values)
+        if missing > 0:
+            self._values.extend([_MISSING] * missing)
+        self._count += (value != _MISSING) - (self._values[symbol_id] != _MISSING)
+        self._values[symbol_id] = value
+        self._dense = None
+
+    def __iter__(self) -> Iterator[Symbol]:
+        """Return an iterator over the symbols with values, in id order."""
+        for symbol_id, value in enumerate(self._values):
+            if value != _MISSING:
+                yield self.table.symbol(symbol_id)
+
+    def __len__(self) -> int:
+        """Return the number of symbols with values."""
+        return self._count
+
+    @overload
+    def get(self, symbol: object, /) -> int | None: ...
+    @overload
+    def get(self, symbol: object, default: int, /) -> int: ...
+    @overload
+    def get[T](self, symbol: object, default: T, /) -> int | T: ...
+
+    def get(self, symbol: object, default: object = None, /) -> object:
+        """Return the value for the given symbol, or the default."""
+        if not isinstance(symbol, Symbol):
+            return default
+        symbol_id = self.table.find(symbol)
+        if symbol_id is None or symbol_id >= len(self._values):
+            return default
+        value = self._values[symbol_id]
+        return default if value == _MISSING else value
+
+    def _dense_values(self) -> list[int | None]:
+        """Return the values indexed by id, with None for missing values.
+
+        The list is computed once, until the next assignment to this array.
+        """
+        if self._dense is None:
+            self._dense = [
+                None if value == _MISSING else value for value in self._values
+            ]
+        return self._dense
+
+
+@overload
+def lookup(values: Mapping[Symbol, int]) -> Callable[[Symbol], int | None]: ...
+@overload
+def lookup(values: Mapping[Symbol, int], default: int) -> Callable[[Symbol], int]: ...
+
+
+def lookup(
+    values: Mapping[Symbol, int], default: int | None = None
+) -> Callable[[Symbol], int | None]:
+    """Return a function looking up the value of a symbol, or the default.
+
+    For a ``SymbolArray``, the function looks up canonical symbols of its
+    table by the id they carry, with an identity check instead of hashing the
+    symbol. The function sees the values of the array when it was made.
+    """
+    if not isinstance(values, SymbolArray):
+        if default is None:
+            return values.get
+        return lambda symbol: values.get(symbol, default)
+
+    symbols = values.table.symbols
+    dense = values._dense_values()
+
+    def lookup_dense(symbol: Symbol) -> int | None:
+        symbol_id = symbol._symbol_id
+        if 0 <= symbol_id < len(dense) and symbols[symbol_id] is symbol:
+            value = dense[symbol_id]
+            return default if value is None else value
+        return values.get(symbol, default)
+
+    return lookup_dense
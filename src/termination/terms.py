@@ -4,7 +4,11 @@ from __future__ import annotations
 
 from collections.abc import Iterable, Iterator, Mapping
 from dataclasses import dataclass, field
-from typing import Never, Protocol, runtime_checkable, Self
+from functools import cached_property
+from operator import is_
+from typing import Any, Literal, Never, Protocol, Self, overload, runtime_checkable
+
+from ._hamt import PersistentMap
 
 
 type Position = tuple[int, ...]
@@ -16,10 +20,12 @@ type VariableMapping = Mapping[Variable, TermLike]
 class TermLike(Protocol):
     """Abstract base class for things that can act as subterms.
 
-    In addition to the listed abstract methods, implementations should respond
-    to the free variables() function.
+    Implementations respond to substitutions and to the free variables()
+    function through the ``_substitute`` and ``_variables`` methods.
     """
 
+    __slots__ = ()
+
     def __getitem__(self, position: PositionIterable) -> TermLike: ...
 
     def __contains__(self, position: PositionIterable) -> bool:
@@ -34,20 +40,49 @@ class TermLike(Protocol):
 
     def subterms(self) -> Iterator[tuple[Position, TermLike]]: ...
 
+    def _substitute(self, mapping: VariableMapping) -> TermLike: ...
+
+    def _variables(self) -> Iterator[Variable]: ...
+
     def positions(self) -> Iterator[Position]:
         yield from (position for (position, _term) in self.subterms())
 
+    @property
+    def depth(self) -> int:
+        """Return the length of the longest position in this object."""
+        return max(len(position) for position in self.positions())
 
-@dataclass(frozen=True)
+    @property
+    def is_ground(self) -> bool:
+        """Return whether no variable occurs in this object."""
+        return not self.variable_set
+
+    @property
+    def variable_set(self) -> frozenset[Variable]:
+        """Return the set of variables that occur in this object."""
+        return frozenset(variables(self))
+
+
+@dataclass(frozen=True, slots=True)
 class Symbol:
-    """Base class for symbols, which have names."""
+    """Base class for symbols, which have names.
+
+    Symbols are the most numerous objects in large term structures, so the
+    whole hierarchy of symbols uses slots instead of instance dictionaries.
+    """
 
     name: str
 
+    # The id of this instance in the first symbol table it is canonical in, or
+    # -1. Tables check that the instance is theirs before trusting the id.
+    _symbol_id: int = field(default=-1, init=False, repr=False, compare=False)
+
 
 class TerminalSymbol(Symbol, TermLike):
     """Base class for symbols that occur as terms."""
 
+    __slots__ = ()
+
     def __getitem__(self, position: PositionIterable) -> Self:
         position_copy = tuple(position)
         position_iter = iter(position_copy)
@@ -62,11 +97,15 @@ class TerminalSymbol(Symbol, TermLike):
     def __len__(self) -> int:
         return 1
 
+    @property
+    def depth(self) -> int:
+        return 0
+
     def subterms(self) -> Iterator[tuple[Position, Self]]:
         yield ((), self)
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Function(Symbol):
     """A function symbol.
 
@@ -104,6 +143,8 @@ class Constant(TerminalSymbol):
     name, which is their identity.
     """
 
+    __slots__ = ()
+
     def __str__(self) -> str:
         """Format this constant as its name.
 
@@ -114,6 +155,14 @@ class Constant(TerminalSymbol):
         """
         return self.name
 
+    @property
+    def is_ground(self) -> bool:
+        return True
+
+    @property
+    def variable_set(self) -> frozenset[Variable]:
+        return frozenset()
+
     def _substitute(self, mapping: VariableMapping) -> Constant:
         return self
 
@@ -129,6 +178,8 @@ class Variable(TerminalSymbol):
     which is their identity.
     """
 
+    __slots__ = ()
+
     def __str__(self) -> str:
         """Format this variable with its name.
 
@@ -139,6 +190,14 @@ class Variable(TerminalSymbol):
         """
         return f"?{self.name}"
 
+    @property
+    def is_ground(self) -> bool:
+        return False
+
+    @property
+    def variable_set(self) -> frozenset[Variable]:
+        return frozenset((self,))
+
     def _variables(self) -> Iterator[Self]:
         yield self
 
@@ -148,7 +207,7 @@ class Variable(TerminalSymbol):
         return self
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class IndexedVariable(Variable):
     """A variable with an index.
 
@@ -193,6 +252,44 @@ class Term(TermLike):
                 f"Incorrect number of child terms: Expected {arity}, found {length}"
             )
 
+    def __eq__(self, other: object) -> bool:
+        """Compare this term structurally with another term.
+
+        Identical objects are equal without inspecting their children, and
+        terms whose (cached) hashes differ are unequal without a traversal. In
+        particular, comparing two terms from the same ``InternTable`` amounts
+        to an identity check.
+        """
+        if self is other:
+            return True
+        if not isinstance(other, Term):
+            return NotImplemented
+
+        # Compare pairs of subterms with an explicit stack, so that deep terms
+        # don't exhaust the recursion limit.
+        stack: list[tuple[TermLike, TermLike]] = [(self, other)]
+        while stack:
+            left, right = stack.pop()
+            if left is right:
+                continue
+            if isinstance(left, Term) and isinstance(right, Term):
+                if hash(left) != hash(right) or left.root != right.root:
+                    return False
+                stack.extend(zip(left.children, right.children))
+            elif left != right:
+                return False
+
+        return True
+
+    def __hash__(self) -> int:
+        """Return the hash of this term, which is computed at most once."""
+        return self._hash
+
+    @cached_property
+    def _hash(self) -> int:
+        _prime(self, "_hash")
+        return hash((self.root, self.children))
+
     def __str__(self) -> str:
         """Format this term as a function call.
 
@@ -206,11 +303,29 @@ class Term(TermLike):
 
             str(t)  # 'f(g(c), ?x)'
         """
-        # The default str() for Function includes the arity, which is redundant
-        # here. Just use the symbol's name.
-        root_str = self.root.name
-        children_str = ", ".join(str(child) for child in self.children)
-        return f"{root_str}({children_str})"
+        parts: list[str] = []
+
+        # The stack holds subterms still to be formatted, interleaved with the
+        # punctuation between them.
+        stack: list[TermLike | str] = [self]
+        while stack:
+            item = stack.pop()
+            if isinstance(item, str):
+                parts.append(item)
+            elif isinstance(item, Term):
+                # The default str() for Function includes the arity, which is
+                # redundant here. Just use the symbol's name.
+                parts.append(item.root.name)
+                parts.append("(")
+                stack.append(")")
+                for index in reversed(range(len(item.children))):
+                    stack.append(item.children[index])
+                    if index:
+                        stack.append(", ")
+            else:
+                parts.append(str(item))
+
+        return "".join(parts)
 
     def __getitem__(self, position: PositionIterable) -> TermLike:
         """Get the subterm at the specified position in this term.
@@ -269,15 +384,49 @@ class Term(TermLike):
         return current_term
 
     def __len__(self) -> int:
-        """Return the number of positions in this term."""
+        """Return the number of positions in this term.
+
+        Like the other structural properties of a term, the size is computed at
+        most once, and then cached on the instance.
+        """
+        return self._size
+
+    @cached_property
+    def _size(self) -> int:
+        _prime(self, "_size")
         return 1 + sum(len(child) for child in self.children)
 
+    @cached_property
+    def depth(self) -> int:
+        """Return the length of the longest position in this term."""
+        _prime(self, "depth")
+        return 1 + max(child.depth for child in self.children)
+
+    @cached_property
+    def is_ground(self) -> bool:
+        """Return whether no variable occurs in this term."""
+        _prime(self, "is_ground")
+        return all(child.is_ground for child in self.children)
+
+    @property
+    def variable_set(self) -> frozenset[Variable]:
+        """Return the set of variables that occur in this term.
+
+        Unlike the other structural properties, the set is not cached: storing
+        a set on every subterm costs memory proportional to the depth times
+        the number of variables. Only ``is_ground`` is cached.
+        """
+        return frozenset(variables(self))
+
     def subterms(self) -> Iterator[tuple[Position, TermLike]]:
         """Return an iterator over valid positions in this term and the subterm.
 
-        The order in which subterms are yielded is not specified. Each position
-        will be yielded exactly once. Subterms will be repeated if the same
-        subterm occurs at multiple positions.
+        Subterms are yielded in pre-order, i.e., each subterm before its
+        children, and the children from left to right. Each position will be
+        yielded exactly once. Subterms will be repeated if the same subterm
+        occurs at multiple positions. The traversal does not recurse, so it
+        supports terms of any depth; see ``preorder()`` and ``postorder()`` for
+        other traversals, including ones without positions.
 
         For example::
             f = Function(name='f', arity=2)
@@ -288,27 +437,271 @@ class Term(TermLike):
 
             i = t.subterms()
 
-            # Note the exact order of these pairs is not specified.
             next(i)  # ((), t)
             next(i)  # ((0,), Term(root=g, children=(c,)))
             next(i)  # ((0,0), c)
             next(i)  # ((1,), x)
             next(i)  # StopIteration
         """
-        yield ((), self)
-        for index, child in enumerate(self.children):
-            for position, term in child.subterms():
-                yield ((index, *position), term)
+        return preorder(self, positions=True)
 
     def _substitute(self, mapping: VariableMapping) -> Term:
-        return Term(
-            root=self.root,
-            children=tuple(child._substitute(mapping) for child in self.children),
-        )
+        """Apply a mapping to this term, sharing as much as possible.
+
+        Ground subterms are returned as they are, without being visited, and
+        each distinct subterm object is substituted once, so shared subterms of
+        the result stay shared. Subterms that no mapped variable occurs in are
+        also returned as they are.
+        """
+        if self.is_ground:
+            return self
+
+        results: dict[int, TermLike] = {}
+
+        # Each stack entry holds a subterm, and whether its affected children
+        # have already been pushed.
+        stack: list[tuple[TermLike, bool]] = [(self, False)]
+        while stack:
+            current, expanded = stack.pop()
+            if id(current) in results:
+                continue
+
+            if not isinstance(current, Term):
+                results[id(current)] = current._substitute(mapping)
+            elif not expanded:
+                stack.append((current, True))
+                for child in reversed(current.children):
+                    if id(child) not in results and not child.is_ground:
+                        stack.append((child, False))
+            else:
+                children = tuple(
+                    results.get(id(child), child) for child in current.children
+                )
+                if all(map(is_, children, current.children)):
+                    results[id(current)] = current
+                else:
+                    results[id(current)] = Term(root=current.root, children=children)
+
+        result = results[id(self)]
+        assert isinstance(result, Term)
+        return result
 
     def _variables(self) -> Iterator[Variable]:
-        for child in self.children:
-            yield from variables(child)
+        # Walk the term in pre-order with an explicit stack, skipping ground
+        # subterms and subterms that have already been visited, so that shared
+        # subterms are walked once and each variable is yielded once.
+        seen: set[Variable] = set()
+        visited: set[int] = set()
+        stack: list[TermLike] = [self]
+        while stack:
+            current = stack.pop()
+            if isinstance(current, Term):
+                if id(current) in visited or current.is_ground:
+                    continue
+                visited.add(id(current))
+                stack.extend(reversed(current.children))
+            else:
+                for variable in variables(current):
+                    if variable not in seen:
+                        seen.add(variable)
+                        yield variable
+
+
+def _prime(term: Term, attribute: str) -> None:
+    """Compute a cached property on the descendants of a term, bottom-up.
+
+    Cached properties of a term are defined in terms of the same property on its
+    children. Computing them naively recurses once per level, so instead each
+    property first makes sure that every descendant has its value cached,
+    visiting them in post-order with an explicit stack. Shared subterms are only
+    computed once.
+    """
+    stack = [
+        child
+        for child in term.children
+        if isinstance(child, Term) and attribute not in child.__dict__
+    ]
+    while stack:
+        top = stack[-1]
+        if attribute in top.__dict__:
+            stack.pop()
+            continue
+
+        pending = [
+            child
+            for child in top.children
+            if isinstance(child, Term) and attribute not in child.__dict__
+        ]
+        if pending:
+            stack.extend(pending)
+        else:
+            stack.pop()
+            getattr(top, attribute)
+
+
+@overload
+def preorder(
+    term: TermLike, *, positions: Literal[False] = False
+) -> Iterator[TermLike]: ...
+@overload
+def preorder(
+    term: TermLike, *, positions: Literal[True]
+) -> Iterator[tuple[Position, TermLike]]: ...
+
+
+def preorder(
+    term: TermLike, *, positions: bool = False
+) -> Iterator[TermLike] | Iterator[tuple[Position, TermLike]]:
+    """Return an iterator over the subterms of a term in pre-order.
+
+    Each subterm is yielded before its children, and children are visited from
+    left to right. The traversal uses an explicit stack, so it runs in time
+    linear in the size of the term regardless of its depth.
+
+    If ``positions`` is true, ``(position, subterm)`` pairs are yielded, like
+    ``subterms()``. Building the position tuples costs time proportional to the
+    depth of each subterm, so leave it false if the positions are not needed.
+    """
+    if positions:
+        return _preorder_positions(term)
+    return _preorder(term)
+
+
+def _preorder(term: TermLike) -> Iterator[TermLike]:
+    stack = [term]
+    while stack:
+        current = stack.pop()
+        yield current
+        if isinstance(current, Term):
+            stack.extend(reversed(current.children))
+
+
+def _preorder_positions(term: TermLike) -> Iterator[tuple[Position, TermLike]]:
+    # The stack holds the terms along the current path, and the path holds the
+    # index of the current child of each of them. Position tuples are only
+    # built when they are yielded.
+    yield ((), term)
+    if not isinstance(term, Term):
+        return
+    stack: list[Term] = [term]
+    path: list[int] = [0]
+    while stack:
+        parent = stack[-1]
+        index = path[-1]
+        if index == len(parent.children):
+            stack.pop()
+            path.pop()
+            if path:
+                path[-1] += 1
+            continue
+
+        child = parent.children[index]
+        yield (tuple(path), child)
+        if isinstance(child, Term):
+            stack.append(child)
+            path.append(0)
+        else:
+            path[-1] += 1
+
+
+@overload
+def postorder(
+    term: TermLike, *, positions: Literal[False] = False
+) -> Iterator[TermLike]: ...
+@overload
+def postorder(
+    term: TermLike, *, positions: Literal[True]
+) -> Iterator[tuple[Position, TermLike]]: ...
+
+
+def postorder(
+    term: TermLike, *, positions: bool = False
+) -> Iterator[TermLike] | Iterator[tuple[Position, TermLike]]:
+    """Return an iterator over the subterms of a term in post-order.
+
+    Each subterm is yielded after all of its children, and children are visited
+    from left to right, so the term itself is yielded last. Like ``preorder()``,
+    the traversal uses an explicit stack and supports an optional ``positions``
+    flag.
+    """
+    if positions:
+        return _postorder_positions(term)
+    return _postorder(term)
+
+
+def _postorder(term: TermLike) -> Iterator[TermLike]:
+    # Each stack entry holds a subterm and the index of the next child to visit.
+    stack: list[tuple[TermLike, int]] = [(term, 0)]
+    while stack:
+        current, index = stack[-1]
+        if isinstance(current, Term) and index < len(current.children):
+            stack[-1] = (current, index + 1)
+            stack.append((current.children[index], 0))
+        else:
+            stack.pop()
+            yield current
+
+
+def _postorder_positions(term: TermLike) -> Iterator[tuple[Position, TermLike]]:
+    # Like _postorder(), but the index of the next child of each subterm on the
+    # stack is kept apart, and the path holds the position of the top subterm.
+    # Position tuples are only built when they are yielded.
+    stack: list[TermLike] = [term]
+    indexes: list[int] = [0]
+    path: list[int] = []
+    while stack:
+        current = stack[-1]
+        index = indexes[-1]
+        if isinstance(current, Term) and index < len(current.children):
+            indexes[-1] = index + 1
+            stack.append(current.children[index])
+            indexes.append(0)
+            path.append(index)
+        else:
+            stack.pop()
+            indexes.pop()
+            yield (tuple(path), current)
+            if path:
+                path.pop()
+
+
+def replace(
+    term: TermLike, position: PositionIterable, replacement: TermLike
+) -> TermLike:
+    """Return a copy of a term with the subterm at a position replaced.
+
+    Only the terms along the path to the position are rebuilt; all other
+    subterms are shared with the original term. For example::
+
+        f = Function(name='f', arity=2)
+        g = Function(name='g', arity=1)
+        c = Constant(name='c')
+        x = Variable(name='x')
+        t = Term(root=f, children=(Term(root=g, children=(c,)), x))
+
+        replace(t, (0, 0), x)  # f(g(?x), ?x)
+        replace(t, (), c)  # c
+
+    Replacing at an invalid position raises a ``KeyError``.
+    """
+    position_copy: Position = tuple(position)
+
+    path: list[tuple[Term, int]] = []
+    current = term
+    for index in position_copy:
+        if not isinstance(current, Term) or not 0 <= index < len(current.children):
+            raise KeyError(f"Invalid position: {position_copy}")
+        path.append((current, index))
+        current = current.children[index]
+
+    result = replacement
+    for parent, index in reversed(path):
+        children = parent.children
+        result = Term(
+            root=parent.root,
+            children=(*children[:index], result, *children[index + 1 :]),
+        )
+    return result
 
 
 @runtime_checkable
@@ -336,6 +729,24 @@ def variables(value: SupportsVariables) -> Iterator[Variable]:
         raise TypeError(f"object of type {type(value).__name__} has no variables()")
 
 
+# Each variable maps to the set of bound variables whose values it occurs in,
+# kept as a persistent map to None.
+type _Occurrences = PersistentMap[Variable, PersistentMap[Variable, None]]
+
+_NO_OCCURRENCES: PersistentMap[Variable, None] = PersistentMap()
+
+
+def _index_occurrences(
+    occurrences: _Occurrences, bindings: Iterable[tuple[Variable, TermLike]]
+) -> _Occurrences:
+    """Add the variables of some bindings' values to an occurrence index."""
+    for bound, term in bindings:
+        for variable in term.variable_set:
+            occurring = occurrences.get(variable, _NO_OCCURRENCES)
+            occurrences = occurrences.set(variable, occurring.set(bound, None))
+    return occurrences
+
+
 @runtime_checkable
 class SupportsSubstitute[R](Protocol):
     def _substitute(self, mapping: VariableMapping) -> R:
@@ -355,7 +766,12 @@ class Substitution:
         )
         return f"{{{mapping_str}}}"
 
-    def __call__[T](self, value: SupportsSubstitute[T]) -> T:
+    @overload
+    def __call__[T](self, value: SupportsSubstitute[T]) -> T: ...
+    @overload
+    def __call__(self, value: TermLike) -> TermLike: ...
+
+    def __call__(self, value: Any) -> Any:
         """Apply this substitution to the given value."""
         try:
             return value._substitute(self.mapping)
@@ -376,6 +792,34 @@ class Substitution:
         """Return the number of variables explicitly mapped by this substitution."""
         return len(self.mapping)
 
+    def compose(self, other: Substitution) -> Substitution:
+        """Return the substitution applying this one, then the other one.
+
+        This is the same as ``other(self)``::
+
+            self.compose(other)(x) == other(self(x))
+
+        Only the bindings of this substitution that contain a variable mapped
+        by the other one are touched. They are found through an index from
+        each variable to the bindings it occurs in, and the result shares its
+        mapping and index with this substitution, so composing with a small
+        substitution takes time proportional to its size and the number of
+        affected bindings, not to the size of this substitution.
+        """
+        return self._substitute(other.mapping)
+
+    @cached_property
+    def _occurrences(self) -> tuple[PersistentMap[Variable, TermLike], _Occurrences]:
+        """Return the mapping as a persistent map, with its occurrence index.
+
+        The index maps each variable to the bound variables whose values it
+        occurs in. Substitutions made by composition have it from the start.
+        """
+        mapping = self.mapping
+        if not isinstance(mapping, PersistentMap):
+            mapping = PersistentMap(mapping)
+        return (mapping, _index_occurrences(PersistentMap(), mapping.items()))
+
     def _substitute(self, mapping: VariableMapping) -> Substitution:
         """Apply another substitution to this one.
 
@@ -400,17 +844,33 @@ class Substitution:
 
             s2(s1)(z) == s2(s1(z)) == s2(z)
         """
-        return Substitution(
-            # Create a new combined mapping. Later mappings override earlier
-            # ones.
-            mapping={
-                **mapping,
-                **{
-                    variable: term._substitute(mapping)
-                    for (variable, term) in self.mapping.items()
-                },
-            }
+        bindings, occurrences = self._occurrences
+        original = bindings
+
+        # The bindings whose values contain a mapped variable are substituted,
+        # and after that, the mapped variables only occur in the new values.
+        affected: set[Variable] = set()
+        changed: list[tuple[Variable, TermLike]] = []
+        for variable, term in mapping.items():
+            occurring = occurrences.get(variable)
+            if occurring:
+                affected.update(occurring)
+                occurrences = occurrences.set(variable, _NO_OCCURRENCES)
+            if variable not in original:
+                bindings = bindings.set(variable, term)
+                changed.append((variable, term))
+
+        for variable in affected:
+            term = original[variable]._substitute(mapping)
+            bindings = bindings.set(variable, term)
+            changed.append((variable, term))
+
+        result = Substitution(mapping=bindings)
+        result.__dict__["_occurrences"] = (
+            bindings,
+            _index_occurrences(occurrences, changed),
         )
+        return result
 
     def _variables(self) -> Iterator[Variable]:
         yield from self.mapping.keys()
@@ -0,0 +1,263 @@
+"""Module for syntactic unification.
+
+A unifier of two terms ``s`` and ``t`` is a substitution ``u`` such that
+``u(s) == u(t)``. Unifiable terms have a most general unifier, which is unique
+up to renaming of variables::
+
+    unify(f(x, g(a)), f(g(y), y))  # {?x -> g(g(a)), ?y -> g(a)}
+    unify(f(x, x), f(a, b))  # None
+
+The algorithm is Huet's union-find unification: equations are solved by
+merging equivalence classes of subterms, each class keeping at most one
+non-variable representative, and the occurs check is deferred to a single
+cycle check over the classes once all equations are solved. Nothing is
+substituted while solving, so the running time is nearly linear in the size of
+the input, even on families like::
+
+    f(x1, ..., xn) = f(g(x0, x0), ..., g(x(n-1), x(n-1)))
+
+whose most general unifiers are exponentially large when written out as trees.
+The idempotent unifiers built here share subterms instead.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from operator import is_
+from typing import Literal, overload
+
+from .substitutions import TriangularSubstitution
+from .terms import Substitution, Term, TermLike, Variable
+
+
+@overload
+def unify(
+    left: TermLike, right: TermLike, *, idempotent: Literal[True] = True
+) -> Substitution | None: ...
+
+
+@overload
+def unify(
+    left: TermLike, right: TermLike, *, idempotent: Literal[False]
+) -> TriangularSubstitution | None: ...
+
+
+def unify(
+    left: TermLike, right: TermLike, *, idempotent: bool = True
+) -> Substitution | TriangularSubstitution | None:
+    """Return a most general unifier of two terms, or None if there is none.
+
+    If ``idempotent`` is true, the result maps each variable directly to its
+    final value. Otherwise, the result is a ``TriangularSubstitution``, whose
+    bindings may refer to other variables bound by the same substitution and
+    are resolved when it is applied; it is cheaper to build and shares the
+    subterms of the input.
+    """
+    return unify_all([(left, right)], idempotent=idempotent)
+
+
+@overload
+def unify_all(
+    pairs: Iterable[tuple[TermLike, TermLike]], *, idempotent: Literal[True] = True
+) -> Substitution | None: ...
+
+
+@overload
+def unify_all(
+    pairs: Iterable[tuple[TermLike, TermLike]], *, idempotent: Literal[False]
+) -> TriangularSubstitution | None: ...
+
+
+def unify_all(
+    pairs: Iterable[tuple[TermLike, TermLike]], *, idempotent: bool = True
+) -> Substitution | TriangularSubstitution | None:
+    """Return a most general simultaneous unifier of pairs of terms.
+
+    The result unifies every pair at once, or is None if that is impossible.
+    See ``unify()`` for the meaning of ``idempotent``.
+    """
+    unifier = _Unifier()
+    if not unifier.solve(pairs):
+        return None
+
+    mapping = unifier.mapping(idempotent=idempotent)
+    if mapping is None:
+        return None
+    if idempotent:
+        return Substitution(mapping=mapping)
+    return TriangularSubstitution(bindings=mapping)
+
+
+class _Class:
+    """An equivalence class of subterms, as a union-find node."""
+
+    __slots__ = ("parent", "rank", "schema", "variable")
+
+    def __init__(self, schema: TermLike | None, variable: Variable | None) -> None:
+        self.parent = self
+        self.rank = 0
+        # A non-variable subterm in the class, if there is one.
+        self.schema = schema
+        # A variable in the class, if there is one. For classes without a
+        # schema, this is the variable that the others are bound to.
+        self.variable = variable
+
+
+class _Unifier:
+    def __init__(self) -> None:
+        # Classes are keyed on variables and constants by equality, and on
+        # terms by identity. The terms are kept alive by the caller.
+        self.classes: dict[object, _Class] = {}
+
+    def solve(self, pairs: Iterable[tuple[TermLike, TermLike]]) -> bool:
+        stack = list(pairs)
+        while stack:
+            left, right = stack.pop()
+            if left is right:
+                continue
+
+            left_class = self._find(self._class(left))
+            right_class = self._find(self._class(right))
+            if left_class is right_class:
+                continue
+
+            left_schema = left_class.schema
+            right_schema = right_class.schema
+            if left_schema is None or right_schema is None:
+                self._union(left_class, right_class)
+                continue
+
+            if isinstance(left_schema, Term) and isinstance(right_schema, Term):
+                if left_schema.root != right_schema.root:
+                    return False
+                # Merge the classes before solving the children, so each pair of
+                # classes is only ever decomposed once.
+                self._union(left_class, right_class)
+                stack.extend(zip(left_schema.children, right_schema.children))
+            elif left_schema == right_schema:
+                self._union(left_class, right_class)
+            else:
+                return False
+
+        return True
+
+    def mapping(self, *, idempotent: bool) -> dict[Variable, TermLike] | None:
+        order = self._acyclic_order()
+        if order is None:
+            return None
+
+        values: dict[_Class, TermLike] = {}
+        if idempotent:
+            for term_class in order:
+                values[term_class] = self._rebuild(term_class, values)
+
+        mapping: dict[Variable, TermLike] = {}
+        for key, node_class in self.classes.items():
+            if not isinstance(key, Variable):
+                continue
+
+            term_class = self._find(node_class)
+            if term_class.schema is None:
+                value: TermLike | None = term_class.variable
+            elif idempotent:
+                value = values.get(term_class, term_class.schema)
+            else:
+                value = term_class.schema
+
+            if value is not None and value != key:
+                mapping[key] = value
+
+        return mapping
+
+    def _class(self, node: TermLike) -> _Class:
+        key = id(node) if isinstance(node, Term) else node
+        node_class = self.classes.get(key)
+        if node_class is None:
+            if isinstance(node, Variable):
+                node_class = _Class(schema=None, variable=node)
+            else:
+                node_class = _Class(schema=node, variable=None)
+            self.classes[key] = node_class
+        return node_class
+
+    def _find(self, node_class: _Class) -> _Class:
+        root = node_class
+        while root.parent is not root:
+            root = root.parent
+        # Path compression.
+        while node_class is not root:
+            node_class.parent, node_class = root, node_class.parent
+        return root
+
+    def _union(self, left: _Class, right: _Class) -> None:
+        # Variables in the left class are bound to the right, so prefer the
+        # right-hand schema and variable.
+        schema = right.schema if right.schema is not None else left.schema
+        variable = right.variable if right.variable is not None else left.variable
+
+        if left.rank > right.rank:
+            left, right = right, left
+        left.parent = right
+        if left.rank == right.rank:
+            right.rank += 1
+
+        right.schema = schema
+        right.variable = variable
+
+    def _children(self, term_class: _Class) -> list[_Class]:
+        schema = term_class.schema
+        if not isinstance(schema, Term):
+            return []
+        return [self._find(self._class(child)) for child in schema.children]
+
+    def _acyclic_order(self) -> list[_Class] | None:
+        """Return the classes with term schemas in post-order.
+
+        Returns None if a class is reachable from itself through the children of
+        its schema, which means that some variable would have to occur in its
+        own value (the occurs check).
+        """
+        active = object()
+        done = object()
+
+        state: dict[_Class, object] = {}
+        order: list[_Class] = []
+
+        for node_class in list(self.classes.values()):
+            start = self._find(node_class)
+            if start in state or not isinstance(start.schema, Term):
+                continue
+
+            state[start] = active
+            stack = [(start, iter(self._children(start)))]
+            while stack:
+                term_class, children = stack[-1]
+                for child in children:
+                    child_state = state.get(child)
+                    if child_state is active:
+                        return None
+                    if child_state is None:
+                        state[child] = active
+                        stack.append((child, iter(self._children(child))))
+                        break
+                else:
+                    stack.pop()
+                    state[term_class] = done
+                    if isinstance(term_class.schema, Term):
+                        order.append(term_class)
+
+        return order
+
+    def _rebuild(self, term_class: _Class, values: dict[_Class, TermLike]) -> Term:
+        # Only called for classes with term schemas, in post-order, so the
+        # values of all child classes with term schemas are already known.
+        schema = term_class.schema
+        assert isinstance(schema, Term)
+
+        children = tuple(
+            child.variable if child.schema is None else values.get(child, child.schema)
+            for child in self._children(term_class)
+        )
+        if all(map(is_, children, schema.children)):
+            return schema
+        return Term(root=schema.root, children=children)
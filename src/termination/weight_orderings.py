@@ -0,0 +1,216 @@
+"""Module for the Knuth-Bendix ordering on terms.
+
+The Knuth-Bendix ordering (KBO) compares terms first by weight, the sum of the
+weights of their symbols, then by the precedence of their root symbols, and
+then lexicographically by their children. A term can only be greater than
+another if every variable occurs in it at least as often as in the other::
+
+    kbo(f(g(x), y), weights={f: 1, g: 1}, precedence={f: 1, g: 0}) > f(x, y)
+
+The weights should be admissible for KBO to be a simplification ordering:
+every constant weighs at least as much as a variable, and a unary symbol of
+weight zero must be greater than every other symbol in the precedence.
+
+Comparisons use the linear-time algorithm of Löchner (Things to know when
+implementing KBO, 2006), which computes the weight and variable balances of
+both terms in the same pass as the lexicographic comparison.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Mapping
+from dataclasses import dataclass
+from enum import Enum
+
+from . import _trampoline
+from ._trampoline import Computation
+from .orderings import OrderKey, ordering
+from .symbols import lookup
+from .terms import Symbol, Term, TermLike, Variable, preorder
+
+
+@dataclass(frozen=True)
+class WeightOrdering:
+    """A Knuth-Bendix ordering.
+
+    Symbols that are missing from ``weights`` weigh ``default_weight``, and
+    every variable weighs ``variable_weight``. Symbols that are missing from
+    the precedence are incomparable to all other symbols, as are distinct
+    symbols with equal ranks.
+
+    Every symbol visited costs a weight lookup. ``SymbolArray`` weights and
+    precedences are looked up by the ids that the canonical symbols of their
+    table carry, without hashing the symbols.
+    """
+
+    weights: Mapping[Symbol, int]
+    precedence: Mapping[Symbol, int]
+    default_weight: int = 1
+    variable_weight: int = 1
+
+    def greater(self, left: TermLike, right: TermLike, /) -> bool:
+        """Return whether the left term is greater than the right term."""
+        if left is right:
+            return False
+        result = _trampoline.run(_Comparison(self).compare(left, right))
+        return result is _Result.GREATER
+
+    def equivalent(self, left: TermLike, right: TermLike, /) -> bool:
+        """Return whether the terms are equal."""
+        return left == right
+
+
+def _root(term: TermLike) -> Symbol:
+    """Return the root symbol of a term, or the term itself if it is a symbol."""
+    if isinstance(term, Term):
+        return term.root
+    assert isinstance(term, Symbol)
+    return term
+
+
+class _Result(Enum):
+    GREATER = 1
+    LESS = 2
+    EQUAL = 3
+    INCOMPARABLE = 4
+
+
+class _Comparison:
+    """The state of a single comparison.
+
+    The weight balance is the weight of the left term minus the weight of the
+    right term, and the variable balance is, for each variable, the number of
+    its occurrences in the left term minus those in the right term. Both are
+    accumulated over the subterms visited so far.
+    """
+
+    def __init__(self, weight_ordering: WeightOrdering) -> None:
+        self.ordering = weight_ordering
+        self.weight_balance = 0
+        self.variable_balance: dict[Variable, int] = {}
+        # The numbers of variables with positive and negative balances.
+        self.positive = 0
+        self.negative = 0
+
+        self.weight = lookup(weight_ordering.weights, weight_ordering.default_weight)
+        self.rank = lookup(weight_ordering.precedence)
+
+    def compare(self, left: TermLike, right: TermLike) -> Computation[_Result]:
+        """Compare two terms, adding them to the balances."""
+        if isinstance(left, Variable):
+            self._add(right, -1)
+            self._count(left, 1)
+            if left == right:
+                return _Result.EQUAL
+            if left in right.variable_set:
+                return _Result.LESS
+            return _Result.INCOMPARABLE
+
+        if isinstance(right, Variable):
+            self._add(left, 1)
+            self._count(right, -1)
+            if right in left.variable_set:
+                return _Result.GREATER
+            return _Result.INCOMPARABLE
+
+        left_root = _root(left)
+        right_root = _root(right)
+        left_children = left.children if isinstance(left, Term) else ()
+        right_children = right.children if isinstance(right, Term) else ()
+
+        lexicographic = _Result.EQUAL
+        if left_root == right_root:
+            # Compare the children up to the first difference, then only add
+            # the remaining children to the balances.
+            for left_child, right_child in zip(left_children, right_children):
+                if lexicographic is not _Result.EQUAL:
+                    self._add(left_child, 1)
+                    self._add(right_child, -1)
+                elif left_child is not right_child:
+                    lexicographic = yield self.compare(left_child, right_child)
+        else:
+            lexicographic = _Result.INCOMPARABLE
+            for child in left_children:
+                self._add(child, 1)
+            for child in right_children:
+                self._add(child, -1)
+
+        self.weight_balance += self.weight(left_root) - self.weight(right_root)
+
+        if self.weight_balance > 0:
+            return self._greater_if(self.negative == 0)
+        if self.weight_balance < 0:
+            return self._less_if(self.positive == 0)
+
+        left_rank = self.rank(left_root)
+        right_rank = self.rank(right_root)
+        if left_root != right_root:
+            if left_rank is None or right_rank is None or left_rank == right_rank:
+                return _Result.INCOMPARABLE
+            if left_rank > right_rank:
+                return self._greater_if(self.negative == 0)
+            return self._less_if(self.positive == 0)
+
+        if lexicographic is _Result.GREATER:
+            return self._greater_if(self.negative == 0)
+        if lexicographic is _Result.LESS:
+            return self._less_if(self.positive == 0)
+        return lexicographic
+
+    def _add(self, term: TermLike, sign: int) -> None:
+        """Add a term to the balances, on the left if the sign is positive."""
+        for subterm in preorder(term):
+            if isinstance(subterm, Variable):
+                self._count(subterm, sign)
+            else:
+                self.weight_balance += sign * self.weight(_root(subterm))
+
+    def _count(self, variable: Variable, sign: int) -> None:
+        """Count an occurrence of a variable, on the left if the sign is positive."""
+        self.weight_balance += sign * self.ordering.variable_weight
+
+        before = self.variable_balance.get(variable, 0)
+        after = self.variable_balance[variable] = before + sign
+        if before > 0:
+            self.positive -= 1
+        elif before < 0:
+            self.negative -= 1
+        if after > 0:
+            self.positive += 1
+        elif after < 0:
+            self.negative += 1
+
+    @staticmethod
+    def _greater_if(condition: bool) -> _Result:
+        return _Result.GREATER if condition else _Result.INCOMPARABLE
+
+    @staticmethod
+    def _less_if(condition: bool) -> _Result:
+        return _Result.LESS if condition else _Result.INCOMPARABLE
+
+
+@ordering(partial=True)
+def kbo(
+    term: TermLike,
+    *,
+    weights: Mapping[Symbol, int],
+    precedence: Mapping[Symbol, int],
+    default_weight: int = 1,
+    variable_weight: int = 1,
+) -> OrderKey[TermLike]:
+    """Order terms by the Knuth-Bendix ordering.
+
+    For example::
+
+        order = kbo(mul(mul(x, y), z), weights={mul: 0}, precedence={mul: 0})
+        order > mul(x, mul(y, z))  # True
+    """
+    return OrderKey(
+        order=WeightOrdering(
+            weights=weights,
+            precedence=precedence,
+            default_weight=default_weight,
+            variable_weight=variable_weight,
+        ),
+        value=term,
+    )
@@ -0,0 +1,218 @@
+"""Unit tests for the termination.completion module."""
+
+import pytest
+
+from termination.completion import (
+    Completion,
+    CompletionFailure,
+    Equation,
+    complete,
+    critical_pairs,
+)
+from termination.path_orderings import PathOrdering
+from termination.pools import VariablePool
+from termination.rewriting import BudgetExceeded, Rule
+from termination.terms import Constant, Function, Variable, variables
+
+f = Function("f", 2)
+g = Function("g", 1)
+h = Function("h", 1)
+i = Function("i", 1)
+mul = Function("mul", 2)
+
+a = Constant("a")
+b = Constant("b")
+e = Constant("e")
+
+x = Variable("x")
+y = Variable("y")
+z = Variable("z")
+
+GROUP = [
+    Equation(mul(e, x), x),
+    Equation(mul(i(x), x), e),
+    Equation(mul(mul(x, y), z), mul(x, mul(y, z))),
+]
+GROUP_ORDER = PathOrdering(precedence={i: 2, mul: 1, e: 0})
+ORDER = PathOrdering(precedence={f: 3, g: 2, h: 2, a: 1, b: 0})
+
+
+def equivalent(left, right):
+    """Return whether two terms are equal up to renaming of variables."""
+    renaming = {}
+    stack = [(left, right)]
+    while stack:
+        left, right = stack.pop()
+        if isinstance(left, Variable) and isinstance(right, Variable):
+            if renaming.setdefault(left, right) != right:
+                return False
+        elif isinstance(left, Variable) or isinstance(right, Variable):
+            return False
+        elif hasattr(left, "root") and hasattr(right, "root"):
+            if left.root != right.root:
+                return False
+            stack.extend(zip(left.children, right.children))
+        elif left != right:
+            return False
+    return len(set(renaming.values())) == len(renaming)
+
+
+def pair(equation):
+    """Return the sides of an equation as a single term."""
+    return f(equation.lhs, equation.rhs)
+
+
+class TestCriticalPairs:
+    """Test case for the critical_pairs function."""
+
+    def test_overlap(self):
+        """Rules overlapping below the root give critical pairs."""
+        pairs = list(critical_pairs(Rule(f(g(x), y), y), Rule(g(a), b)))
+        assert len(pairs) == 1
+        assert equivalent(pair(pairs[0]), f(f(b, y), y))
+
+    def test_root_overlap(self):
+        """Rules overlapping at the root give critical pairs."""
+        pairs = list(critical_pairs(Rule(f(x, a), x), Rule(f(b, y), y)))
+        assert [(p.lhs, p.rhs) for p in pairs] == [(a, b)]
+
+    def test_no_overlap(self):
+        """Rules that do not unify at non-variable positions give no pairs."""
+        assert list(critical_pairs(Rule(f(x, g(x)), x), Rule(h(y), y))) == []
+        assert list(critical_pairs(Rule(f(x, g(a)), x), Rule(g(b), a))) == []
+
+    def test_self_overlap(self):
+        """A rule overlaps with a renamed copy of itself, but not trivially."""
+        rule = Rule(g(g(x)), h(x))
+        pairs = list(critical_pairs(rule, rule))
+        assert len(pairs) == 1
+        assert equivalent(pair(pairs[0]), f(g(h(x)), h(g(x))))
+
+    def test_renamed_apart(self):
+        """Rules that share variables are renamed apart."""
+        pairs = list(critical_pairs(Rule(f(x, g(x)), x), Rule(g(x), a)))
+        assert len(pairs) == 1
+        assert equivalent(pair(pairs[0]), f(f(x, a), x))
+
+
+class TestCompletion:
+    """Test case for Knuth-Bendix completion."""
+
+    def test_group(self):
+        """The group axioms complete to the ten rules of free groups."""
+        system = complete(GROUP, GROUP_ORDER, max_steps=2000)
+        assert len(system) == 10
+
+        expected = [
+            (mul(e, x), x),
+            (mul(i(x), x), e),
+            (mul(mul(x, y), z), mul(x, mul(y, z))),
+            (mul(i(x), mul(x, y)), y),
+            (mul(x, e), x),
+            (i(e), e),
+            (i(i(x)), x),
+            (mul(x, i(x)), e),
+            (mul(x, mul(i(x), y)), y),
+            (i(mul(x, y)), mul(i(y), i(x))),
+        ]
+        rules = [f(rule.lhs, rule.rhs) for rule in system]
+        for lhs, rhs in expected:
+            assert any(equivalent(rule, f(lhs, rhs)) for rule in rules)
+
+    def test_group_decides(self):
+        """The completed system decides the word problem of groups."""
+        system = complete(GROUP, GROUP_ORDER, max_steps=2000)
+        left = system.normalize(i(mul(a, i(b))))
+        right = system.normalize(mul(b, i(a)))
+        assert left == right
+
+    def test_already_complete(self):
+        """Equations without critical pairs become rules."""
+        system = complete([Equation(g(a), b), Equation(h(x), x)], ORDER)
+        assert len(system) == 2
+
+    def test_joinable(self):
+        """Equations that are joinable are dropped."""
+        system = complete(
+            [Equation(g(a), b), Equation(g(a), b), Equation(b, g(a))], ORDER
+        )
+        assert len(system) == 1
+
+    def test_interreduction(self):
+        """Rules simplified by new rules are simplified, or collapse."""
+        # Selecting the oldest equations first activates the rules in order.
+        completion = Completion(
+            [Equation(f(g(a), h(a)), a), Equation(h(g(a)), b), Equation(g(a), b)],
+            ORDER,
+            age_ratio=1,
+        )
+        rules = [(rule.lhs, rule.rhs) for rule in completion.run()]
+        assert rules == [(g(a), b), (f(b, h(a)), a), (h(b), b)]
+
+    def test_composition(self):
+        """Rules whose right-hand sides new rules simplify are kept, simplified."""
+        completion = Completion(
+            [Equation(f(a, a), g(a)), Equation(g(a), b)], ORDER, age_ratio=1
+        )
+        rules = [(rule.lhs, rule.rhs) for rule in completion.run()]
+        assert rules == [(g(a), b), (f(a, a), b)]
+
+    def test_failure(self):
+        """Completion fails on equations it cannot orient."""
+        commutativity = Equation(f(x, y), f(y, x))
+        with pytest.raises(CompletionFailure) as info:
+            complete([commutativity], ORDER)
+        assert equivalent(pair(info.value.equation), pair(commutativity))
+
+    def test_budget(self):
+        """Completion stops when its budget runs out."""
+        with pytest.raises(BudgetExceeded):
+            complete(GROUP, GROUP_ORDER, max_steps=3)
+
+    def test_steps(self):
+        """Completion can be run one step at a time."""
+        completion = Completion([Equation(g(a), b)], ORDER)
+        assert not completion.done
+        completion.step()
+        assert completion.done
+        assert len(completion.rules) == 1
+
+    def test_complete_options(self):
+        """The pool and the age ratio are passed on to the completion."""
+        pool = VariablePool()
+        system = complete(GROUP, GROUP_ORDER, pool=pool, max_steps=2000)
+        assert all(
+            variable.pool is pool
+            for rule in system
+            for variable in (*variables(rule.lhs), *variables(rule.rhs))
+        )
+
+        equations = [
+            Equation(f(g(a), h(a)), a),
+            Equation(h(g(a)), b),
+            Equation(g(a), b),
+        ]
+        rules = [(rule.lhs, rule.rhs) for rule in complete(equations, ORDER)]
+        assert rules != [(g(a), b), (f(b, h(a)), a), (h(b), b)]
+        rules = [
+            (rule.lhs, rule.rhs) for rule in complete(equations, ORDER, age_ratio=1)
+        ]
+        assert rules == [(g(a), b), (f(b, h(a)), a), (h(b), b)]
+
+    def test_stale_entries(self):
+        """Equations selected from one heap are dropped from the other."""
+        completion = Completion(GROUP, GROUP_ORDER, age_ratio=2)
+        while not completion.done:
+            completion.step()
+            stale = len(completion._selected)
+            assert stale <= completion._passive_count
+            assert (
+                len(completion._by_weight) + len(completion._by_age)
+                == 2 * completion._passive_count + stale
+            )
+        assert len(completion.rules) == 10
+
+    def test_invalid_age_ratio(self):
+        """The age ratio must be positive."""
+        with pytest.raises(ValueError):
+            Completion([], ORDER, age_ratio=0)
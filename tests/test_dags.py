@@ -0,0 +1,158 @@
+"""Unit tests for the termination.dags module."""
+
+import pytest
+
+from termination.dags import TermDAG
+from termination.path_orderings import PathOrdering
+from termination.terms import Constant, Function, Substitution, Variable
+
+f = Function("f", 2)
+g = Function("g", 1)
+
+a = Constant("a")
+b = Constant("b")
+
+x = Variable("x")
+y = Variable("y")
+
+
+def tower(depth, leaf=a):
+    """Return a term of the given depth, with two copies of each subterm."""
+    term = leaf
+    for _ in range(depth):
+        term = f(term, term)
+    return term
+
+
+def unshared_tower(depth, leaf=a):
+    """Return a tower whose equal subterms are distinct objects."""
+    if depth == 0:
+        return leaf
+    return f(unshared_tower(depth - 1, leaf), unshared_tower(depth - 1, leaf))
+
+
+class TestTermDAG:
+    """Test case for the TermDAG class."""
+
+    def test_nodes(self):
+        """Distinct subterms are numbered once, children first."""
+        dag = TermDAG([f(g(a), g(a)), g(x)])
+        assert list(dag) == [a, g(a), f(g(a), g(a)), x, g(x)]
+        assert dag.roots == [2, 4]
+        assert dag.children(2) == (1, 1)
+        assert dag.node(g(a)) == 1
+
+    def test_canonical(self):
+        """Equal subterms of canonical terms are the same object."""
+        dag = TermDAG([unshared_tower(5)])
+        assert len(dag) == 6
+        term = dag[dag.roots[0]]
+        assert term == unshared_tower(5)
+        assert term.children[0] is term.children[1]
+
+    def test_canonical_reuse(self):
+        """Terms that are already maximally shared are their own canonical terms."""
+        term = f(g(a), x)
+        dag = TermDAG([term])
+        assert dag[dag.node(term)] is term
+
+    def test_contains(self):
+        """Subterms of the added terms are in the DAG, and others are not."""
+        dag = TermDAG([f(g(a), x)])
+        assert g(a) in dag
+        assert g(x) not in dag
+        assert b not in dag
+        with pytest.raises(KeyError):
+            dag.node(g(x))
+        assert len(dag) == 4
+
+    @pytest.mark.parametrize(
+        "term",
+        [
+            pytest.param(a, id="constant"),
+            pytest.param(f(g(a), x), id="term"),
+            pytest.param(f(f(x, g(y)), f(g(g(a)), x)), id="nested"),
+            pytest.param(unshared_tower(6, x), id="tower"),
+        ],
+    )
+    def test_bulk(self, term):
+        """Folds agree with the properties of the terms."""
+        dag = TermDAG([term])
+        sizes = dag.sizes()
+        depths = dag.depths()
+        variable_sets = dag.variable_sets()
+        for node, subterm in enumerate(dag):
+            assert sizes[node] == len(subterm)
+            assert depths[node] == subterm.depth
+            assert variable_sets[node] == subterm.variable_set
+
+    def test_fold(self):
+        """Folds compute values bottom-up."""
+        term = f(g(a), x)
+        dag = TermDAG([term])
+        strings = dag.fold(
+            str, lambda root, children: f"{root.name}({', '.join(children)})"
+        )
+        assert strings == [str(subterm) for subterm in dag]
+        assert strings[-1] == str(term)
+
+    def test_substitute(self):
+        """Substitution applies to every node, and keeps sharing."""
+        dag = TermDAG([tower(3, x), g(a)])
+        results = dag.substitute(Substitution({x: g(y)}).mapping)
+
+        result = results[dag.roots[0]]
+        assert result == tower(3, g(y))
+        assert result.children[0] is result.children[1]
+        assert results[dag.roots[1]] is dag[dag.roots[1]]
+
+    def test_large(self):
+        """Bulk operations visit each distinct subterm once."""
+        dag = TermDAG([tower(2000, x)])
+        assert len(dag) == 2001
+        assert dag.sizes()[-1] == 2**2001 - 1
+        assert dag.depths()[-1] == 2000
+        assert dag.variable_sets()[-1] == {x}
+        result = dag.substitute({x: a})[-1]
+        assert result.is_ground
+
+        calls = []
+
+        def combine(root, children):
+            calls.append(root)
+
+        dag.fold(lambda _: None, combine)
+        assert len(calls) == 2000
+
+    def test_find_read_only(self):
+        """Looking up a term that is not added leaves the DAG unchanged."""
+        dag = TermDAG([f(a, b)])
+        identities = dict(dag._identities)
+        assert f(g(a), b) not in dag
+        assert dag.node(f(a, b)) == dag.roots[0]
+        assert dag._identities == identities
+        assert len(dag) == 3
+
+    @pytest.mark.parametrize(
+        "term",
+        [
+            pytest.param(g, id="function"),
+            pytest.param(f(a, "b"), id="string"),
+        ],
+    )
+    def test_invalid(self, term):
+        """Objects that are not terms or terminal symbols raise TypeError."""
+        dag = TermDAG()
+        with pytest.raises(TypeError):
+            dag.add(term)
+        with pytest.raises(TypeError):
+            dag.node(term)
+
+    def test_greater(self):
+        """Comparing canonical terms memoizes on equal subterms."""
+        lpo = PathOrdering(precedence={f: 1, g: 0})
+        left = g(unshared_tower(12, x))
+        right = unshared_tower(12, g(x))
+        dag = TermDAG([left, right])
+        assert dag.greater(lpo, right, left)
+        assert not dag.greater(lpo, left, right)
@@ -0,0 +1,215 @@
+"""Unit tests for the termination.dependency_pairs module."""
+
+import pytest
+
+from termination import dependency_pairs as dependency_pairs_module
+from termination.dependency_pairs import (
+    DependencyGraph,
+    DependencyPair,
+    DependencyPairProblem,
+    defined_symbols,
+    dependency_pairs,
+    mark,
+    strongly_connected_components,
+)
+from termination.pools import VariablePool
+from termination.rewriting import Rule
+from termination.terms import Constant, Function, Variable
+
+f = Function("f", 2)
+g = Function("g", 1)
+s = Function("s", 1)
+minus = Function("minus", 2)
+quot = Function("quot", 2)
+
+a = Constant("a")
+b = Constant("b")
+zero = Constant("0")
+
+x = Variable("x")
+y = Variable("y")
+
+f_ = mark(f)
+g_ = mark(g)
+minus_ = mark(minus)
+quot_ = mark(quot)
+a_ = mark(a)
+
+DIVISION = [
+    Rule(minus(x, zero), x),
+    Rule(minus(s(x), s(y)), minus(x, y)),
+    Rule(quot(zero, s(y)), zero),
+    Rule(quot(s(x), s(y)), s(quot(minus(x, y), s(y)))),
+]
+
+
+class TestDependencyPairs:
+    """Test case for computing dependency pairs."""
+
+    def test_mark(self):
+        """Marked symbols keep their arity, and are distinct from the symbols."""
+        assert f_ == Function("f#", 2)
+        assert a_ == Constant("a#")
+        assert f_ != f
+
+    def test_defined_symbols(self):
+        """The defined symbols are the roots of the left-hand sides."""
+        assert defined_symbols(DIVISION) == {minus, quot}
+        assert defined_symbols([Rule(a, b)]) == {a}
+
+    def test_division(self):
+        """Each subterm of a right-hand side with a defined root gives a pair."""
+        assert dependency_pairs(DIVISION) == [
+            DependencyPair(minus_(s(x), s(y)), minus_(x, y)),
+            DependencyPair(quot_(s(x), s(y)), quot_(minus(x, y), s(y))),
+            DependencyPair(quot_(s(x), s(y)), minus_(x, y)),
+        ]
+
+    def test_constants(self):
+        """Defined constants are marked too."""
+        rules = [Rule(a, g(a)), Rule(g(x), b)]
+        assert dependency_pairs(rules) == [
+            DependencyPair(a_, g_(a)),
+            DependencyPair(a_, a_),
+        ]
+
+    def test_skipped(self):
+        """Subterms of the left-hand side, and repeated subterms, are skipped."""
+        rules = [Rule(g(g(x)), f(g(x), f(g(a), g(a))))]
+        assert dependency_pairs(rules) == [DependencyPair(g_(g(x)), g_(a))]
+
+    def test_rename_apart(self):
+        """Pairs are renamed apart on the variables of both sides."""
+        pool = VariablePool()
+        pair = pool.rename_apart(DependencyPair(g_(x), f_(x, y)))
+        assert pair.lhs.children[0] == pair.rhs.children[0]
+        assert {pair.lhs.children[0], pair.rhs.children[1]}.isdisjoint({x, y})
+
+    def test_str(self):
+        """Pairs are formatted like rules."""
+        pair = DependencyPair(minus_(s(x), s(y)), minus_(x, y))
+        assert str(pair) == "minus#(s(?x), s(?y)) -> minus#(?x, ?y)"
+
+
+class TestStronglyConnectedComponents:
+    """Test case for the strongly_connected_components function."""
+
+    @pytest.mark.parametrize(
+        ("successors", "expected"),
+        [
+            pytest.param([], [], id="empty"),
+            pytest.param([[]], [[0]], id="single"),
+            pytest.param([[1], [2], []], [[2], [1], [0]], id="path"),
+            pytest.param([[1], [2], [0]], [[0, 1, 2]], id="cycle"),
+            pytest.param(
+                [[1], [0, 2], [3], [2], [3, 1]],
+                [[2, 3], [0, 1], [4]],
+                id="two-cycles",
+            ),
+        ],
+    )
+    def test_components(self, successors, expected):
+        """Components are found in reverse topological order."""
+        assert strongly_connected_components(successors) == expected
+
+    def test_long_cycle(self):
+        """Components far deeper than the recursion limit are found."""
+        count = 100_000
+        successors = [[(node + 1) % count] for node in range(count)]
+        assert strongly_connected_components(successors) == [list(range(count))]
+
+
+class TestDependencyGraph:
+    """Test case for the DependencyGraph class."""
+
+    def test_division(self):
+        """Pairs are connected when one can follow another in a chain."""
+        pairs = dependency_pairs(DIVISION)
+        graph = DependencyGraph(pairs, defined_symbols(DIVISION))
+        assert set(graph.edges()) == {(0, 0), (1, 1), (1, 2), (2, 0)}
+        assert graph.cycles() == [[0], [1]]
+
+    def test_cap(self):
+        """Subterms with defined roots may rewrite to anything."""
+        pairs = [DependencyPair(g_(a), g_(g(b)))]
+        assert DependencyGraph(pairs, {g}).successors(0) == [0]
+        assert DependencyGraph(pairs, set()).successors(0) == []
+
+    def test_ren(self):
+        """Variables may be instantiated differently at each occurrence."""
+        pairs = [DependencyPair(f_(s(x), x), f_(x, s(x)))]
+        assert DependencyGraph(pairs, {f}).successors(0) == [0]
+
+    def test_no_edge(self):
+        """Pairs whose terms cannot unify are not connected."""
+        pairs = [DependencyPair(f_(a, x), g_(b)), DependencyPair(g_(a), f_(a, b))]
+        graph = DependencyGraph(pairs, {f, g})
+        assert list(graph.edges()) == [(1, 0)]
+        assert graph.cycles() == []
+
+    def test_shared_variables(self):
+        """Pairs are renamed apart from the fresh variables of CAP and REN."""
+        x1 = VariablePool().get_fresh("x")
+        pairs = [DependencyPair(g_(a), f_(a, y)), DependencyPair(f_(x1, b), g_(a))]
+        graph = DependencyGraph(pairs, {f, g})
+        assert set(graph.edges()) == {(0, 1), (1, 0)}
+        assert graph.cycles() == [[0, 1]]
+
+    def test_pool(self):
+        """Fresh variables come from the given pool."""
+        pool = VariablePool()
+        x1 = pool.get_fresh("x")
+        pairs = [DependencyPair(g_(x1), f_(x1, y)), DependencyPair(f_(x, b), g_(a))]
+        graph = DependencyGraph(pairs, {f, g}, pool=pool)
+        assert graph.pool is pool
+        assert set(graph.edges()) == {(0, 1), (1, 0)}
+        assert pool.get_fresh("x").index > 2
+
+    def test_large(self, monkeypatch):
+        """Each pair is only unified with the candidates from the index."""
+        calls = []
+        unify = dependency_pairs_module.unify
+
+        def counting_unify(*args, **kwargs):
+            calls.append(args)
+            return unify(*args, **kwargs)
+
+        monkeypatch.setattr(dependency_pairs_module, "unify", counting_unify)
+
+        count = 2000
+        symbols = [Function(f"f{k}", 1) for k in range(count)]
+        rules = [
+            Rule(symbols[k](s(x)), symbols[(k + 1) % count](x)) for k in range(count)
+        ]
+        rules += [Rule(symbols[k](zero), zero) for k in range(count)]
+
+        problem = DependencyPairProblem.from_rules(rules)
+        assert len(problem.graph) == count
+        assert [len(p.pairs) for p in problem.decompose()] == [count]
+        assert len(calls) == count
+
+
+class TestDependencyPairProblem:
+    """Test case for the DependencyPairProblem class."""
+
+    def test_decompose(self):
+        """Each cycle of the graph is a subproblem with all of the rules."""
+        problem = DependencyPairProblem.from_rules(DIVISION)
+        subproblems = problem.decompose()
+        assert [subproblem.pairs for subproblem in subproblems] == [
+            (DependencyPair(minus_(s(x), s(y)), minus_(x, y)),),
+            (DependencyPair(quot_(s(x), s(y)), quot_(minus(x, y), s(y))),),
+        ]
+        assert all(subproblem.rules == problem.rules for subproblem in subproblems)
+
+    def test_pool(self):
+        """The graph and the subproblems share the given pool."""
+        pool = VariablePool()
+        problem = DependencyPairProblem.from_rules(DIVISION, pool=pool)
+        assert problem.graph.pool is pool
+        assert all(subproblem.pool is pool for subproblem in problem.decompose())
+
+    def test_terminating(self):
+        """Systems without cycles of pairs decompose into no subproblems."""
+        problem = DependencyPairProblem.from_rules([Rule(f(a, x), g(x)), Rule(g(b), a)])
+        assert problem.decompose() == []
@@ -0,0 +1,113 @@
+"""Unit tests for the termination.flatterms module."""
+
+import pytest
+
+from termination.flatterms import FlatTerm
+from termination.symbols import SymbolTable
+from termination.terms import Constant, Function, Substitution, Variable, variables
+
+
+class TestFlatTerm:
+    """Test case for the FlatTerm class."""
+
+    f = Function("f", 2)
+    g = Function("g", 1)
+
+    a = Constant("a")
+    b = Constant("b")
+
+    x = Variable("x")
+    y = Variable("y")
+
+    @pytest.mark.parametrize(
+        ("term",),
+        [
+            pytest.param(a),
+            pytest.param(x),
+            pytest.param(g(a)),
+            pytest.param(f(g(a), x)),
+            pytest.param(f(f(x, g(y)), f(g(g(a)), b))),
+        ],
+    )
+    def test_round_trip(self, term):
+        """Converting a term to a flatterm and back is lossless."""
+        flat = FlatTerm.from_term(term)
+        assert flat.to_term() == term
+        assert len(flat) == len(term)
+        assert flat.depth == term.depth
+        assert str(flat) == str(term)
+
+    def test_arrays(self):
+        """A flatterm stores pre-order symbol ids and subterm ends."""
+        table = SymbolTable()
+        flat = FlatTerm.from_term(self.f(self.g(self.a), self.x), table)
+        assert [table.symbol(i) for i in flat.symbols] == [
+            self.f,
+            self.g,
+            self.a,
+            self.x,
+        ]
+        assert list(flat.ends) == [4, 3, 3, 4]
+
+    def test_getitem(self):
+        """A flatterm supports getting subterms by position."""
+        term = self.f(self.g(self.a), self.f(self.x, self.b))
+        flat = FlatTerm.from_term(term)
+        for position in term.positions():
+            assert flat[position].to_term() == term[position]
+
+    @pytest.mark.parametrize(
+        ("position",),
+        [pytest.param((2,)), pytest.param((0, 1)), pytest.param((0, 0, 0))],
+    )
+    def test_getitem_invalid(self, position):
+        """A flatterm does not support getting invalid positions."""
+        flat = FlatTerm.from_term(self.f(self.g(self.a), self.x))
+        with pytest.raises(KeyError):
+            flat[position]
+
+    def test_invalid(self):
+        """Encoding objects that are not terms or symbols raises TypeError."""
+        with pytest.raises(TypeError):
+            FlatTerm.from_term(self.f(self.a, "b"))
+
+    def test_subterms(self):
+        """A flatterm iterates its subterms in pre-order."""
+        term = self.f(self.g(self.a), self.f(self.x, self.b))
+        flat = FlatTerm.from_term(term)
+        assert [(p, s.to_term()) for (p, s) in flat.subterms()] == list(term.subterms())
+        assert list(flat.positions()) == list(term.positions())
+
+    def test_variables(self):
+        """A flatterm supports iterating its variables."""
+        flat = FlatTerm.from_term(self.f(self.g(self.x), self.f(self.y, self.x)))
+        assert set(variables(flat)) == {self.x, self.y}
+        assert not flat.is_ground
+        assert FlatTerm.from_term(self.g(self.a)).is_ground
+
+    def test_equality(self):
+        """Flatterms compare equal when they encode the same term."""
+        table = SymbolTable()
+        flat1 = FlatTerm.from_term(self.f(self.g(self.a), self.g(self.a)), table)
+        flat2 = FlatTerm.from_term(self.g(self.a), table)
+        flat3 = FlatTerm.from_term(self.g(self.a))
+        assert flat1[(0,)] == flat1[(1,)] == flat2 == flat3
+        assert hash(flat1[(0,)]) == hash(flat3)
+        assert flat1 != flat2
+
+    def test_substitute(self):
+        """A substitution can be applied to a flatterm."""
+        flat = FlatTerm.from_term(self.f(self.g(self.x), self.f(self.y, self.x)))
+        sub = Substitution({self.x: self.g(self.a), self.y: self.b})
+        assert sub(flat).to_term() == self.f(
+            self.g(self.g(self.a)), self.f(self.b, self.g(self.a))
+        )
+
+    def test_deep(self):
+        """Deep flatterms can be converted without exceeding the recursion limit."""
+        term = self.a
+        for _ in range(10_000):
+            term = self.g(term)
+        flat = FlatTerm.from_term(term)
+        assert len(flat) == 10_001
+        assert flat.to_term() == term
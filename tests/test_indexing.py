@@ -0,0 +1,119 @@
+"""Unit tests for the termination.indexing module."""
+
+import pytest
+
+from termination.indexing import DiscriminationTree
+from termination.matching import match
+from termination.terms import Constant, Function, IndexedVariable, Variable
+from termination.unification import unify
+
+f = Function("f", 2)
+g = Function("g", 1)
+
+a = Constant("a")
+b = Constant("b")
+
+x = Variable("x")
+y = Variable("y")
+
+STORED = [
+    x,
+    a,
+    g(x),
+    g(a),
+    g(g(x)),
+    f(x, y),
+    f(x, x),
+    f(a, x),
+    f(g(x), b),
+    f(f(x, a), y),
+]
+
+QUERIES = [
+    a,
+    b,
+    g(a),
+    g(b),
+    g(g(a)),
+    f(a, b),
+    f(g(a), b),
+    f(f(b, a), a),
+    f(a, a),
+]
+
+# Variables of the same name are renamed apart from the stored terms.
+u = IndexedVariable("u", 1)
+v = IndexedVariable("v", 1)
+
+VARIABLE_QUERIES = [
+    u,
+    g(u),
+    f(u, v),
+    f(u, b),
+    f(g(u), v),
+    f(f(u, v), g(a)),
+]
+
+
+@pytest.fixture
+def index():
+    tree = DiscriminationTree()
+    for number, term in enumerate(STORED):
+        tree.insert(term, number)
+    return tree
+
+
+class TestDiscriminationTree:
+    """Test case for the DiscriminationTree class."""
+
+    @pytest.mark.parametrize(("query",), [pytest.param(q) for q in QUERIES])
+    def test_generalizations(self, index, query):
+        """Generalization candidates include every matching stored term."""
+        candidates = set(index.generalizations(query))
+        expected = {n for n, t in enumerate(STORED) if match(t, query) is not None}
+        assert expected <= candidates
+        # The only false positives come from repeated variables.
+        assert candidates - expected <= {STORED.index(f(x, x))}
+
+    @pytest.mark.parametrize(
+        ("query",), [pytest.param(q) for q in QUERIES + VARIABLE_QUERIES]
+    )
+    def test_instances(self, index, query):
+        """Instance candidates include every stored instance of the query."""
+        candidates = set(index.instances(query))
+        expected = {n for n, t in enumerate(STORED) if match(query, t) is not None}
+        assert expected <= candidates
+
+    @pytest.mark.parametrize(
+        ("query",), [pytest.param(q) for q in QUERIES + VARIABLE_QUERIES]
+    )
+    def test_unifiable(self, index, query):
+        """Unifiable candidates include every stored term unifiable with the query."""
+        candidates = set(index.unifiable(query))
+        expected = {n for n, t in enumerate(STORED) if unify(t, query) is not None}
+        assert expected <= candidates
+
+    def test_exact_candidates(self, index):
+        """Candidates are filtered by the symbols of the query."""
+        assert set(index.generalizations(g(b))) == {0, 2}
+        assert set(index.instances(g(u))) == {2, 3, 4}
+        assert set(index.unifiable(f(u, b))) == {0, 5, 6, 7, 8, 9}
+        assert set(index.unifiable(g(b))) == {0, 2}
+
+    def test_remove(self, index):
+        """Entries can be removed from a discrimination tree."""
+        index.remove(g(x), 2)
+        assert len(index) == len(STORED) - 1
+        assert set(index.generalizations(g(b))) == {0}
+
+        with pytest.raises(KeyError):
+            index.remove(g(x), 2)
+        with pytest.raises(KeyError):
+            index.remove(g(b), 2)
+
+    def test_remove_all(self, index):
+        """Removing every entry leaves an empty discrimination tree."""
+        for number, term in enumerate(STORED):
+            index.remove(term, number)
+        assert len(index) == 0
+        assert not index._root.children
@@ -0,0 +1,79 @@
+"""Unit tests for the termination.interning module."""
+
+import gc
+
+from termination.interning import InternTable
+from termination.terms import Constant, Function, Term, Variable
+
+
+class TestInternTable:
+    """Test case for the InternTable class."""
+
+    f = Function("f", 2)
+    g = Function("g", 1)
+
+    a = Constant("a")
+
+    x = Variable("x")
+
+    def test_symbol(self):
+        """An InternTable returns a single instance for equal symbols."""
+        table = InternTable()
+        assert table.symbol(Constant("a")) is table.symbol(Constant("a"))
+        assert table.symbol(Function("f", 2)) is table.symbol(Function("f", 2))
+
+    def test_apply(self):
+        """An InternTable returns the same instance for structurally equal terms."""
+        table = InternTable()
+        t1 = table.apply(self.f, table.apply(self.g, self.a), self.x)
+        t2 = table.apply(self.f, table.apply(self.g, self.a), self.x)
+        assert t1 is t2
+
+    def test_intern(self):
+        """Interning a term returns the canonical instance."""
+        table = InternTable()
+        t1 = table.apply(self.f, table.apply(self.g, self.a), self.x)
+        t2 = table.intern(self.f(self.g(self.a), self.x))
+        assert t1 is t2
+
+    def test_intern_shares_subterms(self):
+        """Interning shares structurally equal subterms."""
+        table = InternTable()
+        t = table.intern(self.f(self.g(self.a), self.g(self.a)))
+        assert isinstance(t, Term)
+        assert t.children[0] is t.children[1]
+
+    def test_intern_reuses_original(self):
+        """A term whose children are already canonical becomes canonical itself."""
+        table = InternTable()
+        t = self.g(self.a)
+        assert table.intern(t) is t
+        assert t in table
+
+    def test_equal_to_plain_terms(self):
+        """Interned terms compare equal to plain terms with the same structure."""
+        table = InternTable()
+        t1 = table.apply(self.f, self.a, self.x)
+        t2 = self.f(self.a, self.x)
+        assert t1 == t2
+        assert hash(t1) == hash(t2)
+        assert t1 is not t2
+
+    def test_weak(self):
+        """Canonical terms are dropped once nothing refers to them."""
+        table = InternTable()
+        t = table.apply(self.g, self.a)
+        assert len(table) == 1
+        del t
+        gc.collect()
+        assert len(table) == 0
+
+    def test_deep(self):
+        """Interning works on terms deeper than the recursion limit."""
+        table = InternTable()
+        t = self.a
+        for _ in range(10_000):
+            t = self.g(t)
+        interned = table.intern(t)
+        assert len(table) == 10_000
+        assert table.intern(t) is interned
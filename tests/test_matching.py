@@ -0,0 +1,77 @@
+"""Unit tests for the termination.matching module."""
+
+import pytest
+
+from termination.matching import compile_pattern, match
+from termination.terms import Constant, Function, Variable
+
+f = Function("f", 2)
+g = Function("g", 1)
+h = Function("h", 2)
+
+a = Constant("a")
+b = Constant("b")
+
+x = Variable("x")
+y = Variable("y")
+z = Variable("z")
+
+MATCHING = [
+    pytest.param(x, a, {x: a}),
+    pytest.param(x, f(a, y), {x: f(a, y)}),
+    pytest.param(a, a, {}),
+    pytest.param(f(x, g(y)), f(a, g(b)), {x: a, y: b}),
+    pytest.param(f(x, x), f(g(a), g(a)), {x: g(a)}),
+    pytest.param(f(x, g(a)), f(z, g(a)), {x: z}),
+    pytest.param(f(g(a), x), f(g(a), b), {x: b}),
+]
+
+NOT_MATCHING = [
+    pytest.param(a, b),
+    pytest.param(a, x),
+    pytest.param(g(x), a),
+    pytest.param(g(x), x),
+    pytest.param(f(x, y), h(a, b)),
+    pytest.param(f(x, x), f(a, b)),
+    pytest.param(f(x, g(a)), f(a, g(b))),
+    pytest.param(f(g(a), x), f(g(b), a)),
+]
+
+
+class TestMatch:
+    """Test case for the match function."""
+
+    @pytest.mark.parametrize(("pattern", "subject", "expected"), MATCHING)
+    def test_match(self, pattern, subject, expected):
+        """The match function returns the matching substitution."""
+        sub = match(pattern, subject)
+        assert sub is not None
+        assert dict(sub.mapping) == expected
+        assert sub(pattern) == subject
+
+    @pytest.mark.parametrize(("pattern", "subject"), NOT_MATCHING)
+    def test_no_match(self, pattern, subject):
+        """The match function returns None if the pattern does not match."""
+        assert match(pattern, subject) is None
+
+
+class TestCompilePattern:
+    """Test case for the compile_pattern function."""
+
+    @pytest.mark.parametrize(("pattern", "subject", "expected"), MATCHING)
+    def test_match(self, pattern, subject, expected):
+        """A compiled matcher returns the matching substitution."""
+        sub = compile_pattern(pattern)(subject)
+        assert sub is not None
+        assert dict(sub.mapping) == expected
+
+    @pytest.mark.parametrize(("pattern", "subject"), NOT_MATCHING)
+    def test_no_match(self, pattern, subject):
+        """A compiled matcher returns None if the pattern does not match."""
+        assert compile_pattern(pattern)(subject) is None
+
+    def test_reuse(self):
+        """A compiled matcher can be applied to many subjects."""
+        matcher = compile_pattern(f(x, g(y)))
+        for subject in [f(a, g(b)), f(g(a), g(g(b))), f(b, g(a))]:
+            assert matcher(subject) == match(matcher.pattern, subject)
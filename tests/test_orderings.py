@@ -0,0 +1,260 @@
+"""Unit tests for the termination.orderings module."""
+
+import pytest
+
+from termination import orderings
+from termination.orderings import ordering
+
+
+class Counter:
+    """A constructor that counts its calls."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, value, *, offset=0, scale=None):
+        self.calls.append(value)
+        return (value + offset) * (1 if scale is None else scale[value % len(scale)])
+
+
+class TestOrdering:
+    """Test case for the ordering decorator."""
+
+    def test_compare(self):
+        """Ordering functions compare values through their comparables."""
+        by_negation = ordering(lambda value: -value)
+        assert by_negation(1) > 2
+        assert by_negation(2) < 1
+        assert by_negation(2) <= 2
+        assert by_negation(2) >= 2
+
+    def test_chain(self):
+        """The left-hand ordering function is applied to the right-hand value."""
+        by_negation = ordering(lambda value: -value)
+        by_value = ordering(lambda value: value)
+        assert by_negation(3) < by_value(2) < 4
+        assert not by_negation(3) < by_value(2) < 1
+
+    def test_equality(self):
+        """Ordered values are equal if their values are."""
+        by_value = ordering(lambda value: value)
+        assert by_value(1) == 1
+        assert by_value(1) == by_value(1)
+        assert by_value(1) != 2
+
+    def test_kwargs(self):
+        """Keyword arguments are passed to the constructor for both sides."""
+        constructor = Counter()
+        ordered = ordering(constructor)
+        assert ordered(1, offset=5) < 2
+        assert constructor.calls == [1, 2]
+
+    def test_wraps(self):
+        """Ordering functions keep the name and docstring of the constructor."""
+
+        @ordering
+        def by_value(value):
+            """Order by value."""
+            return value
+
+        assert by_value.__name__ == "by_value"
+        assert by_value.__doc__ == "Order by value."
+
+    def test_reuse_comparable(self):
+        """An ordered value constructs its comparable once."""
+        constructor = Counter()
+        ordered = ordering(constructor)
+        middle = ordered(2)
+        assert ordered(1) < middle < 3
+        assert sorted(constructor.calls) == [1, 2, 3]
+
+
+class TestCachedOrdering:
+    """Test case for ordering functions with a cache."""
+
+    def test_cached(self):
+        """Comparables are constructed once per value and arguments."""
+        constructor = Counter()
+        ordered = ordering(cache_size=8)(constructor)
+        assert ordered(1) < 2
+        assert ordered(2) > 1
+        assert ordered(2, offset=1) > 1
+        assert constructor.calls == [1, 2, 2, 1]
+
+    def test_unhashable_kwargs(self):
+        """Mappings, sets and sequences in the arguments are frozen."""
+        constructor = Counter()
+        ordered = ordering(cache_size=8)(constructor)
+        assert ordered(1, scale=[3, 1]) < 2
+        assert ordered(1, scale=[3, 1]) < 2
+        assert constructor.calls == [1, 2]
+
+    def test_container_kinds(self):
+        """Different kinds of container with the same items are not confused."""
+        calls = []
+
+        def constructor(value, *, scale):
+            calls.append(type(scale))
+            return value
+
+        ordered = ordering(cache_size=8)(constructor)
+        assert ordered(1, scale=[3, 1]) < 2
+        assert ordered(1, scale=(3, 1)) < 2
+        assert ordered(1, scale={0: 3}) < 2
+        assert ordered(1, scale=frozenset({(0, 3)})) < 2
+        assert calls == [list, list, tuple, tuple, dict, dict, frozenset, frozenset]
+
+    def test_frozen_once(self, monkeypatch):
+        """Arguments are frozen once per ordered value or batch, if at all."""
+        frozen = []
+        kwargs_key = orderings._kwargs_key
+
+        def counting_kwargs_key(kwargs):
+            if kwargs:
+                frozen.append(kwargs)
+            return kwargs_key(kwargs)
+
+        monkeypatch.setattr(orderings, "_kwargs_key", counting_kwargs_key)
+        ordered = ordering(cache_size=8)(Counter())
+
+        assert ordered(1) < 2
+        assert ordered.sort([3, 1, 2]) == [1, 2, 3]
+        assert frozen == []
+
+        value = ordered(1, scale=[3, 1])
+        assert value < 2
+        assert value < 3
+        assert ordered.sort([3, 1, 2], scale=[3, 1]) == [1, 3, 2]
+        assert frozen == [{"scale": [3, 1]}, {"scale": [3, 1]}]
+
+    def test_uncacheable(self):
+        """Values that cannot be hashed are not cached."""
+        ordered = ordering(cache_size=8)(len)
+        assert ordered([1, 2]) > [3]
+        assert len(ordered._cache) == 0
+
+    def test_eviction(self):
+        """The least recently used comparables are evicted."""
+        constructor = Counter()
+        ordered = ordering(cache_size=2)(constructor)
+        ordered.precompute([1, 2])
+        ordered.comparable(1)
+        ordered.comparable(3)
+        assert constructor.calls == [1, 2, 3]
+
+        ordered.comparable(1)
+        assert constructor.calls == [1, 2, 3]
+        ordered.comparable(2)
+        assert constructor.calls == [1, 2, 3, 2]
+
+    def test_precompute(self):
+        """Precomputed comparables are used by later comparisons."""
+        constructor = Counter()
+        ordered = ordering(cache_size=16)(constructor)
+        ordered.precompute(range(10), offset=1)
+        assert sorted(constructor.calls) == list(range(10))
+
+        assert ordered(3, offset=1) < 4
+        assert len(constructor.calls) == 10
+
+    def test_cache_clear(self):
+        """Clearing the cache forgets all comparables."""
+        constructor = Counter()
+        ordered = ordering(cache_size=16)(constructor)
+        ordered.precompute([1])
+        ordered.cache_clear()
+        ordered.comparable(1)
+        assert constructor.calls == [1, 1]
+
+    def test_invalid_cache_size(self):
+        """Cache sizes must be positive."""
+        with pytest.raises(ValueError):
+            ordering(cache_size=0)(Counter())
+
+
+class Divisibility:
+    """A comparable ordered by divisibility, which is a partial order."""
+
+    def __init__(self, value):
+        self.value = value
+
+    def __lt__(self, other):
+        return self.value != other.value and other.value % self.value == 0
+
+    def __gt__(self, other):
+        return other < self
+
+    def __le__(self, other):
+        return other.value % self.value == 0
+
+    def __ge__(self, other):
+        return other <= self
+
+
+class TestBatch:
+    """Test case for sorting and selecting with ordering functions."""
+
+    def test_sort(self):
+        """Ordering functions sort values, constructing each comparable once."""
+        constructor = Counter()
+        ordered = ordering(constructor)
+        assert ordered.sort([3, 1, 2], offset=1) == [1, 2, 3]
+        assert ordered.sort([3, 1, 2], reverse=True) == [3, 2, 1]
+        assert sorted(constructor.calls) == [1, 1, 2, 2, 3, 3]
+
+    def test_sort_stable(self):
+        """Values with equal comparables keep their order."""
+        by_parity = ordering(lambda value: value % 2)
+        assert by_parity.sort([5, 2, 3, 4, 1]) == [2, 4, 5, 3, 1]
+
+    def test_min_max(self):
+        """Ordering functions select the smallest and greatest values."""
+        by_negation = ordering(lambda value: -value)
+        assert by_negation.min([2, 5, 3]) == 5
+        assert by_negation.max([2, 5, 3]) == 2
+        with pytest.raises(ValueError):
+            by_negation.min([])
+
+    def test_nsmallest(self):
+        """Ordering functions select the smallest values in order."""
+        by_value = ordering(lambda value: value)
+        assert by_value.nsmallest(3, [5, 1, 4, 2, 3]) == [1, 2, 3]
+        assert by_value.nsmallest(3, [2, 1]) == [1, 2]
+
+    def test_partial_sort(self):
+        """Partial orderings sort values into a linear extension."""
+        by_divisibility = ordering(partial=True)(Divisibility)
+        result = by_divisibility.sort([12, 5, 6, 2, 3, 10])
+        assert result == [5, 2, 3, 6, 12, 10]
+        for index, value in enumerate(result):
+            assert all(
+                value % other != 0 or value == other for other in result[index + 1 :]
+            )
+
+    def test_partial_min_max(self):
+        """Partial orderings select minimal and maximal values."""
+        by_divisibility = ordering(partial=True)(Divisibility)
+        assert by_divisibility.min([12, 6, 5, 2]) == 2
+        assert by_divisibility.max([2, 6, 5, 12]) == 12
+        assert by_divisibility.max([2, 6, 12, 5]) == 12
+
+    def test_partial_nsmallest(self):
+        """Partial orderings select minimal values repeatedly."""
+        by_divisibility = ordering(partial=True)(Divisibility)
+        assert by_divisibility.nsmallest(3, [12, 6, 4, 2, 3]) == [2, 3, 6]
+
+    def test_not_partial_order(self):
+        """Sorting fails if the comparables have a cycle."""
+        cyclic = ordering(partial=True)(lambda value: Cyclic(value))
+        with pytest.raises(ValueError):
+            cyclic.sort([0, 1, 2])
+
+
+class Cyclic:
+    """A comparable where each value is smaller than the next, modulo 3."""
+
+    def __init__(self, value):
+        self.value = value
+
+    def __lt__(self, other):
+        return other.value == (self.value + 1) % 3
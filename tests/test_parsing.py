@@ -0,0 +1,222 @@
+"""Unit tests for the termination.parsing module."""
+
+import pytest
+
+from termination.parsing import (
+    Format,
+    ParseError,
+    iter_rules,
+    load_rules,
+    parse_rule,
+    parse_term,
+)
+from termination.rewriting import Rule
+from termination.signatures import (
+    Signature,
+    arity,
+    constant,
+    symbol_table,
+    variable,
+    variable_pool,
+)
+from termination.terms import Constant, Function, IndexedVariable, Variable
+
+add = Function("add", 2)
+f = Function("f", 3)
+g = Function("g", 1)
+s = Function("s", 1)
+
+c = Constant("c")
+zero = Constant("0")
+
+x = Variable("x")
+y = Variable("y")
+x2 = IndexedVariable("x", 2)
+
+TPDB = """\
+(COMMENT Addition on (Peano) numbers,
+  written "by hand")
+(VAR x y)
+(RULES
+  add(0, y) -> y
+  add(s(x),y)->s(add(x, y))
+)
+(STRATEGY INNERMOST)
+"""
+
+ARI = """\
+; Addition on Peano numbers
+(format TRS)
+(fun 0 0)
+(fun s 1)
+(fun add 2)
+(rule (add 0 y) y) ; the base case
+(rule (add (s x) y) (s (add x y)))
+"""
+
+PEANO = [
+    Rule(add(zero, y), y),
+    Rule(add(s(x), y), s(add(x, y))),
+]
+
+
+class Peano(Signature):
+    zero = constant()
+    s = arity(1)
+    x = variable()
+
+
+class TestParseTerm:
+    """Test case for the parse_term function."""
+
+    @pytest.mark.parametrize(
+        ("text", "expected"),
+        [
+            pytest.param("c", c, id="constant"),
+            pytest.param("c()", c, id="empty arguments"),
+            pytest.param("?x", x, id="variable"),
+            pytest.param("?x#2", x2, id="indexed variable"),
+            pytest.param("f(g(c), ?x, ?x#2)", f(g(c), x, x2), id="term"),
+            pytest.param(" f( g(c) ,?x,\n?x#2 ) ", f(g(c), x, x2), id="whitespace"),
+        ],
+    )
+    def test_parse(self, text, expected):
+        """Terms are parsed from their string syntax."""
+        assert parse_term(text) == expected
+
+    @pytest.mark.parametrize(
+        "term",
+        [
+            pytest.param(f(g(c), x, x2), id="term"),
+            pytest.param(add(s(zero), add(y, s(s(x)))), id="nested"),
+        ],
+    )
+    def test_round_trip(self, term):
+        """Parsing the string of a term gives back the term."""
+        assert parse_term(str(term)) == term
+
+    @pytest.mark.parametrize(
+        ("text", "line", "column"),
+        [
+            pytest.param("", 1, 1, id="empty"),
+            pytest.param("f(c", 2, 1, id="unclosed"),
+            pytest.param("f(c))", 1, 5, id="extra"),
+            pytest.param("f(c,)", 1, 5, id="missing argument"),
+            pytest.param("f(c\n  c)", 2, 3, id="missing comma"),
+        ],
+    )
+    def test_error(self, text, line, column):
+        """Syntax errors are located by line and column."""
+        with pytest.raises(ParseError) as info:
+            parse_term(text)
+        assert (info.value.line, info.value.column) == (line, column)
+
+    def test_deep(self):
+        """Terms are parsed without recursion, however deep they are."""
+        depth = 100_000
+        term = parse_term("s(" * depth + "0" + ")" * depth)
+        assert term.depth == depth
+
+    def test_signature(self):
+        """Symbols are interned into the signature, and variables are pooled."""
+        peano = Peano()
+        term = parse_term("s(s(?x, zero), s(zero))", signature=peano)
+        assert term.children[1].root is peano.s
+        assert term.children[1].children[0] is peano.zero
+        assert term.children[0].children[0] is peano.x
+        assert Function("s", 2) in symbol_table(peano)
+
+    def test_signature_indexed_variable(self):
+        """Indexed variables are never fresh in the signature's pool."""
+        peano = Peano()
+        parse_term("s(?x#5)", signature=peano)
+        assert variable_pool(peano).get_fresh("x").index > 5
+
+
+class TestParseRule:
+    """Test case for the parse_rule function."""
+
+    def test_parse(self):
+        """Rules are parsed from their string syntax."""
+        for rule in PEANO:
+            assert parse_rule(str(rule)) == rule
+
+    @pytest.mark.parametrize(
+        "text",
+        [
+            pytest.param("?x -> c", id="variable lhs"),
+            pytest.param("g(?x) -> ?y", id="extra variable"),
+            pytest.param("g(?x) ->= ?x", id="relative"),
+            pytest.param("g(?x) -> ?x | ?x == c", id="conditional"),
+        ],
+    )
+    def test_invalid(self, text):
+        """Invalid and unsupported rules are rejected."""
+        with pytest.raises(ParseError):
+            parse_rule(text)
+
+
+class TestIterRules:
+    """Test case for the iter_rules and load_rules functions."""
+
+    @pytest.mark.parametrize(
+        ("text", "format"),
+        [
+            pytest.param(TPDB, Format.TPDB, id="TPDB"),
+            pytest.param(ARI, Format.ARI, id="ARI"),
+        ],
+    )
+    def test_parse(self, text, format):
+        """Rules are parsed from problems in either format."""
+        assert list(iter_rules(text, format=format)) == PEANO
+
+    def test_lazy(self):
+        """Rules are read as they are needed."""
+        consumed = []
+
+        def lines():
+            for line in TPDB.splitlines():
+                consumed.append(line)
+                yield line
+
+        rules = iter_rules(lines())
+        assert next(rules) == PEANO[0]
+        assert "(STRATEGY INNERMOST)" not in consumed
+
+    def test_shared_symbols(self):
+        """Symbols with the same name are the same instance across rules."""
+        first, second = iter_rules(ARI, format=Format.ARI)
+        assert first.lhs.root is second.lhs.root
+        assert first.rhs is second.lhs.children[1]
+
+    def test_tpdb_constant_variable(self):
+        """Names in the VAR section are variables, and others are constants."""
+        (rule,) = iter_rules("(VAR x)(RULES g(x) -> y)")
+        assert rule == Rule(g(x), Constant("y"))
+
+    @pytest.mark.parametrize(
+        "text",
+        [
+            pytest.param("(format TRS)(fun s 1)(rule (s x y) x)", id="arity"),
+            pytest.param("(format TRS)(fun s 1)(rule s x)", id="missing arguments"),
+            pytest.param("(format SRS)", id="format"),
+            pytest.param("(format TRS)(rule (s x) x)", id="undeclared"),
+        ],
+    )
+    def test_ari_error(self, text):
+        """Terms must match the declared arities."""
+        with pytest.raises(ParseError):
+            list(iter_rules(text, format=Format.ARI))
+
+    @pytest.mark.parametrize(
+        ("name", "text"),
+        [
+            pytest.param("peano.trs", TPDB, id="TPDB"),
+            pytest.param("peano.ari", ARI, id="ARI"),
+        ],
+    )
+    def test_load(self, tmp_path, name, text):
+        """The format of a file is chosen by its extension."""
+        path = tmp_path / name
+        path.write_text(text)
+        assert list(load_rules(path)) == PEANO
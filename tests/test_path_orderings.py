@@ -0,0 +1,171 @@
+"""Unit tests for the termination.path_orderings module."""
+
+import pytest
+
+from termination.path_orderings import PathOrdering, Status, lpo, rpo
+from termination.pools import VariablePool
+from termination.terms import Constant, Function, Variable
+
+ack = Function("ack", 2)
+add = Function("add", 2)
+mul = Function("mul", 2)
+s = Function("s", 1)
+f = Function("f", 2)
+g = Function("g", 1)
+
+zero = Constant("0")
+a = Constant("a")
+b = Constant("b")
+
+x = Variable("x")
+y = Variable("y")
+z = Variable("z")
+
+PRECEDENCE = {ack: 3, mul: 2, add: 1, f: 1, s: 0, g: 0}
+
+
+def numeral(n, base=zero):
+    term = base
+    for _ in range(n):
+        term = s(term)
+    return term
+
+
+class TestLPO:
+    """Test case for the lexicographic path ordering."""
+
+    @pytest.mark.parametrize(
+        ("lhs", "rhs"),
+        [
+            pytest.param(add(zero, y), y, id="add-zero"),
+            pytest.param(add(s(x), y), s(add(x, y)), id="add-succ"),
+            pytest.param(mul(zero, y), zero, id="mul-zero"),
+            pytest.param(mul(s(x), y), add(y, mul(x, y)), id="mul-succ"),
+            pytest.param(ack(zero, y), s(y), id="ack-zero"),
+            pytest.param(ack(s(x), zero), ack(x, s(zero)), id="ack-succ-zero"),
+            pytest.param(ack(s(x), s(y)), ack(x, ack(s(x), y)), id="ack-succ-succ"),
+        ],
+    )
+    def test_orients_rules(self, lhs, rhs):
+        """LPO orients the rules of addition, multiplication and Ackermann."""
+        assert lpo(lhs, precedence=PRECEDENCE) > rhs
+        assert not lpo(rhs, precedence=PRECEDENCE) > lhs
+
+    def test_subterm(self):
+        """A term is greater than its proper subterms."""
+        assert lpo(f(g(x), a), precedence={}) > g(x)
+        assert lpo(f(g(x), a), precedence={}) > x
+
+    def test_variables(self):
+        """A variable is only smaller than terms that contain it."""
+        assert not lpo(x, precedence=PRECEDENCE) > y
+        assert not lpo(g(x), precedence=PRECEDENCE) > y
+        assert not lpo(x, precedence=PRECEDENCE) > g(x)
+
+    def test_incomparable_symbols(self):
+        """Symbols missing from the precedence are incomparable."""
+        assert not lpo(a, precedence={}) > b
+        assert not lpo(b, precedence={}) > a
+        assert lpo(a, precedence={a: 1, b: 0}) > b
+
+    def test_equal(self):
+        """Equal terms are greater or equal, but not greater."""
+        assert lpo(f(x, a), precedence=PRECEDENCE) >= f(x, a)
+        assert not lpo(f(x, a), precedence=PRECEDENCE) > f(x, a)
+
+    def test_equal_constants(self):
+        """A constant is not greater than itself."""
+        assert not lpo(a, precedence={a: 0}) > a
+        assert lpo(a, precedence={a: 0}) >= a
+        assert lpo.sort([a, a, f(a, a)], precedence={a: 0, f: 1}) == [
+            a,
+            a,
+            f(a, a),
+        ]
+
+    def test_equal_constants_nested(self):
+        """Comparing a constant with itself inside a larger term is safe."""
+        assert not lpo(b, precedence={b: 1, f: 0}) > f(b, b)
+        assert not lpo(b, precedence={b: 1, f: 0}) > f(a, b)
+        assert lpo(b, precedence={b: 1, f: 0, a: 0}) >= f(a, a)
+
+    def test_lexicographic(self):
+        """LPO does not orient permuted children."""
+        assert not lpo(f(s(x), y), precedence=PRECEDENCE) > f(y, x)
+
+    def test_chaining(self):
+        """LPO supports the chaining syntax of ordering functions."""
+        assert (
+            lpo(s(s(zero)), precedence=PRECEDENCE)
+            > lpo(s(zero), precedence=PRECEDENCE)
+            > zero
+        )
+        assert zero < lpo(s(zero), precedence=PRECEDENCE)
+
+    def test_deep(self):
+        """Comparing deep terms does not hit the recursion limit."""
+        assert lpo(numeral(5000, x), precedence=PRECEDENCE) > numeral(4999, x)
+
+    def test_memoized(self):
+        """Shared subterms keep the comparison polynomial.
+
+        Naive LPO takes exponential time to compare these terms.
+        """
+        left = a
+        right = b
+        for _ in range(60):
+            left = f(left, left)
+            right = f(right, right)
+        assert lpo(left, precedence={a: 1, b: 0, f: 2}) > right
+
+
+class TestRPO:
+    """Test case for the recursive path ordering."""
+
+    def test_multiset(self):
+        """RPO compares children as multisets by default."""
+        assert rpo(f(s(x), y), precedence=PRECEDENCE) > f(y, x)
+        assert not rpo(f(y, x), precedence=PRECEDENCE) > f(s(x), y)
+
+    def test_lexicographic_status(self):
+        """Symbols may have lexicographic status."""
+        status = {f: Status.LEXICOGRAPHIC}
+        assert not rpo(f(s(x), y), precedence=PRECEDENCE, status=status) > f(y, x)
+        assert rpo(f(s(x), y), precedence=PRECEDENCE, status=status) > f(x, s(y))
+
+    def test_permutation_equivalent(self):
+        """Terms with permuted multiset children are equivalent."""
+        order = PathOrdering(precedence=PRECEDENCE, default_status=Status.MULTISET)
+        assert order.equivalent(f(g(x), f(a, y)), f(f(y, a), g(x)))
+        assert not order.greater(f(g(x), f(a, y)), f(f(y, a), g(x)))
+        assert rpo(f(x, y), precedence=PRECEDENCE) >= f(y, x)
+
+    def test_permutation_equal_strings(self):
+        """Distinct children with the same string are told apart when sorting."""
+        pooled = VariablePool().get("x")
+        assert str(pooled) == str(x)
+        order = PathOrdering(precedence=PRECEDENCE, default_status=Status.MULTISET)
+        assert order.equivalent(f(x, pooled), f(pooled, x))
+        assert not order.equivalent(f(x, x), f(pooled, x))
+
+    def test_permutation_shared(self):
+        """Equivalence takes time linear in the number of distinct subterms."""
+        left = right = a
+        for _ in range(200):
+            left = f(left, g(left))
+            right = f(g(right), right)
+        order = PathOrdering(precedence=PRECEDENCE, default_status=Status.MULTISET)
+        assert order.equivalent(left, right)
+        assert not order.equivalent(left, g(right))
+
+    def test_multiset_duplicates(self):
+        """Multisets count duplicate children."""
+        assert rpo(f(s(x), s(x)), precedence=PRECEDENCE) > f(s(x), x)
+        assert not rpo(f(s(x), x), precedence=PRECEDENCE) > f(s(x), s(x))
+
+    def test_commutative_rules(self):
+        """RPO orients rules that LPO cannot, like swapping arguments."""
+        lhs = mul(add(x, y), z)
+        rhs = add(mul(z, x), mul(z, y))
+        assert rpo(lhs, precedence=PRECEDENCE) > rhs
+        assert not lpo(lhs, precedence=PRECEDENCE) > rhs
@@ -1,9 +1,16 @@
 """Unit tests for the termination.pools module."""
 
+import copy
+import gc
+import pickle
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
 
-from termination.pools import VariablePool, fresh_variable
-from termination.terms import IndexedVariable, Variable
+from termination.pools import ConcurrentVariablePool, VariablePool, fresh_variable
+from termination.rewriting import Rule
+from termination.terms import Constant, Function, IndexedVariable, Variable, variables
 
 
 class TestPool:
@@ -180,3 +187,161 @@ class TestFreshVariable:
         assert x1.index == 1
         assert x2.index == 2
         assert x3.index == 3
+
+
+class TestRenameApart:
+    """Test case for renaming values apart with a VariablePool."""
+
+    f = Function("f", 2)
+    g = Function("g", 1)
+
+    x = Variable("x")
+    y = Variable("y")
+
+    def test_rename_term(self):
+        """Renaming a term replaces its variables with fresh ones."""
+        pool = VariablePool()
+        term = self.f(self.x, self.g(IndexedVariable("x", 3)))
+        renamed = pool.rename_apart(term)
+        assert renamed == self.f(pool.get("x", 1), self.g(pool.get("x", 2)))
+        assert pool.get_fresh("x").index == 3
+
+    def test_rename_rule(self):
+        """Renaming a rule renames both sides consistently."""
+        pool = VariablePool()
+        rule = Rule(self.f(self.x, self.y), self.g(self.y))
+        renamed = pool.rename_apart(rule)
+        x1 = pool.get("x", 1)
+        y1 = pool.get("y", 1)
+        assert renamed == Rule(self.f(x1, y1), self.g(y1))
+
+    def test_rename_twice(self):
+        """Renaming the same value twice gives disjoint variables."""
+        pool = VariablePool()
+        term = self.f(self.x, self.y)
+        first = pool.rename_apart(term)
+        second = pool.rename_apart(term)
+        assert not set(variables(first)) & set(variables(second))
+
+    def test_renaming(self):
+        """The renaming substitution maps each variable to a fresh one."""
+        pool = VariablePool()
+        pool.get_fresh("y")
+        renaming = pool.renaming(self.f(self.x, self.y))
+        assert dict(renaming.mapping) == {
+            self.x: pool.get("x", 1),
+            self.y: pool.get("y", 2),
+        }
+
+    def test_ground(self):
+        """Renaming a ground value changes nothing."""
+        pool = VariablePool()
+        term = self.g(Constant("a"))
+        assert pool.rename_apart(term) is term
+
+
+class TestShardedPool:
+    """Test case for sharded variable pools."""
+
+    def test_stripes(self):
+        """Each shard hands out fresh indexes in its own stripe."""
+        pools = [VariablePool(shard=shard, shards=3) for shard in range(3)]
+        indexes = [[pool.get_fresh("x").index for _ in range(4)] for pool in pools]
+        assert indexes == [[3, 6, 9, 12], [1, 4, 7, 10], [2, 5, 8, 11]]
+
+    def test_block(self):
+        """Blocks of fresh indexes stay in the stripe."""
+        pool = VariablePool(shard=1, shards=4)
+        pool.get("x", 6)
+        renamed = pool.rename_apart(
+            Function("f", 2)(Variable("x"), IndexedVariable("x", 1))
+        )
+        assert [child.index for child in renamed.children] == [9, 13]
+        assert pool.get_fresh("x").index == 17
+
+    @pytest.mark.parametrize(
+        ("shard", "shards"),
+        [pytest.param(0, 0), pytest.param(2, 2), pytest.param(-1, 2)],
+    )
+    def test_invalid(self, shard, shards):
+        """Shards must be in range."""
+        with pytest.raises(ValueError):
+            VariablePool(shard=shard, shards=shards)
+
+
+class TestConcurrentPool:
+    """Test case for the ConcurrentVariablePool class."""
+
+    def test_threads(self):
+        """Threads sharing a pool never get the same fresh variable."""
+        pool = ConcurrentVariablePool()
+        barrier = threading.Barrier(8)
+
+        def work():
+            barrier.wait()
+            return [pool.get_fresh("x").index for _ in range(1000)]
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            futures = [executor.submit(work) for _ in range(8)]
+            indexes = [index for future in futures for index in future.result()]
+
+        assert sorted(indexes) == list(range(1, 8001))
+
+    def test_fresh_variable(self):
+        """Concurrent pools are variable pools."""
+        pool = ConcurrentVariablePool()
+        assert fresh_variable(pool["x"]).index == 1
+        assert fresh_variable(pool).name == ""
+
+
+class TestPoolVariable:
+    """Test case for variables created by pools."""
+
+    def test_slots(self):
+        """Pool variables have no instance dictionary."""
+        pool = VariablePool()
+        assert not hasattr(pool["x"], "__dict__")
+        assert not hasattr(pool.get_fresh("x"), "__dict__")
+
+    def test_pool(self):
+        """Pool variables refer to their pool by id."""
+        pool = VariablePool()
+        other = VariablePool()
+        assert pool.pool_id != other.pool_id
+        assert pool["x"].pool is pool
+        assert pool.get_fresh("x").pool is pool
+
+    def test_pool_collected(self):
+        """Pool variables do not keep their pool alive."""
+        pool = VariablePool()
+        variable = pool["x"]
+        del pool
+        gc.collect()
+        with pytest.raises(ValueError):
+            fresh_variable(variable)
+
+    def test_pickle(self):
+        """Pickled pool variables refer to the same pool in the same process."""
+        pool = ConcurrentVariablePool()
+        term = Function("f", 2)(pool["x"], pool.get_fresh("y"))
+        restored = pickle.loads(pickle.dumps(term))
+        assert restored == term
+        assert restored.children[0] is pool["x"]
+        assert restored.children[1].pool is pool
+        assert copy.deepcopy(pool) is pool
+
+    def test_pickle_other_process(self):
+        """Unpickling pool variables recreates their pool where it is missing."""
+        pool = VariablePool()
+        data = pickle.dumps([pool["x"], pool.get_fresh("x")])
+        pool_id = pool.pool_id
+        del pool
+        gc.collect()
+
+        variable, indexed = pickle.loads(data)
+        restored = variable.pool
+        assert restored.pool_id == pool_id
+        assert indexed.pool is restored
+        assert restored["x"] is variable
+        assert fresh_variable(variable).index == 2
+        assert pickle.loads(data)[0].pool is restored
@@ -0,0 +1,156 @@
+"""Unit tests for the termination.rewriting module."""
+
+import pytest
+
+from termination.rewriting import (
+    Budget,
+    BudgetExceeded,
+    RewriteSystem,
+    Rule,
+    Strategy,
+)
+from termination.terms import Constant, Function, Variable
+
+add = Function("add", 2)
+mul = Function("mul", 2)
+s = Function("s", 1)
+f = Function("f", 1)
+g = Function("g", 1)
+h = Function("h", 2)
+
+zero = Constant("0")
+a = Constant("a")
+b = Constant("b")
+
+x = Variable("x")
+y = Variable("y")
+
+PEANO = [
+    Rule(add(zero, y), y),
+    Rule(add(s(x), y), s(add(x, y))),
+    Rule(mul(zero, y), zero),
+    Rule(mul(s(x), y), add(y, mul(x, y))),
+]
+
+STRATEGIES = [pytest.param(strategy) for strategy in Strategy]
+
+
+def numeral(n):
+    term = zero
+    for _ in range(n):
+        term = s(term)
+    return term
+
+
+class TestRule:
+    """Test case for the Rule class."""
+
+    def test_str(self):
+        """A Rule formats with an arrow."""
+        assert str(Rule(add(zero, y), y)) == "add(0, ?y) -> ?y"
+
+    def test_variable_lhs(self):
+        """A Rule's left-hand side must not be a variable."""
+        with pytest.raises(TypeError):
+            Rule(x, a)
+
+    def test_extra_variables(self):
+        """A Rule's right-hand side must not introduce variables."""
+        with pytest.raises(ValueError):
+            Rule(f(x), h(x, y))
+
+    def test_apply(self):
+        """A Rule rewrites matching terms at the root."""
+        rule = Rule(add(s(x), y), s(add(x, y)))
+        assert rule.apply(add(s(zero), a)) == s(add(zero, a))
+        assert rule.apply(add(zero, a)) is None
+
+
+class TestRewriteSystem:
+    """Test case for the RewriteSystem class."""
+
+    def test_rewrite(self):
+        """A RewriteSystem rewrites a term at a position."""
+        trs = RewriteSystem(PEANO)
+        term = s(add(s(zero), zero))
+        assert trs.rewrite(term, (0,)) == s(s(add(zero, zero)))
+        assert trs.rewrite(term, ()) is None
+
+    def test_rule_order(self):
+        """A RewriteSystem applies the first rule added when several apply."""
+        trs = RewriteSystem([Rule(f(x), a), Rule(f(b), b)])
+        assert trs.rewrite_root(f(b)) == a
+
+    def test_add_remove(self):
+        """Rules can be added to and removed from a RewriteSystem."""
+        trs = RewriteSystem()
+        rule = Rule(f(x), x)
+        trs.add(rule)
+        assert rule in trs
+        assert len(trs) == 1
+        trs.remove(rule)
+        assert rule not in trs
+        assert trs.rewrite_root(f(a)) is None
+        with pytest.raises(KeyError):
+            trs.remove(rule)
+
+    @pytest.mark.parametrize(("strategy",), STRATEGIES)
+    def test_normalize(self, strategy):
+        """A RewriteSystem computes normal forms."""
+        trs = RewriteSystem(PEANO)
+        term = mul(numeral(3), add(numeral(2), numeral(1)))
+        result = trs.normalize(term, strategy=strategy)
+        assert result == numeral(9)
+        assert trs.is_normal(result)
+        assert not trs.is_normal(term)
+
+    @pytest.mark.parametrize(("strategy",), STRATEGIES)
+    def test_normalize_normal(self, strategy):
+        """Normalizing a term in normal form returns it unchanged."""
+        trs = RewriteSystem(PEANO)
+        term = h(numeral(3), x)
+        assert trs.normalize(term, strategy=strategy) is term
+
+    def test_strategies_differ(self):
+        """Innermost and outermost strategies can reach different results."""
+        trs = RewriteSystem([Rule(f(x), a), Rule(g(x), g(x))])
+        with pytest.raises(BudgetExceeded):
+            trs.normalize(f(g(b)), strategy=Strategy.INNERMOST, max_steps=100)
+        assert trs.normalize(f(g(b)), strategy=Strategy.OUTERMOST) == a
+        assert trs.normalize(f(g(b)), strategy=Strategy.PARALLEL_OUTERMOST) == a
+
+    def test_memo_shared_subterms(self):
+        """Shared subterms are normalized once."""
+        trs = RewriteSystem(PEANO)
+        shared = add(numeral(5), numeral(5))
+        term = h(shared, h(shared, shared))
+        memo = {}
+        result = trs.normalize(term, max_steps=6, memo=memo)
+        assert result == h(numeral(10), h(numeral(10), numeral(10)))
+        assert memo[shared] == numeral(10)
+
+    @pytest.mark.parametrize(("strategy",), STRATEGIES)
+    def test_max_steps(self, strategy):
+        """Normalization stops after a maximum number of steps."""
+        trs = RewriteSystem([Rule(f(x), f(f(x)))])
+        with pytest.raises(BudgetExceeded) as info:
+            trs.normalize(f(a), strategy=strategy, max_steps=50)
+        assert info.value.steps == 50
+
+    def test_timeout(self):
+        """Normalization stops after a maximum amount of time."""
+        trs = RewriteSystem([Rule(f(x), f(f(x)))])
+        with pytest.raises(BudgetExceeded):
+            trs.normalize(f(a), strategy=Strategy.OUTERMOST, timeout=0.05)
+
+    @pytest.mark.parametrize(("strategy",), STRATEGIES)
+    def test_timeout_without_steps(self, strategy):
+        """Searching a large term for redexes stops after the time runs out."""
+        trs = RewriteSystem([Rule(f(b), a)])
+        terms = [Constant(f"c{k}") for k in range(2 * Budget.CLOCK_INTERVAL)]
+        while len(terms) > 1:
+            terms = [h(terms[k], terms[k + 1]) for k in range(0, len(terms), 2)]
+        term = terms[0]
+        with pytest.raises(BudgetExceeded) as info:
+            trs.normalize(term, strategy=strategy, timeout=0)
+        assert info.value.steps == 0
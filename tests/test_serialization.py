@@ -0,0 +1,184 @@
+"""Unit tests for the termination.serialization module."""
+
+import mmap
+import pickle
+
+import pytest
+
+from termination.pools import VariablePool
+from termination.rewriting import RewriteSystem, Rule
+from termination.serialization import dumps, loads
+from termination.signatures import Signature, arity, constant, variable_pool
+from termination.terms import (
+    Constant,
+    Function,
+    IndexedVariable,
+    Substitution,
+    Variable,
+)
+
+f = Function("f", 2)
+g = Function("g", 1)
+
+a = Constant("a")
+b = Constant("b")
+
+x = Variable("x")
+y = Variable("y")
+x3 = IndexedVariable("x", 3)
+big = IndexedVariable("x", 2**40)
+negative = IndexedVariable("x", -1)
+
+
+def tower(depth):
+    """Return a term of the given depth, with two copies of each subterm."""
+    term = a
+    for _ in range(depth):
+        term = f(term, term)
+    return term
+
+
+class Small(Signature):
+    f = arity(2)
+    a = constant()
+
+
+class TestSerialization:
+    """Test case for the dumps and loads functions."""
+
+    @pytest.mark.parametrize(
+        "value",
+        [
+            pytest.param(a, id="constant"),
+            pytest.param(x, id="variable"),
+            pytest.param(f(g(a), x3), id="term"),
+            pytest.param(f(big, negative), id="indexes"),
+            pytest.param(f(f(g(x), g(x)), g(x)), id="shared"),
+            pytest.param(Substitution({x: g(a), x3: y}), id="substitution"),
+            pytest.param(Substitution(), id="empty substitution"),
+            pytest.param([Rule(f(x, y), g(y)), Rule(g(x), x)], id="rules"),
+        ],
+    )
+    def test_round_trip(self, value):
+        """Values decode to equal values."""
+        assert loads(dumps(value)) == value
+
+    def test_indexes_exact(self):
+        """Indexed variables keep their indexes, and their class."""
+        decoded = loads(dumps(f(x3, x)))
+        assert type(decoded.children[0]) is IndexedVariable
+        assert decoded.children[0].index == 3
+        assert type(decoded.children[1]) is Variable
+
+    def test_rewrite_system(self):
+        """Rewrite systems are encoded as their rules."""
+        rules = [Rule(f(x, y), g(y)), Rule(g(x), x)]
+        assert loads(dumps(RewriteSystem(rules))) == rules
+
+    def test_sharing(self):
+        """Shared subterms are encoded once, and shared when decoded."""
+        data = dumps(tower(1000))
+        assert len(data) < 10_000
+
+        decoded = loads(data)
+        assert decoded.depth == 1000
+        while decoded != a:
+            assert decoded.children[0] is decoded.children[1]
+            decoded = decoded.children[0]
+
+    def test_compact(self):
+        """Encodings are smaller than pickles."""
+        term = f(g(a), f(g(b), g(x)))
+        for _ in range(5):
+            term = f(term, g(term))
+        assert len(dumps(term)) < len(pickle.dumps(term)) / 4
+
+    def test_deep(self):
+        """Deep terms are encoded and decoded without recursion."""
+        term = a
+        for _ in range(100_000):
+            term = g(term)
+        assert loads(dumps(term)).depth == 100_000
+
+    def test_wide_codes(self):
+        """Codes are widened when there are many symbols."""
+        term = a
+        for number in range(300):
+            term = f(Constant(str(number)), term)
+        assert loads(dumps(term)) == term
+
+    @pytest.mark.parametrize(
+        "wrap",
+        [
+            pytest.param(bytes, id="bytes"),
+            pytest.param(bytearray, id="bytearray"),
+            pytest.param(memoryview, id="memoryview"),
+        ],
+    )
+    def test_buffers(self, wrap):
+        """Values decode from any buffer."""
+        term = f(g(a), x3)
+        assert loads(wrap(dumps(term))) == term
+
+    def test_mmap(self, tmp_path):
+        """Values decode from a memory-mapped file."""
+        term = f(g(a), x3)
+        path = tmp_path / "term.bin"
+        path.write_bytes(dumps(term))
+        with (
+            path.open("rb") as file,
+            mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped,
+        ):
+            assert loads(mapped) == term
+
+    def test_signature(self):
+        """Symbols are interned into a signature, and variables are pooled."""
+        small = Small()
+        decoded = loads(dumps(f(a, x3)), signature=small)
+        assert decoded.root is small.f
+        assert decoded.children[0] is small.a
+        assert decoded.children[1].pool is variable_pool(small)
+
+    def test_pool_variables(self):
+        """Pool variables are decoded as plain variables."""
+        pool = VariablePool()
+        term = f(pool["x"], pool.get("y", 4))
+        assert loads(dumps(term)) == f(x, IndexedVariable("y", 4))
+
+    @pytest.mark.parametrize(
+        "data",
+        [
+            pytest.param(b"", id="empty"),
+            pytest.param(b"PICKLE" + bytes(32), id="magic"),
+            pytest.param(dumps(f(a, b))[:-1], id="truncated"),
+            pytest.param(dumps(a) + b"\x00", id="trailing"),
+        ],
+    )
+    def test_invalid(self, data):
+        """Invalid data raises ValueError."""
+        with pytest.raises(ValueError):
+            loads(data)
+
+    @pytest.mark.parametrize(
+        "value",
+        [
+            pytest.param([1, 2], id="list"),
+            pytest.param([Rule(a, b), a], id="mixed"),
+            pytest.param(1, id="int"),
+            pytest.param(None, id="none"),
+            pytest.param(f, id="function"),
+            pytest.param(g(f), id="nested-function"),
+        ],
+    )
+    def test_unsupported(self, value):
+        """Only terms, substitutions and rules can be encoded."""
+        with pytest.raises(TypeError):
+            dumps(value)
+
+    def test_non_variable_binding(self):
+        """A substitution binding a non-variable raises TypeError."""
+        data = bytearray(dumps([Rule(a, b)]))
+        # The kind of value follows the magic and the version.
+        data[5] = 1
+        with pytest.raises(TypeError):
+            loads(data)
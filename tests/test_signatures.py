@@ -2,7 +2,8 @@
 
 import pytest
 
-from termination.signatures import Signature, arity, constant, variable
+from termination.path_orderings import lpo
+from termination.signatures import Signature, arity, constant, symbol_table, variable
 from termination.terms import Constant, Function, Variable
 
 
@@ -56,3 +57,44 @@ class TestSignature:
         """A Signature's symbols are created correctly."""
         signature = signature_type()
         assert getattr(signature, attr_name) == expected
+
+
+class TestSymbolTable:
+    """Test case for the symbol tables of signatures."""
+
+    class Base(Signature):
+        f = arity(2)
+        a = constant()
+
+    class Derived(Base):
+        g = arity(1)
+        x = variable()
+        b = constant()
+
+    def test_ids(self):
+        """Symbols get ids in the order they are declared."""
+        sig = self.Derived()
+        table = symbol_table(sig)
+        assert [table[symbol] for symbol in (sig.f, sig.a, sig.g, sig.b)] == [
+            0,
+            1,
+            2,
+            3,
+        ]
+
+    def test_interned(self):
+        """Signatures return the canonical instances of their symbols."""
+        sig = self.Derived()
+        table = symbol_table(sig)
+        assert table.intern(Function("f", 2)) is sig.f
+        assert table.intern(Constant("b")) is sig.b
+
+    def test_per_instance(self):
+        """Each signature instance has its own table."""
+        assert symbol_table(self.Base()) is not symbol_table(self.Base())
+
+    def test_precedence(self):
+        """Symbol tables make precedence arrays usable by orderings."""
+        sig = self.Derived()
+        precedence = symbol_table(sig).array({sig.f: 2, sig.g: 1, sig.a: 0})
+        assert lpo(sig.f(sig.g(sig.a), sig.a), precedence=precedence) > sig.g(sig.a)
@@ -0,0 +1,219 @@
+"""Unit tests for the termination.storage module."""
+
+import sys
+
+import pytest
+
+from termination.pools import VariablePool
+from termination.storage import StoredTerm, TermStore, _node_hash
+from termination.terms import (
+    Constant,
+    Function,
+    IndexedVariable,
+    Substitution,
+    Variable,
+    variables,
+)
+
+f = Function("f", 2)
+g = Function("g", 1)
+
+a = Constant("a")
+b = Constant("b")
+
+x = Variable("x")
+y = Variable("y")
+x2 = IndexedVariable("x", 2)
+
+SWAPPED = "big" if sys.byteorder == "little" else "little"
+
+
+@pytest.fixture
+def store(tmp_path):
+    with TermStore(tmp_path / "store") as store:
+        yield store
+
+
+class TestTermStore:
+    """Test case for the TermStore class."""
+
+    @pytest.mark.parametrize(
+        "term",
+        [
+            pytest.param(g(a), id="unary"),
+            pytest.param(f(g(a), x), id="binary"),
+            pytest.param(f(f(x, g(y)), f(g(g(a)), x2)), id="nested"),
+        ],
+    )
+    def test_round_trip(self, store, term):
+        """Stored terms read back as equal terms."""
+        handle = store.add(term)
+        assert isinstance(handle, StoredTerm)
+        assert handle.to_term() == term
+        assert str(handle) == str(term)
+
+    def test_symbols(self, store):
+        """Terminal symbols are returned as they are."""
+        assert store.add(a) == a
+        assert store.add(x2) == x2
+
+    @pytest.mark.parametrize(
+        "term",
+        [
+            pytest.param(f, id="function"),
+            pytest.param(g(f), id="nested-function"),
+            pytest.param("a", id="string"),
+        ],
+    )
+    def test_invalid(self, store, term):
+        """Objects that are not terms or terminal symbols raise TypeError."""
+        with pytest.raises(TypeError):
+            store.add(term)
+        with pytest.raises(TypeError):
+            store.find(term)
+        assert len(store) == 0
+
+    def test_symbols_written_first(self, store):
+        """Symbols reach the file before any node refers to them."""
+        store.add(f(g(a), x))
+        assert (store.path / "symbols.bin").stat().st_size > 0
+
+    def test_hash_consing(self, store):
+        """Equal terms are stored once, and share their subterms."""
+        first = store.add(f(g(a), g(a)))
+        assert len(store) == 3
+        assert store.add(f(g(a), g(a))) == first
+        assert first[0,] == first[1,]
+
+        store.add(g(g(a)))
+        assert len(store) == 4
+
+    def test_find(self, store):
+        """Terms are found without adding them."""
+        handle = store.add(f(g(a), x))
+        assert store.find(f(g(a), x)) == handle
+        assert store.find(g(x)) is None
+        assert store.find(g(b)) is None
+        assert f(g(a), x) in store
+        assert g(g(a)) not in store
+        assert len(store) == 4
+
+    def test_term_like(self, store):
+        """Handles support positions, subterms and variables lazily."""
+        term = f(g(a), f(x, y))
+        handle = store.add(term)
+        assert len(handle) == len(term)
+        assert handle.depth == term.depth
+        assert handle.root == f
+        assert list(handle.positions()) == list(term.positions())
+        for position, subterm in handle.subterms():
+            assert subterm == store.add(term[position])
+        assert handle[1, 0] == x
+        assert set(variables(handle)) == {x, y}
+        assert handle.variable_set == term.variable_set
+
+    def test_invalid_position(self, store):
+        """Accessing an invalid position raises a KeyError."""
+        handle = store.add(f(g(a), x))
+        with pytest.raises(KeyError):
+            handle[0, 1]
+
+    def test_substitute(self, store):
+        """Substitutions apply to handles, and give terms."""
+        handle = store.add(f(x, g(x)))
+        assert Substitution({x: a})(handle) == f(a, g(a))
+
+    def test_add_handles(self, store, tmp_path):
+        """Handles can be added, to the same store or to another one."""
+        handle = store.add(g(a))
+        assert store.add(f(handle, handle)) == store.add(f(g(a), g(a)))
+
+        with TermStore(tmp_path / "other") as other:
+            copied = other.add(f(handle, x))
+            assert copied.to_term() == f(g(a), x)
+
+    def test_pool_variables(self, store):
+        """Pool variables are stored as plain variables."""
+        pool = VariablePool()
+        handle = store.add(f(pool["x"], pool.get("x", 2)))
+        assert handle.to_term() == f(x, x2)
+        assert store.add(f(x, x2)) == handle
+
+    def test_sharing(self, store):
+        """Terms are stored in time and space linear in their distinct subterms."""
+        term = a
+        for _ in range(1000):
+            term = f(term, term)
+        handle = store.add(term)
+        assert len(store) == 1001
+        assert handle.depth == 1000
+        assert len(handle[(0,) * 990]) == 2**11 - 1
+        # The builtin len() is limited to sys.maxsize.
+        assert handle.__len__() == 2**1001 - 1
+
+    def test_growth(self, store):
+        """The files and index grow as terms are added."""
+        handles = [store.add(f(Constant(str(number)), x)) for number in range(3000)]
+        assert len(store) == 6001
+        for number, handle in enumerate(handles):
+            assert store.find(f(Constant(str(number)), x)) == handle
+
+    def test_reopen(self, tmp_path):
+        """Stores are reopened with their terms."""
+        path = tmp_path / "store"
+        with TermStore(path) as store:
+            terms = [f(g(a), x), g(x2), f(b, b)]
+            nodes = [store.add(term).node for term in terms]
+
+        with TermStore(path) as store:
+            assert len(store) == 8
+            for term, node in zip(terms, nodes, strict=True):
+                assert store.get(node).to_term() == term
+                assert store.add(term).node == node
+            assert len(store) == 8
+
+    @pytest.mark.parametrize(
+        ("symbol_id", "children", "expected"),
+        [
+            pytest.param(0, [], -5808590959568352621, id="constant"),
+            pytest.param(3, [1, 2], -2163428660113841687, id="function"),
+        ],
+    )
+    def test_node_hash(self, symbol_id, children, expected):
+        """Node hashes are stored, so they are fixed by the format."""
+        assert _node_hash(symbol_id, children) == expected
+
+    @pytest.mark.parametrize(
+        ("data", "message"),
+        [
+            pytest.param(b"PICKLE", "Not a term store", id="magic"),
+            pytest.param(
+                b"TRMD\x02" + bytes(11), "Unsupported term store version", id="version"
+            ),
+            pytest.param(
+                b"TRMD\x01" + bytes(3) + (1).to_bytes(8, SWAPPED),
+                "different byte order",
+                id="byte-order",
+            ),
+        ],
+    )
+    def test_invalid_format(self, tmp_path, data, message):
+        """Reopening a store of another format raises ValueError."""
+        path = tmp_path / "store"
+        TermStore(path).close()
+        (path / "format.bin").write_bytes(data)
+        with pytest.raises(ValueError, match=message):
+            TermStore(path)
+
+    def test_missing_format(self, tmp_path):
+        """Opening files that are not a store raises ValueError."""
+        path = tmp_path / "store"
+        TermStore(path).close()
+        (path / "format.bin").unlink()
+        with pytest.raises(ValueError, match="Not a term store"):
+            TermStore(path)
+
+    def test_invalid_node(self, store):
+        """Getting a node that does not exist raises IndexError."""
+        with pytest.raises(IndexError):
+            store.get(0)
@@ -0,0 +1,229 @@
+"""Unit tests for the termination.substitutions module."""
+
+from itertools import pairwise
+
+import pytest
+
+from termination._hamt import PersistentMap
+from termination.rewriting import Rule
+from termination.substitutions import PersistentSubstitution, TriangularSubstitution
+from termination.terms import Constant, Function, Substitution, Term, Variable
+
+f = Function("f", 2)
+g = Function("g", 1)
+
+a = Constant("a")
+b = Constant("b")
+
+x = Variable("x")
+y = Variable("y")
+z = Variable("z")
+
+
+class TestTriangularSubstitution:
+    """Test case for the TriangularSubstitution class."""
+
+    def test_bind(self):
+        """Bindings are recorded as they are made."""
+        sub = TriangularSubstitution()
+        sub.bind(x, f(y, y))
+        sub.bind(y, g(z))
+        assert len(sub) == 2
+        assert x in sub
+        assert z not in sub
+        assert sub[x] == f(y, y)
+        assert str(sub) == "{?x -> f(?y, ?y), ?y -> g(?z)}"
+
+    def test_bind_twice(self):
+        """A variable cannot be bound twice."""
+        sub = TriangularSubstitution({x: a})
+        with pytest.raises(ValueError):
+            sub.bind(x, b)
+
+    def test_deref(self):
+        """Dereferencing follows variable bindings to a term or free variable."""
+        sub = TriangularSubstitution({x: y, y: g(z), z: a})
+        assert sub.deref(x) == g(z)
+        assert sub.deref(b) == b
+        assert TriangularSubstitution({x: y}).deref(x) == y
+
+    def test_call(self):
+        """Applying a triangular substitution resolves its bindings."""
+        sub = TriangularSubstitution({x: f(y, y), y: g(z)})
+        assert sub(f(x, z)) == f(f(g(z), g(z)), z)
+        assert sub(Rule(f(x, z), z)) == Rule(f(f(g(z), g(z)), z), z)
+
+    def test_call_shared(self):
+        """Resolved values of variables are shared."""
+        sub = TriangularSubstitution({x: f(y, y), y: g(z)})
+        left, right = sub(x).children
+        assert left is right
+
+    def test_call_after_bind(self):
+        """New bindings are taken into account."""
+        sub = TriangularSubstitution({x: f(y, y)})
+        assert sub(x) == f(y, y)
+        sub.bind(y, a)
+        assert sub(x) == f(a, a)
+
+    def test_to_substitution(self):
+        """Triangular substitutions convert to idempotent substitutions."""
+        sub = TriangularSubstitution({x: f(y, z), y: g(z), z: a})
+        expected = Substitution({x: f(g(a), a), y: g(a), z: a})
+        assert sub.to_substitution() == expected
+
+    def test_resolved_mapping(self):
+        """The resolved bindings behave like a mapping."""
+        sub = TriangularSubstitution({x: f(y, z), y: g(z)})
+        resolved = sub._resolved
+        assert list(resolved.values()) == [f(g(z), z), g(z)]
+        assert dict(resolved.items()) == {x: f(g(z), z), y: g(z)}
+
+    def test_cyclic(self):
+        """Resolving cyclic bindings raises ValueError."""
+        sub = TriangularSubstitution({x: g(y), y: f(x, a)})
+        with pytest.raises(ValueError):
+            sub(x)
+
+    def test_long_chain(self):
+        """Long chains of bindings do not hit the recursion limit."""
+        xs = [Variable(f"x{i}") for i in range(10_000)]
+        sub = TriangularSubstitution()
+        for current, following in pairwise(xs):
+            sub.bind(current, g(following))
+        sub.bind(xs[-1], a)
+        assert sub(xs[0]).depth == len(xs) - 1
+
+
+class TestCompose:
+    """Test case for composing substitutions."""
+
+    def test_compose(self):
+        """Composition applies one substitution, then the other."""
+        first = Substitution({x: f(x, y), y: g(z)})
+        second = Substitution({x: a, y: b, z: a})
+        composed = first.compose(second)
+        assert composed == second(first)
+        assert composed == Substitution({x: f(a, b), y: g(a), z: a})
+
+    def test_compose_unaffected(self):
+        """Bindings without variables of the other substitution are kept."""
+        value = f(g(y), y)
+        composed = Substitution({x: value}).compose(Substitution({z: a}))
+        assert composed[x] is value
+        assert composed[z] == a
+
+    def test_compose_index(self):
+        """Bindings are found by the variables in them, also after composing."""
+        composed = Substitution({x: f(y, z), y: g(z)})
+        composed = composed.compose(Substitution({z: g(x)}))
+        assert composed == Substitution({x: f(y, g(x)), y: g(g(x)), z: g(x)})
+        composed = composed.compose(Substitution({x: a}))
+        assert composed == Substitution({x: f(y, g(a)), y: g(g(a)), z: g(a)})
+        composed = composed.compose(Substitution({z: b, y: b}))
+        assert composed == Substitution({x: f(b, g(a)), y: g(g(a)), z: g(a)})
+
+    def test_compose_chain(self, monkeypatch):
+        """Composing a chain of small substitutions only touches affected bindings."""
+        count = 2000
+        xs = [Variable(f"x{i}") for i in range(count)]
+        ys = [Variable(f"y{i}") for i in range(count)]
+        composed = Substitution({x: g(y) for (x, y) in zip(xs, ys, strict=True)})
+
+        substituted = []
+        substitute = Term._substitute
+
+        def counting_substitute(term, mapping):
+            substituted.append(term)
+            return substitute(term, mapping)
+
+        monkeypatch.setattr(Term, "_substitute", counting_substitute)
+        for variable in ys:
+            composed = composed.compose(Substitution({variable: a}))
+
+        assert substituted == [g(y) for y in ys]
+        assert composed == Substitution({**{x: g(a) for x in xs}, **{y: a for y in ys}})
+
+
+class TestPersistentSubstitution:
+    """Test case for the PersistentSubstitution class."""
+
+    def test_extend(self):
+        """Extending a persistent substitution leaves the original unchanged."""
+        empty = PersistentSubstitution()
+        left = empty.extend(x, a)
+        right = empty.extend(x, b).extend(y, g(x))
+
+        assert len(empty) == 0
+        assert dict(left.mapping) == {x: a}
+        assert dict(right.mapping) == {x: b, y: g(x)}
+        assert right(f(x, y)) == f(b, g(x))
+
+    def test_extend_bound(self):
+        """A bound variable cannot be bound again."""
+        with pytest.raises(ValueError):
+            PersistentSubstitution({x: a}).extend(x, b)
+
+    def test_many(self):
+        """Persistent substitutions hold many bindings."""
+        xs = [Variable(f"x{i}") for i in range(2000)]
+        sub = PersistentSubstitution()
+        for index, variable in enumerate(xs):
+            sub = sub.extend(variable, g(xs[index - 1]))
+        assert len(sub) == len(xs)
+        assert all(
+            sub[variable] == g(xs[index - 1]) for (index, variable) in enumerate(xs)
+        )
+        assert set(sub.mapping) == set(xs)
+
+
+class Colliding:
+    """A key whose hash collides with all other keys of the same group."""
+
+    def __init__(self, name, group=0):
+        self.name = name
+        self.group = group
+
+    def __hash__(self):
+        return self.group
+
+    def __eq__(self, other):
+        return isinstance(other, Colliding) and self.name == other.name
+
+
+class TestPersistentMap:
+    """Test case for the persistent hash map."""
+
+    def test_set(self):
+        """Setting a key returns a new map."""
+        empty = PersistentMap()
+        one = empty.set("a", 1)
+        two = one.set("b", 2).set("a", 3)
+        assert dict(empty) == {}
+        assert dict(one) == {"a": 1}
+        assert dict(two) == {"a": 3, "b": 2}
+        assert one.set("a", 1) is one
+
+    def test_missing(self):
+        """Missing keys raise KeyError."""
+        with pytest.raises(KeyError):
+            PersistentMap({"a": 1})["b"]
+
+    def test_collisions(self):
+        """Keys with equal hashes are kept apart."""
+        keys = [Colliding(name, group) for name in range(50) for group in (0, -1)]
+        table = PersistentMap((key, key.name) for key in keys)
+        assert len(table) == len(keys)
+        assert all(table[key] == key.name for key in keys)
+        assert table.set(keys[0], "x")[keys[0]] == "x"
+        assert len(table.set(keys[0], "x")) == len(keys)
+        with pytest.raises(KeyError):
+            table[Colliding(100)]
+
+    def test_large(self):
+        """Large maps agree with dictionaries."""
+        expected = {index * 7919: str(index) for index in range(10_000)}
+        table = PersistentMap(expected)
+        assert len(table) == len(expected)
+        assert dict(table) == expected
+        assert table == expected
@@ -0,0 +1,151 @@
+"""Unit tests for the termination.symbols module."""
+
+import pytest
+
+from termination.symbols import SymbolTable, lookup
+from termination.terms import Constant, Function, Variable
+
+
+class TestSymbolTable:
+    """Test case for the SymbolTable class."""
+
+    def test_add(self):
+        """A SymbolTable assigns dense ids in the order symbols are added."""
+        table = SymbolTable()
+        assert table.add(Function("f", 2)) == 0
+        assert table.add(Constant("a")) == 1
+        assert table.add(Variable("x")) == 2
+        assert len(table) == 3
+
+    def test_add_existing(self):
+        """A SymbolTable returns the existing id for a known symbol."""
+        table = SymbolTable()
+        table.add(Function("f", 2))
+        table.add(Constant("a"))
+        assert table.add(Function("f", 2)) == 0
+        assert len(table) == 2
+
+    def test_lookup(self):
+        """A SymbolTable maps ids to symbols and back."""
+        table = SymbolTable()
+        f_id = table.add(Function("f", 2))
+        assert table[Function("f", 2)] == f_id
+        assert table.symbol(f_id) == Function("f", 2)
+        assert Function("f", 2) in table
+        assert Function("f", 1) not in table
+
+    def test_lookup_missing(self):
+        """A SymbolTable raises KeyError for unknown symbols."""
+        table = SymbolTable()
+        with pytest.raises(KeyError):
+            table[Constant("a")]
+
+    def test_arities(self):
+        """A SymbolTable records the arity of each symbol by id."""
+        table = SymbolTable()
+        table.add(Function("f", 2))
+        table.add(Constant("a"))
+        table.add(Function("g", 1))
+        assert list(table.arities) == [2, 0, 1]
+
+
+class TestInterning:
+    """Test case for interning symbols in a SymbolTable."""
+
+    def test_intern(self):
+        """A SymbolTable returns one canonical instance per symbol."""
+        table = SymbolTable()
+        f = Function("f", 2)
+        assert table.intern(f) is f
+        assert table.intern(Function("f", 2)) is f
+        assert table[Function("f", 2)] == table[f] == 0
+        assert table.find(Constant("a")) is None
+
+    def test_several_tables(self):
+        """A symbol can be canonical in several tables, with different ids."""
+        first = SymbolTable()
+        second = SymbolTable()
+        f = Function("f", 2)
+        first.add(Constant("a"))
+        assert first.intern(f) is f
+        assert second.intern(f) is f
+        assert first[f] == 1
+        assert second[f] == 0
+        assert first[Function("f", 2)] == 1
+        assert second[Function("f", 2)] == 0
+
+
+class TestSymbolArray:
+    """Test case for the SymbolArray class."""
+
+    def test_array(self):
+        """A SymbolArray maps symbols to integers."""
+        table = SymbolTable()
+        f = table.intern(Function("f", 2))
+        a = Constant("a")
+        precedence = table.array({a: 2, f: -1})
+
+        assert precedence[f] == -1
+        assert precedence.get(Constant("a")) == 2
+        assert precedence.get(Constant("b")) is None
+        assert precedence.get(Constant("b"), 0) == 0
+        assert dict(precedence) == {f: -1, a: 2}
+        assert len(precedence) == 2
+
+    def test_mapping(self):
+        """A SymbolArray behaves like a mapping, including its equality."""
+        table = SymbolTable()
+        f = Function("f", 2)
+        a = Constant("a")
+        precedence = table.array({f: 1, a: 0})
+
+        assert list(precedence.values()) == [1, 0]
+        assert list(precedence.items()) == [(f, 1), (a, 0)]
+        assert precedence == {a: 0, f: 1}
+        assert precedence == SymbolTable().array({a: 0, f: 1})
+        assert precedence != {f: 1}
+        assert precedence.get("f") is None
+
+    def test_missing(self):
+        """A SymbolArray raises KeyError for symbols without values."""
+        table = SymbolTable()
+        table.add(Function("f", 2))
+        precedence = table.array({Constant("a"): 1})
+        with pytest.raises(KeyError):
+            precedence[Function("f", 2)]
+        with pytest.raises(KeyError):
+            precedence[Constant("b")]
+
+    def test_len(self):
+        """The number of symbols with values is kept up to date."""
+        table = SymbolTable()
+        precedence = table.array({Constant("a"): 1})
+        precedence[Constant("a")] = 2
+        precedence[Function("f", 2)] = 3
+        table.add(Constant("b"))
+        assert len(precedence) == 2
+
+    @pytest.mark.parametrize(
+        ("symbol", "expected"),
+        [
+            pytest.param(Function("f", 2), 3, id="function"),
+            pytest.param(Constant("a"), 1, id="constant"),
+            pytest.param(Constant("b"), 0, id="other-table"),
+            pytest.param(Constant("c"), None, id="missing"),
+        ],
+    )
+    def test_lookup(self, symbol, expected):
+        """Lookup functions of arrays agree with get()."""
+        other = SymbolTable()
+        b = other.intern(Constant("b"))
+        table = SymbolTable()
+        table.intern(Constant("a"))
+        table.intern(Function("f", 2))
+        precedence = table.array({Constant("a"): 1, b: 0, Function("f", 2): 3})
+
+        assert precedence.get(symbol) == expected
+        assert lookup(precedence)(symbol) == expected
+        assert lookup(precedence, -1)(symbol) == (-1 if expected is None else expected)
+        assert lookup(dict(precedence))(symbol) == expected
+        if symbol in table:
+            assert lookup(precedence)(table.intern(symbol)) == expected
@@ -13,6 +13,9 @@ from termination.terms import (
     Substitution,
     Term,
     Variable,
+    postorder,
+    preorder,
+    replace,
     variables,
 )
 
@@ -121,6 +124,8 @@ class TestTerm:
     f = Function("f", 2)
     g = Function("g", 1)
 
+    a = Constant("a")
+
     x = Variable("x")
     y = Variable("y")
     z = Variable("z")
@@ -223,6 +228,184 @@ class TestTerm:
         """A Term supports iterating its variables."""
         assert set(variables(term)) == expected_variables
 
+    @pytest.mark.parametrize(
+        ("term", "position", "replacement", "expected"),
+        [
+            pytest.param(f(g(x), y), (), z, z),
+            pytest.param(f(g(x), y), (0,), z, f(z, y)),
+            pytest.param(f(g(x), y), (0, 0), g(z), f(g(g(z)), y)),
+            pytest.param(f(g(x), y), (1,), g(z), f(g(x), g(z))),
+        ],
+    )
+    def test_replace(self, term, position, replacement, expected):
+        """The subterm at a position of a Term can be replaced."""
+        result = replace(term, position, replacement)
+        assert result == expected
+        if position[:1] == (1,):
+            assert result.children[0] is term.children[0]
+
+    @pytest.mark.parametrize(
+        ("term", "position"),
+        [
+            pytest.param(f(g(x), y), (2,)),
+            pytest.param(f(g(x), y), (-1,)),
+            pytest.param(f(g(x), y), (1, 0)),
+        ],
+    )
+    def test_replace_invalid(self, term, position):
+        """A Term does not support replacing at invalid positions."""
+        with pytest.raises(KeyError):
+            replace(term, position, self.z)
+
+    @pytest.mark.parametrize(
+        ("term", "expected_len", "expected_depth"),
+        [
+            pytest.param(g(x), 2, 1),
+            pytest.param(f(y, z), 3, 1),
+            pytest.param(f(g(x), f(y, g(z))), 7, 3),
+        ],
+    )
+    def test_len_depth(self, term, expected_len, expected_depth):
+        """A Term reports its size and depth."""
+        assert len(term) == expected_len
+        assert term.depth == expected_depth
+
+    @pytest.mark.parametrize(
+        ("term", "expected_variables"),
+        [
+            pytest.param(f(g(x), f(y, z)), {x, y, z}),
+            pytest.param(f(g(a), g(x)), {x}),
+            pytest.param(f(g(a), a), set()),
+        ],
+    )
+    def test_variable_set(self, term, expected_variables):
+        """A Term reports its set of variables and whether it is ground."""
+        assert term.variable_set == expected_variables
+        assert term.is_ground == (not expected_variables)
+
+    def test_metadata_cached(self):
+        """A Term computes its structural metadata at most once."""
+        term = self.f(self.g(self.x), self.y)
+        assert not term.is_ground
+        assert "is_ground" in term.__dict__
+        assert len(term) == 4
+        assert "_size" in term.__dict__
+        assert "_hash" not in term.__dict__
+        hash(term)
+        assert "_hash" in term.__dict__
+
+    def test_shared_len(self):
+        """A Term with shared subterms computes its size once per subterm."""
+        term = self.a
+        for _ in range(60):
+            term = self.f(term, term)
+        assert len(term) == 2**61 - 1
+        assert term.depth == 60
+
+    def test_variable_set_not_stored(self):
+        """A Term computes its variable set on demand, without storing it."""
+        inner = self.g(self.x)
+        term = self.f(self.g(self.a), inner)
+        assert term.variable_set == {self.x}
+        assert "variable_set" not in term.__dict__
+        assert "variable_set" not in inner.__dict__
+
+
+class TestTraversal:
+    """Test cases for the preorder() and postorder() functions."""
+
+    f = Function("f", 2)
+    g = Function("g", 1)
+    s = Function("s", 1)
+
+    zero = Constant("0")
+
+    x = Variable("x")
+    y = Variable("y")
+
+    def test_preorder(self):
+        """The preorder() function yields each subterm before its children."""
+        term = self.f(self.g(self.x), self.y)
+        assert list(preorder(term)) == [term, self.g(self.x), self.x, self.y]
+
+    def test_preorder_positions(self):
+        """The preorder() function can yield positions with the subterms."""
+        term = self.f(self.g(self.x), self.y)
+        assert list(preorder(term, positions=True)) == [
+            ((), term),
+            ((0,), self.g(self.x)),
+            ((0, 0), self.x),
+            ((1,), self.y),
+        ]
+
+    def test_postorder(self):
+        """The postorder() function yields each subterm after its children."""
+        term = self.f(self.g(self.x), self.y)
+        assert list(postorder(term)) == [self.x, self.g(self.x), self.y, term]
+
+    def test_postorder_positions(self):
+        """The postorder() function can yield positions with the subterms."""
+        term = self.f(self.g(self.x), self.y)
+        assert list(postorder(term, positions=True)) == [
+            ((0, 0), self.x),
+            ((0,), self.g(self.x)),
+            ((1,), self.y),
+            ((), term),
+        ]
+
+    def test_deep_term(self):
+        """Deep terms can be traversed without exceeding the recursion limit."""
+        depth = 100_000
+
+        def numeral(n):
+            term = self.s(self.x)
+            for _ in range(n - 1):
+                term = self.s(term)
+            return term
+
+        term = numeral(depth)
+
+        assert len(term) == depth + 1
+        assert term.depth == depth
+        assert term.variable_set == {self.x}
+        assert sum(1 for _ in preorder(term)) == depth + 1
+        assert sum(1 for _ in postorder(term)) == depth + 1
+        assert str(term) == "s(" * depth + "?x" + ")" * depth
+        assert term == numeral(depth)
+        assert term != self.s(numeral(depth))
+
+    def test_deep_positions(self):
+        """Deep terms can be traversed with positions in pre- and post-order."""
+        depth = 5_000
+        term = self.x
+        for _ in range(depth):
+            term = self.g(term)
+
+        positions = [position for position, _ in preorder(term, positions=True)]
+        assert len(positions) == depth + 1
+        assert positions[0] == ()
+        assert positions[-1] == (0,) * depth
+
+        positions = [position for position, _ in postorder(term, positions=True)]
+        assert len(positions) == depth + 1
+        assert positions[0] == (0,) * depth
+        assert positions[-1] == ()
+
+        assert sum(1 for _ in term.subterms()) == depth + 1
+
+    def test_deep_variables(self):
+        """Deep terms with many distinct variables yield each variable once."""
+        cons = Function("cons", 2)
+        nil = Constant("nil")
+        items = [Variable(f"x{index}") for index in range(20_000)]
+        term = nil
+        for item in reversed(items):
+            term = cons(item, term)
+
+        found = list(variables(term))
+        assert len(found) == len(items)
+        assert set(found) == set(items)
+
 
 class TestSubstitution:
     """Test case for the Substitution class."""
@@ -270,3 +453,53 @@ class TestSubstitution:
     def test_substitute(self, sub, target, expected):
         """Calling a substitution applies it to the given value."""
         assert sub(target) == expected
+
+    def test_substitute_untouched(self):
+        """Subterms without mapped variables are returned as they are."""
+        ground = self.f(self.g(self.a), self.b)
+        term = self.f(ground, self.g(self.y))
+        assert Substitution({self.x: self.a})(term) is term
+
+        result = Substitution({self.y: self.c})(term)
+        assert result == self.f(ground, self.g(self.c))
+        assert result.children[0] is ground
+
+    def test_substitute_shared(self):
+        """Shared subterms stay shared in the result."""
+        term = self.x
+        for _ in range(100):
+            term = self.f(term, term)
+
+        result = Substitution({self.x: self.a})(term)
+        for _ in range(100):
+            left, right = result.children
+            assert left is right
+            result = left
+        assert result == self.a
+
+    def test_substitute_deep(self):
+        """Substituting into deep terms does not hit the recursion limit."""
+        term = self.x
+        for _ in range(100_000):
+            term = self.g(term)
+
+        result = Substitution({self.x: self.a})(term)
+        assert result.depth == 100_000
+        assert result.is_ground
+
+
+class TestSlots:
+    """Test case for the memory layout of symbols."""
+
+    @pytest.mark.parametrize(
+        ("symbol",),
+        [
+            pytest.param(Function("f", 2)),
+            pytest.param(Constant("a")),
+            pytest.param(Variable("x")),
+            pytest.param(IndexedVariable("x", 1)),
+        ],
+    )
+    def test_no_dict(self, symbol):
+        """Symbols have no instance dictionary."""
+        assert not hasattr(symbol, "__dict__")
@@ -0,0 +1,114 @@
+"""Unit tests for the termination.unification module."""
+
+import pytest
+
+from termination.substitutions import TriangularSubstitution
+from termination.terms import Constant, Function, Variable
+from termination.unification import unify, unify_all
+
+
+def apply_fully(sub, term):
+    """Apply a (possibly triangular) substitution until nothing changes."""
+    while True:
+        result = sub(term)
+        if result == term:
+            return result
+        term = result
+
+
+class TestUnify:
+    """Test case for the unify function."""
+
+    f = Function("f", 2)
+    g = Function("g", 1)
+    h = Function("h", 2)
+
+    a = Constant("a")
+    b = Constant("b")
+
+    x = Variable("x")
+    y = Variable("y")
+    z = Variable("z")
+
+    @pytest.mark.parametrize(
+        ("left", "right"),
+        [
+            pytest.param(x, a),
+            pytest.param(x, y),
+            pytest.param(f(x, a), f(b, y)),
+            pytest.param(f(x, g(a)), f(g(y), y)),
+            pytest.param(f(x, y), f(y, g(z))),
+            pytest.param(f(g(x), x), f(y, g(z))),
+            pytest.param(f(x, x), f(y, y)),
+            pytest.param(g(a), g(a)),
+        ],
+    )
+    @pytest.mark.parametrize(("idempotent",), [pytest.param(True), pytest.param(False)])
+    def test_unifiable(self, left, right, idempotent):
+        """The unify function returns a unifier of unifiable terms."""
+        sub = unify(left, right, idempotent=idempotent)
+        assert sub is not None
+        assert apply_fully(sub, left) == apply_fully(sub, right)
+
+    @pytest.mark.parametrize(
+        ("left", "right", "expected"),
+        [
+            pytest.param(x, a, {x: a}),
+            pytest.param(x, y, {x: y}),
+            pytest.param(f(x, g(a)), f(g(y), y), {x: g(g(a)), y: g(a)}),
+            pytest.param(g(a), g(a), {}),
+        ],
+    )
+    def test_idempotent(self, left, right, expected):
+        """The unify function returns idempotent most general unifiers."""
+        sub = unify(left, right)
+        assert sub is not None
+        assert dict(sub.mapping) == expected
+        assert sub(sub(left)) == sub(left)
+
+    @pytest.mark.parametrize(
+        ("left", "right"),
+        [
+            pytest.param(a, b),
+            pytest.param(g(x), a),
+            pytest.param(f(x, x), f(a, b)),
+            pytest.param(f(x, y), h(x, y)),
+            pytest.param(x, g(x)),
+            pytest.param(f(x, y), f(g(y), g(x))),
+        ],
+    )
+    def test_not_unifiable(self, left, right):
+        """The unify function returns None for non-unifiable terms."""
+        assert unify(left, right) is None
+        assert unify(left, right, idempotent=False) is None
+
+    def test_unify_all(self):
+        """The unify_all function unifies several pairs simultaneously."""
+        sub = unify_all([(self.x, self.g(self.y)), (self.y, self.a)])
+        assert sub is not None
+        assert sub(self.x) == self.g(self.a)
+        assert unify_all([(self.x, self.a), (self.x, self.b)]) is None
+
+    def test_exponential_family(self):
+        """Unifiers of exponential size as trees are built with sharing."""
+        n = 60
+        p = Function("p", n)
+        xs = [Variable(f"x{i}") for i in range(n + 1)]
+        left = p(*xs[1:])
+        right = p(*(self.f(xs[i], xs[i]) for i in range(n)))
+
+        sub = unify(left, right)
+        assert sub is not None
+        assert len(sub(xs[n])) == 2 ** (n + 1) - 1
+
+    def test_triangular(self):
+        """Non-idempotent unifiers are triangular substitutions."""
+        sub = unify(
+            self.f(self.x, self.g(self.a)),
+            self.f(self.g(self.y), self.y),
+            idempotent=False,
+        )
+        assert isinstance(sub, TriangularSubstitution)
+        assert sub.to_substitution() == unify(
+            self.f(self.x, self.g(self.a)), self.f(self.g(self.y), self.y)
+        )
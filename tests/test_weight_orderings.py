@@ -0,0 +1,94 @@
+"""Unit tests for the termination.weight_orderings module."""
+
+import pytest
+
+from termination.terms import Constant, Function, Variable
+from termination.weight_orderings import WeightOrdering, kbo
+
+mul = Function("mul", 2)
+inv = Function("inv", 1)
+f = Function("f", 2)
+g = Function("g", 1)
+h = Function("h", 1)
+
+e = Constant("e")
+a = Constant("a")
+b = Constant("b")
+
+x = Variable("x")
+y = Variable("y")
+z = Variable("z")
+
+# The weights and precedence that complete the group axioms.
+GROUP = {
+    "weights": {mul: 0, inv: 0, e: 1},
+    "precedence": {inv: 2, mul: 1, e: 0},
+}
+
+
+class TestKBO:
+    """Test case for the Knuth-Bendix ordering."""
+
+    @pytest.mark.parametrize(
+        ("lhs", "rhs"),
+        [
+            pytest.param(mul(e, x), x, id="left-identity"),
+            pytest.param(mul(inv(x), x), e, id="left-inverse"),
+            pytest.param(mul(mul(x, y), z), mul(x, mul(y, z)), id="associativity"),
+            pytest.param(inv(inv(x)), x, id="double-inverse"),
+            pytest.param(inv(mul(x, y)), mul(inv(y), inv(x)), id="inverse-product"),
+            pytest.param(mul(inv(x), mul(x, y)), y, id="cancel"),
+        ],
+    )
+    def test_orients_group_rules(self, lhs, rhs):
+        """KBO orients the rules of the complete group rewrite system."""
+        assert kbo(lhs, **GROUP) > rhs
+        assert not kbo(rhs, **GROUP) > lhs
+
+    def test_weight(self):
+        """Heavier terms are greater."""
+        assert kbo(g(a), weights={}, precedence={}) > a
+        assert kbo(f(a, b), weights={}, precedence={}) > g(b)
+
+    def test_precedence(self):
+        """Terms of equal weight are compared by the precedence of their roots."""
+        assert kbo(g(a), weights={}, precedence={g: 1, h: 0}) > h(a)
+        assert not kbo(g(a), weights={}, precedence={}) > h(a)
+
+    def test_lexicographic(self):
+        """Terms with the same root are compared lexicographically."""
+        precedence = {a: 1, b: 0}
+        assert kbo(f(a, b), weights={}, precedence=precedence) > f(b, a)
+        assert not kbo(f(b, a), weights={}, precedence=precedence) > f(a, b)
+
+    def test_variable_balance(self):
+        """A term is not greater than one with more occurrences of a variable."""
+        assert not kbo(f(g(g(x)), y), weights={}, precedence={}) > f(x, x)
+        assert kbo(f(g(g(x)), x), weights={}, precedence={}) > f(x, x)
+        assert not kbo(g(x), weights={}, precedence={}) > y
+
+    def test_variables(self):
+        """A variable is only smaller than terms that contain it."""
+        assert kbo(g(x), weights={}, precedence={}) > x
+        assert not kbo(x, weights={}, precedence={}) > g(x)
+        assert not kbo(x, weights={}, precedence={}) > y
+
+    def test_equal(self):
+        """Equal terms are greater or equal, but not greater."""
+        assert kbo(f(x, a), **GROUP) >= f(x, a)
+        assert not kbo(f(x, a), **GROUP) > f(x, a)
+
+    def test_variable_weight(self):
+        """Variables weigh the variable weight."""
+        order = WeightOrdering(weights={}, precedence={})
+        assert not order.greater(f(x, x), g(g(g(x))))
+        order = WeightOrdering(weights={}, precedence={}, variable_weight=3)
+        assert order.greater(f(x, x), g(g(g(x))))
+
+    def test_deep(self):
+        """Comparing deep terms does not hit the recursion limit."""
+        left = right = x
+        for _ in range(5000):
+            left = f(left, g(a))
+            right = f(right, a)
+        assert kbo(left, weights={}, precedence={}) > right